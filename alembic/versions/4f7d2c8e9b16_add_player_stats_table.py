@@ -0,0 +1,88 @@
+"""add player stats table
+
+Revision ID: 4f7d2c8e9b16
+Revises: e3a9b6f0c215
+Create Date: 2026-10-18 22:03:52.418330
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7d2c8e9b16'
+down_revision: Union[str, Sequence[str], None] = 'e3a9b6f0c215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Итоги матча для каждого из игроков (матч игрока с самим собой - один раз)
+# по таблицам матчей и сетов.
+SIDES = """
+WITH "Sets" AS (
+    SELECT "MatchID",
+        SUM(CASE WHEN "Player1Games" > "Player2Games" THEN 1 ELSE 0 END) AS "P1",
+        SUM(CASE WHEN "Player2Games" > "Player1Games" THEN 1 ELSE 0 END) AS "P2",
+        SUM(CASE WHEN "TieBreakPlayer1" > "TieBreakPlayer2" THEN 1 ELSE 0 END)
+            AS "P1TieBreaks",
+        SUM(CASE WHEN "TieBreakPlayer2" > "TieBreakPlayer1" THEN 1 ELSE 0 END)
+            AS "P2TieBreaks"
+    FROM "MatchSets" GROUP BY "MatchID"
+), "Sides" AS (
+    SELECT m."Player1" AS "PlayerID", m."Player2" AS "OpponentID",
+        CASE WHEN m."Winner" = m."Player1" THEN 1 ELSE 0 END AS "Wins",
+        COALESCE(s."P1", 0) AS "SetsWon", COALESCE(s."P2", 0) AS "SetsLost",
+        COALESCE(s."P1TieBreaks", 0) AS "TieBreaksWon",
+        COALESCE(s."P2TieBreaks", 0) AS "TieBreaksLost"
+    FROM "Matches" m LEFT JOIN "Sets" s ON s."MatchID" = m."ID"
+    UNION ALL
+    SELECT m."Player2", m."Player1",
+        CASE WHEN m."Winner" = m."Player2" THEN 1 ELSE 0 END,
+        COALESCE(s."P2", 0), COALESCE(s."P1", 0),
+        COALESCE(s."P2TieBreaks", 0), COALESCE(s."P1TieBreaks", 0)
+    FROM "Matches" m LEFT JOIN "Sets" s ON s."MatchID" = m."ID"
+    WHERE m."Player2" <> m."Player1"
+)
+"""
+TOTALS = (
+    'COUNT(*), SUM("Wins"), SUM("SetsWon"), SUM("SetsLost"), '
+    'SUM("TieBreaksWon"), SUM("TieBreaksLost")'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'PlayerStats',
+        sa.Column('PlayerID', sa.Integer(), nullable=False),
+        sa.Column('OpponentID', sa.Integer(), nullable=False),
+        sa.Column('Matches', sa.Integer(), nullable=False),
+        sa.Column('Wins', sa.Integer(), nullable=False),
+        sa.Column('SetsWon', sa.Integer(), nullable=False),
+        sa.Column('SetsLost', sa.Integer(), nullable=False),
+        sa.Column('TieBreaksWon', sa.Integer(), nullable=False),
+        sa.Column('TieBreaksLost', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('PlayerID', 'OpponentID'),
+    )
+    # Заполнение по уже сохраненным матчам; OpponentID = 0 - все соперники.
+    op.execute(
+        'INSERT INTO "PlayerStats" '
+        f'{SIDES} '
+        f'SELECT "PlayerID", "OpponentID", {TOTALS} '
+        'FROM "Sides" GROUP BY "PlayerID", "OpponentID" '
+        'UNION ALL '
+        f'SELECT "PlayerID", 0, {TOTALS} FROM "Sides" GROUP BY "PlayerID"'
+    )
+    op.create_index(
+        'ix_PlayerStats_PlayerID_Matches',
+        'PlayerStats',
+        ['PlayerID', 'Matches', 'OpponentID'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_PlayerStats_PlayerID_Matches', table_name='PlayerStats')
+    op.drop_table('PlayerStats')
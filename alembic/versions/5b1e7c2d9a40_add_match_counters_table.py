@@ -0,0 +1,47 @@
+"""add match counters table
+
+Revision ID: 5b1e7c2d9a40
+Revises: a0d64c919552
+Create Date: 2026-10-18 18:20:41.127305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9a40'
+down_revision: Union[str, Sequence[str], None] = 'a0d64c919552'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'MatchCounters',
+        sa.Column('PlayerID', sa.Integer(), nullable=False),
+        sa.Column('Matches', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('PlayerID'),
+    )
+    # Заполнение по уже сохраненным матчам; PlayerID = 0 - все матчи.
+    op.execute(
+        'INSERT INTO "MatchCounters" ("PlayerID", "Matches") '
+        'SELECT 0, COUNT(*) FROM "Matches"'
+    )
+    op.execute(
+        'INSERT INTO "MatchCounters" ("PlayerID", "Matches") '
+        'SELECT "PlayerID", COUNT(*) FROM ('
+        'SELECT "Player1" AS "PlayerID" FROM "Matches" '
+        'UNION ALL '
+        'SELECT "Player2" FROM "Matches" WHERE "Player2" <> "Player1"'
+        ') AS "Participants" GROUP BY "PlayerID"'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('MatchCounters')
@@ -0,0 +1,32 @@
+"""add match player indexes
+
+Revision ID: 8c4f2a6e1d37
+Revises: 5b1e7c2d9a40
+Create Date: 2026-10-18 19:05:12.603218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2a6e1d37'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2d9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_Matches_Player1_ID', 'Matches', ['Player1', 'ID'])
+    op.create_index('ix_Matches_Player2_ID', 'Matches', ['Player2', 'ID'])
+    op.create_index('ix_Matches_Winner', 'Matches', ['Winner'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_Matches_Winner', table_name='Matches')
+    op.drop_index('ix_Matches_Player2_ID', table_name='Matches')
+    op.drop_index('ix_Matches_Player1_ID', table_name='Matches')
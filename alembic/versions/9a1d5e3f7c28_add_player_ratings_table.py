@@ -0,0 +1,92 @@
+"""add player ratings table
+
+Revision ID: 9a1d5e3f7c28
+Revises: 4f7d2c8e9b16
+Create Date: 2026-10-18 23:11:06.532914
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a1d5e3f7c28'
+down_revision: Union[str, Sequence[str], None] = '4f7d2c8e9b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Матчей за один проход заполнения.
+BACKFILL_CHUNK_SIZE = 50_000
+# Параметры рейтинга Эло на момент миграции (`app.domain.rating`).
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+
+player_ratings = sa.table(
+    'PlayerRatings',
+    sa.column('PlayerID', sa.Integer()),
+    sa.column('Rating', sa.Float()),
+    sa.column('Matches', sa.Integer()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'PlayerRatings',
+        sa.Column('PlayerID', sa.Integer(), nullable=False),
+        sa.Column('Rating', sa.Float(), nullable=False),
+        sa.Column('Matches', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('PlayerID'),
+    )
+    backfill()
+    op.create_index('ix_PlayerRatings_Rating', 'PlayerRatings', ['Rating', 'PlayerID'])
+
+
+def backfill() -> None:
+    """Считает рейтинги по сохраненным матчам порциями в порядке id."""
+    conn = op.get_bind()
+    ratings: dict[int, float] = {}
+    matches: dict[int, int] = {}
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                'SELECT "ID", "Player1", "Player2", "Winner" FROM "Matches" '
+                'WHERE "ID" > :last_id ORDER BY "ID" LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BACKFILL_CHUNK_SIZE},
+        ).all()
+        if not rows:
+            break
+
+        for _, player1, player2, winner in rows:
+            if player1 == player2:
+                continue
+            loser = player1 + player2 - winner
+            winner_rating = ratings.get(winner, INITIAL_RATING)
+            loser_rating = ratings.get(loser, INITIAL_RATING)
+            expected = 1.0 / (1.0 + 10.0 ** ((loser_rating - winner_rating) / 400.0))
+            delta = K_FACTOR * (1.0 - expected)
+            ratings[winner] = winner_rating + delta
+            ratings[loser] = loser_rating - delta
+            matches[winner] = matches.get(winner, 0) + 1
+            matches[loser] = matches.get(loser, 0) + 1
+        last_id = rows[-1][0]
+
+    if ratings:
+        op.bulk_insert(
+            player_ratings,
+            [
+                {'PlayerID': player_id, 'Rating': rating, 'Matches': matches[player_id]}
+                for player_id, rating in ratings.items()
+            ],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_PlayerRatings_Rating', table_name='PlayerRatings')
+    op.drop_table('PlayerRatings')
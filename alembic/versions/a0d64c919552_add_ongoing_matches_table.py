@@ -0,0 +1,35 @@
+"""add ongoing matches table
+
+Revision ID: a0d64c919552
+Revises: 3040d39cf932
+Create Date: 2026-10-18 15:01:14.499448
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a0d64c919552'
+down_revision: Union[str, Sequence[str], None] = '3040d39cf932'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'OngoingMatches',
+        sa.Column('UUID', sa.UUID(), nullable=False),
+        sa.Column('Version', sa.Integer(), nullable=False),
+        sa.Column('State', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('UUID'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('OngoingMatches')
@@ -0,0 +1,48 @@
+"""store uuids as char on sqlite
+
+Revision ID: c7e2f5a9d314
+Revises: 9a1d5e3f7c28
+Create Date: 2026-10-18 23:52:41.207316
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f5a9d314'
+down_revision: Union[str, Sequence[str], None] = '9a1d5e3f7c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Таблицы с колонкой "UUID", созданной как sa.UUID().
+TABLES = ['Matches', 'OngoingMatches']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # В PostgreSQL колонки уже нативного типа UUID; в SQLite тип "UUID" дает
+    # NUMERIC-аффинность, и hex-строки из одних цифр хранятся числами.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('UUID', existing_type=sa.UUID(), type_=sa.CHAR(32))
+        # При копировании такие числа стали строками без ведущих нулей.
+        op.execute(
+            f'UPDATE "{table}" '
+            'SET "UUID" = substr(\'00000000000000000000000000000000\' || "UUID", -32) '
+            'WHERE length("UUID") < 32'
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column('UUID', existing_type=sa.CHAR(32), type_=sa.UUID())
@@ -0,0 +1,99 @@
+"""add match sets table
+
+Revision ID: e3a9b6f0c215
+Revises: 8c4f2a6e1d37
+Create Date: 2026-10-18 21:14:37.905126
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9b6f0c215'
+down_revision: Union[str, Sequence[str], None] = '8c4f2a6e1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Матчей за один проход заполнения.
+BACKFILL_CHUNK_SIZE = 10_000
+
+match_sets = sa.table(
+    'MatchSets',
+    sa.column('MatchID', sa.Integer()),
+    sa.column('SetNumber', sa.Integer()),
+    sa.column('Player1Games', sa.Integer()),
+    sa.column('Player2Games', sa.Integer()),
+    sa.column('TieBreakPlayer1', sa.Integer()),
+    sa.column('TieBreakPlayer2', sa.Integer()),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'MatchSets',
+        sa.Column('MatchID', sa.Integer(), nullable=False),
+        sa.Column('SetNumber', sa.Integer(), nullable=False),
+        sa.Column('Player1Games', sa.Integer(), nullable=False),
+        sa.Column('Player2Games', sa.Integer(), nullable=False),
+        sa.Column('TieBreakPlayer1', sa.Integer(), nullable=True),
+        sa.Column('TieBreakPlayer2', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['MatchID'], ['Matches.ID'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('MatchID', 'SetNumber'),
+    )
+    backfill()
+    # Индекс строится после заполнения: так быстрее, чем обновлять его на
+    # каждой вставке.
+    op.create_index(
+        'ix_MatchSets_TieBreak',
+        'MatchSets',
+        ['SetNumber', 'MatchID'],
+        postgresql_where=sa.text('"TieBreakPlayer1" IS NOT NULL'),
+        sqlite_where=sa.text('"TieBreakPlayer1" IS NOT NULL'),
+    )
+
+
+def backfill() -> None:
+    """Разбирает счет сохраненных матчей порциями по id."""
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.text(
+                'SELECT "ID", "Score" FROM "Matches" WHERE "ID" > :last_id '
+                'ORDER BY "ID" LIMIT :limit'
+            ),
+            {'last_id': last_id, 'limit': BACKFILL_CHUNK_SIZE},
+        ).all()
+        if not rows:
+            return
+
+        values = []
+        for match_id, score in rows:
+            sets = json.loads(score)['sets_breakdown']
+            for number, set_data in enumerate(sets, start=1):
+                tie_break = set_data.get('tie_break_points') or [None, None]
+                values.append(
+                    {
+                        'MatchID': match_id,
+                        'SetNumber': number,
+                        'Player1Games': set_data['player1_games'],
+                        'Player2Games': set_data['player2_games'],
+                        'TieBreakPlayer1': tie_break[0],
+                        'TieBreakPlayer2': tie_break[1],
+                    }
+                )
+        if values:
+            op.bulk_insert(match_sets, values)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_MatchSets_TieBreak', table_name='MatchSets')
+    op.drop_table('MatchSets')
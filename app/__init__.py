@@ -1,16 +1,50 @@
-from .controllers import MainController, MatchController
-from .database import Database
+from .asgi import AsgiApp
+from .controllers import (
+    MainController,
+    MatchController,
+    MetricsController,
+    PlayerController,
+)
+from .database import AsyncDatabase, Database
+from .render_cache import RenderCache
 from .router import Router
 from .routes import register_routes
-from .services import MatchService
-from .store import OngoingMatchStore
+from .services import (
+    FinishedMatchWriter,
+    LiveScoreHub,
+    MatchImporter,
+    MatchService,
+    PlayerCache,
+    PlayerNameIndex,
+    PlayerService,
+)
+from .store import (
+    InMemoryOngoingMatchStore,
+    MatchJournal,
+    OngoingMatchStore,
+    SqlOngoingMatchStore,
+)
 
 __all__ = [
     'Router',
     'register_routes',
     'MainController',
     'MatchController',
+    'MetricsController',
+    'PlayerController',
+    'RenderCache',
     'OngoingMatchStore',
+    'InMemoryOngoingMatchStore',
+    'SqlOngoingMatchStore',
+    'MatchJournal',
     'MatchService',
+    'PlayerService',
+    'PlayerNameIndex',
+    'PlayerCache',
+    'FinishedMatchWriter',
+    'MatchImporter',
+    'LiveScoreHub',
     'Database',
+    'AsyncDatabase',
+    'AsgiApp',
 ]
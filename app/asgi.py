@@ -0,0 +1,244 @@
+"""
+ASGI-приложение поверх того же `Router` и контроллеров, что и WSGI `App`
+в `main.py`.
+
+Асинхронные обработчики (корутины) выполняются прямо в цикле событий.
+Синхронные обработчики выполняются в ограниченном пуле потоков, чтобы
+блокирующая работа (запросы к БД через синхронную сессию, рендеринг шаблонов)
+не останавливала цикл и не порождала по потоку на каждое соединение.
+
+Обработчик может вернуть вместо строки асинхронный генератор: тогда ответ
+отправляется частями по мере их появления, пока генератор не закончится или
+клиент не отключится.
+"""
+
+import asyncio
+import inspect
+import mimetypes
+from collections.abc import AsyncGenerator, Awaitable, Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs
+
+from app.conditional import ConditionalHandler, not_modified
+from app.router import Router
+
+Scope = dict[str, Any]
+Message = dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Response = tuple[str, list[tuple[str, str]], str | AsyncGenerator[str]]
+
+
+class AsgiApp:
+    def __init__(
+        self,
+        router: Router,
+        max_workers: int,
+        static_dir: Path | None = None,
+        static_url: str = '/static',
+        on_shutdown: Sequence[Callable[[], Awaitable[None]]] = (),
+    ):
+        self._router = router
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='asgi-worker'
+        )
+        self._static_dir = static_dir.resolve() if static_dir is not None else None
+        self._static_prefix = static_url.rstrip('/') + '/'
+        self._on_shutdown = list(on_shutdown)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] == 'lifespan':
+            await self._handle_lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self._handle_http(scope, receive, send)
+
+    async def _handle_lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for callback in self._on_shutdown:
+                    await callback()
+                self._executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _handle_http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        method = scope['method']
+        path = scope['path']
+
+        if self._static_dir is not None and path.startswith(self._static_prefix):
+            await self._send_static(
+                self._static_dir, path.removeprefix(self._static_prefix), send
+            )
+            return
+
+        handler, path_params = self._router.resolve(method=method, path=path)
+        if handler is None or path_params is None:
+            await self._send(
+                send,
+                '404 Not Found',
+                [('Content-Type', 'text/html; charset=utf-8')],
+                b'<h1>404 Not Found</h1>',
+            )
+            return
+
+        request_body = await self._read_body(receive)
+        try:
+            query_params = self._unpack_data(
+                parse_qs(scope.get('query_string', b'').decode('latin-1'))
+            )
+            form_data = self._unpack_data(parse_qs(request_body.decode('utf-8')))
+            kwargs = {**path_params, **query_params, **form_data}
+
+            if isinstance(handler, ConditionalHandler) and method == 'GET':
+                validators = await self._call_handler(handler.validators, kwargs)
+                request_headers = {
+                    name.decode('latin-1'): value.decode('latin-1')
+                    for name, value in scope.get('headers', [])
+                }
+                if validators is not None and validators.is_not_modified(
+                    request_headers.get('if-none-match'),
+                    request_headers.get('if-modified-since'),
+                ):
+                    status, headers, _ = not_modified(validators)
+                    await self._send(send, status, headers, b'')
+                    return
+                if handler.pass_validators:
+                    kwargs['validators'] = validators
+                handler = handler.handler
+
+            response: Response = await self._call_handler(handler, kwargs)
+            status, headers, body = response
+        except Exception:
+            await self._send(
+                send,
+                '500 Internal Server Error',
+                [('Content-type', 'text/html; charset=utf-8')],
+                b'<h1>500 Internal Server Error</h1>',
+            )
+            raise
+
+        if isinstance(body, str):
+            await self._send(send, status, headers, body.encode('utf-8'))
+        else:
+            await self._send_stream(receive, send, status, headers, body)
+
+    async def _call_handler(
+        self, handler: Callable[..., Any], kwargs: dict[str, Any]
+    ) -> Any:
+        if inspect.iscoroutinefunction(handler):
+            return await handler(**kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(handler, **kwargs))
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] != 'http.request':
+                break
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        return b''.join(chunks)
+
+    async def _send_static(
+        self, static_dir: Path, relative_path: str, send: Send
+    ) -> None:
+        file_path = (static_dir / relative_path).resolve()
+        if not file_path.is_relative_to(static_dir) or not file_path.is_file():
+            await self._send(
+                send,
+                '404 Not Found',
+                [('Content-Type', 'text/html; charset=utf-8')],
+                b'<h1>404 Not Found</h1>',
+            )
+            return
+
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(self._executor, file_path.read_bytes)
+        content_type, _ = mimetypes.guess_type(file_path.name)
+        await self._send(
+            send,
+            '200 OK',
+            [('Content-Type', content_type or 'application/octet-stream')],
+            body,
+        )
+
+    async def _send(
+        self, send: Send, status: str, headers: list[tuple[str, str]], body: bytes
+    ) -> None:
+        await self._send_start(send, status, headers)
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def _send_start(
+        self, send: Send, status: str, headers: list[tuple[str, str]]
+    ) -> None:
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [
+                    (name.lower().encode('latin-1'), value.encode('latin-1'))
+                    for name, value in headers
+                ],
+            }
+        )
+
+    async def _send_stream(
+        self,
+        receive: Receive,
+        send: Send,
+        status: str,
+        headers: list[tuple[str, str]],
+        body: AsyncGenerator[str],
+    ) -> None:
+        await self._send_start(send, status, headers)
+
+        # Поток может подолгу ждать следующей части, поэтому отключение
+        # клиента отслеживается параллельно и прерывает отправку.
+        stream_task = asyncio.ensure_future(self._send_chunks(send, body))
+        disconnect_task = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            await asyncio.wait(
+                {stream_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (stream_task, disconnect_task):
+                task.cancel()
+            await asyncio.gather(stream_task, disconnect_task, return_exceptions=True)
+            await body.aclose()
+
+        exception = None if stream_task.cancelled() else stream_task.exception()
+        if exception is not None:
+            raise exception
+
+    async def _send_chunks(self, send: Send, body: AsyncGenerator[str]) -> None:
+        async for chunk in body:
+            await send(
+                {
+                    'type': 'http.response.body',
+                    'body': chunk.encode('utf-8'),
+                    'more_body': True,
+                }
+            )
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def _wait_for_disconnect(self, receive: Receive) -> None:
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    def _unpack_data(self, raw_data: dict[str, list[str]]) -> dict[str, str]:
+        data = {}
+        for key, value in raw_data.items():
+            if len(value) > 1:
+                raise ValueError(
+                    f"Получено несколько значений для '{key}', но ожидалось одно."
+                )
+            data[key] = value[0]
+        return data
@@ -0,0 +1,166 @@
+"""
+Служебные команды для базы данных приложения.
+
+Запуск: uv run python -m app.cli <команда>
+"""
+
+import argparse
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+from app.database import Database
+from app.services import MatchImporter, MatchService, PlayerNameIndex, PlayerService
+from app.services.match_importer import ImportStats, InvalidRow, read_matches
+from app.settings import settings
+from app.store import InMemoryOngoingMatchStore
+
+
+def check_match_counters(db: Database, args: argparse.Namespace) -> int:
+    # Текущие матчи командам не нужны.
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    mismatches = match_srv.check_match_counters(rebuild=args.rebuild)
+    for player_id, (stored, actual) in sorted(mismatches.items()):
+        name = 'all matches' if player_id == 0 else f'player {player_id}'
+        print(f'{name}: counter {stored}, actual {actual}')
+
+    if args.rebuild:
+        print(f'Rebuilt match counters, {len(mismatches)} were out of date')
+        return 0
+    if mismatches:
+        print('Match counters are out of date, run with --rebuild')
+        return 1
+    print('Match counters are consistent')
+    return 0
+
+
+def rebuild_player_stats(db: Database, args: argparse.Namespace) -> int:
+    player_srv = PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+    rows = player_srv.rebuild_player_stats()
+    print(f'Rebuilt player stats, {rows} rows')
+    return 0
+
+
+def recompute_ratings(db: Database, args: argparse.Namespace) -> int:
+    player_srv = PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+    matches = player_srv.recompute_ratings(chunk_size=args.chunk_size)
+    print(f'Recomputed player ratings from {matches} matches')
+    return 0
+
+
+def export_matches(db: Database, args: argparse.Namespace) -> int:
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    chunks = match_srv.export_finished_matches(args.format, batch_size=args.batch_size)
+    if args.output is None:
+        sys.stdout.writelines(chunks)
+        return 0
+    with open(args.output, 'w', encoding='utf-8', newline='') as output:
+        output.writelines(chunks)
+    return 0
+
+
+def import_matches(db: Database, args: argparse.Namespace) -> int:
+    import_format = args.format
+    if import_format is None:
+        suffix = Path(args.path).suffix.lower()
+        import_format = 'ndjson' if suffix in ('.ndjson', '.jsonl') else 'csv'
+
+    def report_invalid(row: InvalidRow) -> None:
+        print(f'line {row.line}: {row.error}', file=sys.stderr)
+
+    def report_progress(stats: ImportStats) -> None:
+        print(
+            f'{stats.imported} imported, {stats.read} read '
+            f'({stats.read / stats.seconds:.0f} rows/s)',
+            file=sys.stderr,
+        )
+
+    importer = MatchImporter(db=db, chunk_size=args.chunk_size)
+    with (
+        nullcontext(sys.stdin)
+        if args.path == '-'
+        else open(args.path, encoding='utf-8', newline='')
+    ) as lines:
+        stats = importer.import_matches(
+            read_matches(lines, import_format),
+            on_invalid=report_invalid,
+            on_progress=report_progress,
+        )
+    print(
+        f'Imported {stats.imported} matches in {stats.seconds:.1f}s, '
+        f'skipped {stats.existing} already imported and {stats.invalid} invalid'
+    )
+    return 1 if stats.invalid else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.cli')
+    commands = parser.add_subparsers(required=True)
+
+    counters = commands.add_parser(
+        'check-match-counters',
+        help='compare finished-match counters with the Matches table',
+    )
+    counters.add_argument(
+        '--rebuild', action='store_true', help='recompute all counters'
+    )
+    counters.set_defaults(command=check_match_counters)
+
+    player_stats = commands.add_parser(
+        'rebuild-player-stats',
+        help='recompute player stats and head-to-head records from all matches',
+    )
+    player_stats.set_defaults(command=rebuild_player_stats)
+
+    ratings = commands.add_parser(
+        'recompute-ratings',
+        help='recompute Elo ratings from scratch over all matches in id order',
+    )
+    ratings.add_argument(
+        '--chunk-size',
+        type=int,
+        default=50_000,
+        help='matches read per query (default: 50000)',
+    )
+    ratings.set_defaults(command=recompute_ratings)
+
+    export = commands.add_parser(
+        'export-matches',
+        help='stream all finished matches with per-set scores as CSV or NDJSON',
+    )
+    export.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    export.add_argument('--output', help='file to write to (default: standard output)')
+    export.add_argument(
+        '--batch-size',
+        type=int,
+        default=1000,
+        help='matches fetched from the database at a time (default: 1000)',
+    )
+    export.set_defaults(command=export_matches)
+
+    import_ = commands.add_parser(
+        'import-matches',
+        help='bulk-load finished matches given as set scores or point sequences',
+    )
+    import_.add_argument('path', help="CSV or NDJSON file, '-' for standard input")
+    import_.add_argument(
+        '--format',
+        choices=['csv', 'ndjson'],
+        help='file format (default: ndjson for .ndjson and .jsonl files, else csv)',
+    )
+    import_.add_argument(
+        '--chunk-size',
+        type=int,
+        default=50_000,
+        help='matches written per transaction (default: 50000)',
+    )
+    import_.set_defaults(command=import_matches)
+
+    args = parser.parse_args(argv)
+    db = Database(db_url=settings.db_url, echo=settings.db_echo)
+    exit_code: int = args.command(db, args)
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Условные GET-запросы (`If-None-Match` / `If-Modified-Since`).
+
+Обработчик, поддерживающий условные запросы, регистрируется вместе с функцией
+валидаторов (`ConditionalHandler`): она по тем же параметрам запроса дешево
+вычисляет ETag и время изменения ответа, не рендеря его. Если валидаторы
+совпадают с присланными клиентом, приложение отвечает `304 Not Modified`,
+не вызывая обработчик. Сам обработчик отдает те же валидаторы в заголовках
+полного ответа; если валидаторы дорого вычислять, обработчик с `pass_validators`
+получает уже вычисленные аргументом `validators`.
+"""
+
+import hashlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Environment
+
+
+@dataclass(frozen=True)
+class Validators:
+    etag: str | None = None
+    last_modified: datetime | None = None
+
+    def headers(self) -> list[tuple[str, str]]:
+        headers = []
+        if self.etag is not None:
+            headers.append(('ETag', self.etag))
+        if self.last_modified is not None:
+            headers.append(
+                ('Last-Modified', format_datetime(self.last_modified, usegmt=True))
+            )
+        return headers
+
+    def is_not_modified(
+        self, if_none_match: str | None, if_modified_since: str | None
+    ) -> bool:
+        # If-Modified-Since учитывается, только если нет If-None-Match (RFC 9110).
+        if if_none_match is not None:
+            if self.etag is None:
+                return False
+            if if_none_match.strip() == '*':
+                return True
+            etag = self.etag.removeprefix('W/')
+            return any(
+                tag.strip().removeprefix('W/') == etag
+                for tag in if_none_match.split(',')
+            )
+
+        if if_modified_since is not None and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                return False
+            return self.last_modified.replace(microsecond=0) <= since
+        return False
+
+
+@dataclass(frozen=True)
+class ConditionalHandler:
+    """Обработчик вместе с функцией валидаторов его ответа."""
+
+    handler: Callable[..., Any]
+    validators: Callable[..., Any]
+    pass_validators: bool = False
+
+    def __call__(self, **kwargs: Any) -> Any:
+        return self.handler(**kwargs)
+
+
+def not_modified(validators: Validators) -> tuple[str, list[tuple[str, str]], str]:
+    return '304 Not Modified', validators.headers(), ''
+
+
+def make_etag(*parts: object) -> str:
+    digest = hashlib.blake2b(digest_size=12)
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        digest.update(b'\0')
+    return f'"{digest.hexdigest()}"'
+
+
+def template_mtime(jinja_env: Environment, name: str) -> datetime:
+    """Время изменения файла шаблона; шаблоны не из файлов считаются неизменными."""
+    filename = jinja_env.get_template(name).filename
+    if filename is None:
+        return datetime.fromtimestamp(0, UTC)
+    return datetime.fromtimestamp(Path(filename).stat().st_mtime, UTC)
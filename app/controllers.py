@@ -1,38 +1,84 @@
+import asyncio
+import json
 import uuid as uuid_pkg
+from collections.abc import AsyncGenerator, Generator
 from typing import Any
 
 from jinja2 import Environment
 from pydantic import ValidationError
 
+from app.conditional import Validators, make_etag, template_mtime
+from app.database import Database
+from app.domain import OngoingMatch
+from app.domain.codec import encode_ongoing_match
 from app.exceptions import MatchNotFoundError
-from app.schemas import CreateMatchSchema, PointWinnerSchema
-from app.services import MatchService
+from app.render_cache import RenderCache, RenderedPage
+from app.schemas import CreateMatchSchema, PointWinnerSchema, PointWinnersSchema
+from app.services import (
+    MatchService,
+    PlayerCache,
+    PlayerService,
+    ScoreSubscription,
+)
+from app.services.match_export import EXPORT_CONTENT_TYPES
+from app.services.match_service import PaginatedMatchesDict
+from app.settings import settings
+
+
+def _template_validators(jinja_env: Environment, name: str) -> Validators:
+    # Страница без данных меняется только вместе с шаблоном.
+    mtime = template_mtime(jinja_env, name)
+    return Validators(etag=make_etag(name, mtime.timestamp()), last_modified=mtime)
 
 
 class MainController:
     def __init__(self, jinja_env: Environment):
         self._jinja = jinja_env
 
+    def index_page_validators(self) -> Validators:
+        return _template_validators(self._jinja, 'index.html')
+
     def show_index_page(self) -> tuple[str, list[tuple[str, str]], str]:
         template = self._jinja.get_template('index.html')
         html_body = template.render()
 
         status = '200 OK'
-        headers = [('Content-Type', 'text/html; charset=utf-8')]
+        headers = [
+            ('Content-Type', 'text/html; charset=utf-8'),
+            *self.index_page_validators().headers(),
+        ]
         return status, headers, html_body
 
 
 class MatchController:
-    def __init__(self, jinja_env: Environment, match_srv: MatchService):
+    def __init__(
+        self,
+        jinja_env: Environment,
+        match_srv: MatchService,
+        render_cache: RenderCache | None = None,
+        live_updates: bool = False,
+    ):
         self._jinja = jinja_env
         self._match_srv = match_srv
+        self._render_cache = render_cache or RenderCache(
+            max_entries=settings.match_score_render_cache_size
+        )
+        # Страница счета подписывается на `/match-score/stream`, только если
+        # этот маршрут зарегистрирован (ASGI).
+        self._live_updates = live_updates
+
+    def new_match_page_validators(self) -> Validators:
+        return _template_validators(self._jinja, 'new-match.html')
 
     def show_new_match_page(self) -> tuple[str, list[tuple[str, str]], str]:
         template = self._jinja.get_template('new-match.html')
         html_body = template.render()
 
         status = '200 OK'
-        headers = [('Content-Type', 'text/html; charset=utf-8')]
+        headers = [
+            ('Content-Type', 'text/html; charset=utf-8'),
+            *self.new_match_page_validators().headers(),
+        ]
         return status, headers, html_body
 
     def handle_new_match_creation(
@@ -65,6 +111,15 @@ class MatchController:
         body = ''
         return status, headers, body
 
+    def match_score_page_validators(self, uuid: str) -> Validators | None:
+        try:
+            ongoing_match = self._match_srv.get_ongoing_match(uuid_pkg.UUID(uuid))
+        except (ValueError, MatchNotFoundError):
+            return None
+        if ongoing_match.is_finished:
+            return None
+        return Validators(etag=self._match_score_etag(ongoing_match))
+
     def show_match_score_page(
         self, uuid: str
     ) -> tuple[str, list[tuple[str, str]], str]:
@@ -83,14 +138,60 @@ class MatchController:
             html_body = '<h1>404 Not Found: Match not found</h1>'
             return status, headers, html_body
 
-        context = ongoing_match.get_view_model()
+        return self._render_match_score_page(ongoing_match)
 
-        template = self._jinja.get_template('match-score.html')
-        html_body = template.render(context)
+    async def stream_match_score(
+        self, uuid: str
+    ) -> tuple[str, list[tuple[str, str]], str | AsyncGenerator[str]]:
+        try:
+            match_uuid = uuid_pkg.UUID(uuid)
+        except ValueError:
+            status = '400 Bad Request'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>400 Bad Request: Invalid UUID format</h1>'
+            return status, headers, html_body
+
+        try:
+            ongoing_match, subscription = await self._match_srv.subscribe_to_match(
+                match_uuid
+            )
+        except MatchNotFoundError:
+            status = '404 Not Found'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>404 Not Found: Match not found</h1>'
+            return status, headers, html_body
 
         status = '200 OK'
-        headers = [('Content-Type', 'text/html; charset=utf-8')]
-        return status, headers, html_body
+        headers = [
+            ('Content-Type', 'text/event-stream; charset=utf-8'),
+            ('Cache-Control', 'no-cache'),
+            ('X-Accel-Buffering', 'no'),
+        ]
+        return status, headers, self._stream_score_events(ongoing_match, subscription)
+
+    async def _stream_score_events(
+        self, ongoing_match: OngoingMatch, subscription: ScoreSubscription
+    ) -> AsyncGenerator[str]:
+        # Первое событие - полный счет, следующие - только изменившиеся поля.
+        # Поток закрывается после события с завершением матча.
+        try:
+            snapshot = json.dumps(ongoing_match.get_view_model())
+            yield f'event: snapshot\ndata: {snapshot}\n\n'
+            if ongoing_match.is_finished:
+                return
+            while not subscription.is_finished:
+                try:
+                    data = await asyncio.wait_for(
+                        subscription.get(),
+                        timeout=settings.live_score_heartbeat_interval,
+                    )
+                except TimeoutError:
+                    # Комментарий не дает прокси закрыть простаивающее соединение.
+                    yield ': heartbeat\n\n'
+                    continue
+                yield f'event: score\ndata: {data}\n\n'
+        finally:
+            subscription.close()
 
     def handle_score_update(
         self, uuid: str, **form_data: Any
@@ -112,34 +213,356 @@ class MatchController:
             html_body = '<h1>404 Not Found: Match not found</h1>'
             return status, headers, html_body
 
-        context = ongoing_match.get_view_model()
+        return self._render_match_score_page(ongoing_match)
 
-        template = self._jinja.get_template('match-score.html')
-        html_body = template.render(context)
+    def handle_batch_score_update(
+        self, uuid: str, **form_data: Any
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        try:
+            match_uuid = uuid_pkg.UUID(uuid)
+        except ValueError:
+            status = '400 Bad Request'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>400 Bad Request: Invalid UUID format</h1>'
+            return status, headers, html_body
+
+        try:
+            validated_data = PointWinnersSchema(**form_data)
+        except ValidationError:
+            status = '400 Bad Request'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>400 Bad Request: Invalid point winners</h1>'
+            return status, headers, html_body
+
+        try:
+            ongoing_match = self._match_srv.record_points(
+                uuid=match_uuid, point_winners=validated_data.point_winners
+            )
+        except MatchNotFoundError:
+            status = '404 Not Found'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>404 Not Found: Match not found</h1>'
+            return status, headers, html_body
+
+        return self._render_match_score_page(ongoing_match)
+
+    def _render_match_score_page(
+        self, ongoing_match: OngoingMatch
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        def render() -> str:
+            template = self._jinja.get_template('match-score.html')
+            return template.render(
+                ongoing_match.get_view_model(), live_updates=self._live_updates
+            )
+
+        if ongoing_match.is_finished:
+            # Завершенный матч по UUID больше не показывается: кэшировать нечего.
+            self._render_cache.invalidate(ongoing_match.uuid)
+            html_body = render()
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+        else:
+            page = self._render_cache.get_or_render(
+                ongoing_match.uuid,
+                ongoing_match.version,
+                lambda: RenderedPage(
+                    html=render(), etag=self._match_score_etag(ongoing_match)
+                ),
+            )
+            html_body = page.html
+            headers = [
+                ('Content-Type', 'text/html; charset=utf-8'),
+                ('ETag', page.etag),
+            ]
 
         status = '200 OK'
-        headers = [('Content-Type', 'text/html; charset=utf-8')]
         return status, headers, html_body
 
+    def _match_score_etag(self, ongoing_match: OngoingMatch) -> str:
+        mtime = template_mtime(self._jinja, 'match-score.html')
+        return make_etag(
+            encode_ongoing_match(ongoing_match), mtime.timestamp(), self._live_updates
+        )
+
+    def matches_page_validators(
+        self,
+        page: str = '1',
+        filter_by_player_name: str | None = None,
+        after_id: str | None = None,
+        before_id: str | None = None,
+    ) -> Validators:
+        player_name = None
+        if filter_by_player_name:
+            player_name = self._match_srv.resolve_player_name(filter_by_player_name)
+        return self._matches_page_validators(
+            self._match_srv.get_finished_matches_version(),
+            page,
+            filter_by_player_name,
+            player_name,
+            after_id,
+            before_id,
+        )
+
+    async def matches_page_validators_async(
+        self,
+        page: str = '1',
+        filter_by_player_name: str | None = None,
+        after_id: str | None = None,
+        before_id: str | None = None,
+    ) -> Validators:
+        player_name = None
+        if filter_by_player_name:
+            player_name = await self._match_srv.resolve_player_name_async(
+                filter_by_player_name
+            )
+        return self._matches_page_validators(
+            await self._match_srv.get_finished_matches_version_async(),
+            page,
+            filter_by_player_name,
+            player_name,
+            after_id,
+            before_id,
+        )
+
     def show_matches_page(
-        self, page: str = '1', filter_by_player_name: str | None = None
+        self,
+        page: str = '1',
+        filter_by_player_name: str | None = None,
+        after_id: str | None = None,
+        before_id: str | None = None,
+        validators: Validators | None = None,
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        # Маршрут передает валидаторы, уже вычисленные для условного запроса.
+        if validators is None:
+            validators = self.matches_page_validators(
+                page, filter_by_player_name, after_id, before_id
+            )
+        paginated_data = self._match_srv.get_finished_matches_paginated(
+            page=self._parse_page(page),
+            player_name=filter_by_player_name,
+            after_id=self._parse_cursor(after_id),
+            before_id=self._parse_cursor(before_id),
+        )
+        return self._render_matches_page(
+            paginated_data, filter_by_player_name, validators
+        )
+
+    async def show_matches_page_async(
+        self,
+        page: str = '1',
+        filter_by_player_name: str | None = None,
+        after_id: str | None = None,
+        before_id: str | None = None,
+        validators: Validators | None = None,
     ) -> tuple[str, list[tuple[str, str]], str]:
+        if validators is None:
+            validators = await self.matches_page_validators_async(
+                page, filter_by_player_name, after_id, before_id
+            )
+        paginated_data = await self._match_srv.get_finished_matches_paginated_async(
+            page=self._parse_page(page),
+            player_name=filter_by_player_name,
+            after_id=self._parse_cursor(after_id),
+            before_id=self._parse_cursor(before_id),
+        )
+        return self._render_matches_page(
+            paginated_data, filter_by_player_name, validators
+        )
+
+    def _matches_page_validators(
+        self,
+        finished_version: tuple[int, int],
+        page: str,
+        filter_by_player_name: str | None,
+        player_name: str | None,
+        after_id: str | None,
+        before_id: str | None,
+    ) -> Validators:
+        # Версия берется до чтения страницы: если матч добавится между ними,
+        # ETag окажется старее ответа и клиент просто получит страницу заново.
+        # Фильтр по началу имени может начать указывать на другого игрока,
+        # поэтому в ETag входит и найденное по нему имя.
+        mtime = template_mtime(self._jinja, 'matches.html')
+        etag = make_etag(
+            finished_version,
+            self._parse_page(page),
+            filter_by_player_name or '',
+            player_name or '',
+            self._parse_cursor(after_id),
+            self._parse_cursor(before_id),
+            mtime.timestamp(),
+        )
+        return Validators(etag=etag)
+
+    def _parse_page(self, page: str) -> int:
         try:
             page_num = int(page)
             if page_num < 1:
                 page_num = 1
         except (ValueError, TypeError):
             page_num = 1
+        return page_num
 
-        paginated_data = self._match_srv.get_finished_matches_paginated(
-            page=page_num, player_name=filter_by_player_name
-        )
+    def _parse_cursor(self, cursor: str | None) -> int | None:
+        try:
+            return int(cursor) if cursor else None
+        except ValueError:
+            return None
 
-        context = {**paginated_data, 'filter_by_player_name': filter_by_player_name}
+    def _render_matches_page(
+        self,
+        paginated_data: PaginatedMatchesDict,
+        filter_by_player_name: str | None,
+        validators: Validators,
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        # Номера страниц показываются окном вокруг текущей: при миллионах матчей
+        # полный список ссылок был бы огромным. Для страницы по курсору число
+        # страниц не считается, и окно заканчивается на текущей.
+        current_page = paginated_data['current_page']
+        last_page = paginated_data['total_pages'] or current_page
+        page_numbers = list(
+            range(max(1, current_page - 3), min(last_page, current_page + 3) + 1)
+        )
+        context = {
+            **paginated_data,
+            'page_numbers': page_numbers,
+            'filter_by_player_name': filter_by_player_name,
+        }
 
         template = self._jinja.get_template('matches.html')
         html_body = template.render(context)
 
+        status = '200 OK'
+        headers = [('Content-Type', 'text/html; charset=utf-8'), *validators.headers()]
+        return status, headers, html_body
+
+    def export_matches(
+        self, format: str = 'csv'
+    ) -> tuple[str, list[tuple[str, str]], str | Generator[str]]:
+        """Все завершенные матчи файлом CSV или NDJSON, потоком по мере чтения."""
+        if format not in EXPORT_CONTENT_TYPES:
+            status = '400 Bad Request'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>400 Bad Request: Unknown export format</h1>'
+            return status, headers, html_body
+
+        status = '200 OK'
+        headers = [
+            ('Content-Type', EXPORT_CONTENT_TYPES[format]),
+            ('Content-Disposition', f'attachment; filename="matches.{format}"'),
+        ]
+        return status, headers, self._match_srv.export_finished_matches(format)
+
+
+class PlayerController:
+    def __init__(self, jinja_env: Environment, player_srv: PlayerService):
+        self._jinja = jinja_env
+        self._player_srv = player_srv
+
+    def show_player_page(
+        self, player_id: str
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        try:
+            player_stats = self._player_srv.get_player_stats(int(player_id))
+        except ValueError:
+            player_stats = None
+        if player_stats is None:
+            status = '404 Not Found'
+            headers = [('Content-Type', 'text/html; charset=utf-8')]
+            html_body = '<h1>404 Not Found: Player not found</h1>'
+            return status, headers, html_body
+
+        template = self._jinja.get_template('player.html')
+        html_body = template.render(player=player_stats)
+
+        status = '200 OK'
+        headers = [('Content-Type', 'text/html; charset=utf-8')]
+        return status, headers, html_body
+
+    def show_leaderboard_page(self) -> tuple[str, list[tuple[str, str]], str]:
+        template = self._jinja.get_template('leaderboard.html')
+        html_body = template.render(players=self._player_srv.get_leaderboard())
+
         status = '200 OK'
         headers = [('Content-Type', 'text/html; charset=utf-8')]
         return status, headers, html_body
+
+    def search_players(self, q: str = '') -> tuple[str, list[tuple[str, str]], str]:
+        """Подсказки имен игроков для поля фильтра (JSON-список имен)."""
+        names = self._player_srv.search_player_names(q)
+
+        status = '200 OK'
+        headers = [('Content-Type', 'application/json')]
+        return status, headers, json.dumps(names)
+
+
+class MetricsController:
+    """Метрики в текстовом формате Prometheus."""
+
+    def __init__(
+        self,
+        render_cache: RenderCache,
+        player_cache: PlayerCache | None = None,
+        db: Database | None = None,
+    ):
+        self._render_cache = render_cache
+        self._player_cache = player_cache
+        self._db = db
+
+    def show_metrics(self) -> tuple[str, list[tuple[str, str]], str]:
+        stats = self._render_cache.stats()
+        metrics: list[tuple[str, str, int | float]] = [
+            ('match_score_render_cache_hits_total', 'counter', stats['hits']),
+            ('match_score_render_cache_misses_total', 'counter', stats['misses']),
+            (
+                'match_score_render_cache_evictions_total',
+                'counter',
+                stats['evictions'],
+            ),
+            (
+                'match_score_render_cache_invalidations_total',
+                'counter',
+                stats['invalidations'],
+            ),
+            ('match_score_render_cache_entries', 'gauge', stats['size']),
+        ]
+        if self._player_cache is not None:
+            player_stats = self._player_cache.stats()
+            metrics += [
+                ('player_cache_hits_total', 'counter', player_stats['hits']),
+                ('player_cache_misses_total', 'counter', player_stats['misses']),
+                ('player_cache_evictions_total', 'counter', player_stats['evictions']),
+                ('player_cache_entries', 'gauge', player_stats['size']),
+            ]
+        if self._db is not None:
+            pool_stats = self._db.pool_stats()
+            metrics += [
+                ('db_pool_checkouts_total', 'counter', pool_stats['checkouts']),
+                (
+                    'db_pool_checkout_wait_seconds_total',
+                    'counter',
+                    pool_stats['checkout_wait_seconds'],
+                ),
+                (
+                    'db_pool_checkout_timeouts_total',
+                    'counter',
+                    pool_stats['checkout_timeouts'],
+                ),
+                ('db_pool_connections_in_use', 'gauge', pool_stats['in_use']),
+                ('db_pool_size', 'gauge', pool_stats['size']),
+                ('db_pool_overflow', 'gauge', pool_stats['overflow']),
+                (
+                    'db_pool_overflow_connections_total',
+                    'counter',
+                    pool_stats['overflow_connections'],
+                ),
+            ]
+
+        lines = []
+        for name, kind, value in metrics:
+            lines.append(f'# TYPE {name} {kind}')
+            lines.append(f'{name} {value}')
+        body = '\n'.join(lines) + '\n'
+
+        status = '200 OK'
+        headers = [('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')]
+        return status, headers, body
@@ -1,19 +1,154 @@
-from collections.abc import Generator
-from contextlib import contextmanager
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, TypedDict
 
-from sqlalchemy import create_engine
+from sqlalchemy import URL, Engine, create_engine, event, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+
+def _engine_options(
+    pool_size: int | None,
+    max_overflow: int | None,
+    pool_timeout: float | None,
+    pool_recycle: int,
+    pool_pre_ping: bool,
+    query_cache_size: int,
+) -> dict[str, Any]:
+    # Размеры пула передаются, только если заданы: пулы SQLite в памяти их
+    # не принимают.
+    options: dict[str, Any] = {
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': pool_pre_ping,
+        'query_cache_size': query_cache_size,
+    }
+    for name, value in [
+        ('pool_size', pool_size),
+        ('max_overflow', max_overflow),
+        ('pool_timeout', pool_timeout),
+    ]:
+        if value is not None:
+            options[name] = value
+    return options
+
+
+class PoolStats(TypedDict):
+    checkouts: int
+    checkout_wait_seconds: float
+    checkout_timeouts: int
+    in_use: int
+    # Размер пула и число соединений сверх него; 0 для пулов без размера.
+    size: int
+    overflow: int
+    overflow_connections: int
+
+
+class PoolMetrics:
+    """
+    Использование пула соединений: выдачи и возвраты соединений и открытие
+    соединений сверх размера пула считаются по событиям пула SQLAlchemy.
+    События до начала ожидания соединения нет, поэтому ожидание измеряет
+    `Database.get_session` при получении соединения.
+    """
+
+    def __init__(self, engine: Engine):
+        self._engine = engine
+        self._lock = threading.Lock()
+        self._checkouts = 0
+        self._wait_seconds = 0.0
+        self._timeouts = 0
+        self._in_use = 0
+        self._overflow_connections = 0
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'connect', self._on_connect)
+
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._wait_seconds += seconds
+
+    def observe_timeout(self) -> None:
+        with self._lock:
+            self._timeouts += 1
+
+    def stats(self) -> PoolStats:
+        pool = self._engine.pool
+        size, overflow = 0, 0
+        if isinstance(pool, QueuePool):
+            size, overflow = pool.size(), max(pool.overflow(), 0)
+        with self._lock:
+            return {
+                'checkouts': self._checkouts,
+                'checkout_wait_seconds': self._wait_seconds,
+                'checkout_timeouts': self._timeouts,
+                'in_use': self._in_use,
+                'size': size,
+                'overflow': overflow,
+                'overflow_connections': self._overflow_connections,
+            }
+
+    def _on_checkout(self, *args: Any) -> None:
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+
+    def _on_checkin(self, *args: Any) -> None:
+        with self._lock:
+            self._in_use -= 1
+
+    def _on_connect(self, *args: Any) -> None:
+        # Счетчик переполнения растет до открытия соединения: соединение,
+        # открытое при положительном счетчике, - сверх размера пула.
+        pool = self._engine.pool
+        if isinstance(pool, QueuePool) and pool.overflow() > 0:
+            with self._lock:
+                self._overflow_connections += 1
 
 
 class Database:
-    def __init__(self, db_url: str, echo: bool):
-        self._engine = create_engine(url=db_url, echo=echo)
+    def __init__(
+        self,
+        db_url: str,
+        echo: bool,
+        pool_size: int | None = None,
+        max_overflow: int | None = None,
+        pool_timeout: float | None = None,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        query_cache_size: int = 500,
+    ):
+        self._engine = create_engine(
+            url=db_url,
+            echo=echo,
+            **_engine_options(
+                pool_size,
+                max_overflow,
+                pool_timeout,
+                pool_recycle,
+                pool_pre_ping,
+                query_cache_size,
+            ),
+        )
         self._session_factory = sessionmaker(bind=self._engine, autoflush=False)
+        self._pool_metrics = PoolMetrics(self._engine)
+
+    def pool_stats(self) -> PoolStats:
+        return self._pool_metrics.stats()
 
     @contextmanager
     def get_session(self) -> Generator[Session]:
         session = self._session_factory()
         try:
+            self._connect(session)
             yield session
             session.commit()
         except Exception:
@@ -21,3 +156,85 @@ class Database:
             raise
         finally:
             session.close()
+
+    def _connect(self, session: Session) -> None:
+        # Соединение берется сразу, а не при первом запросе, чтобы измерить
+        # ожидание свободного соединения в пуле.
+        started = time.perf_counter()
+        try:
+            session.connection()
+        except PoolTimeoutError:
+            self._pool_metrics.observe_timeout()
+            raise
+        finally:
+            self._pool_metrics.observe_wait(time.perf_counter() - started)
+
+
+class AsyncDatabase:
+    """
+    Асинхронный доступ к той же БД, что и `Database`. Синхронный драйвер
+    в `db_url` заменяется асинхронным (asyncpg для PostgreSQL, aiosqlite
+    для SQLite). Движок создается при первой сессии: WSGI-сервер, которому
+    асинхронный доступ не нужен, не требует асинхронного драйвера.
+    """
+
+    _ASYNC_DRIVERS = {'postgresql': 'asyncpg', 'sqlite': 'aiosqlite'}
+
+    def __init__(
+        self,
+        db_url: str,
+        echo: bool,
+        pool_size: int | None = None,
+        max_overflow: int | None = None,
+        pool_timeout: float | None = None,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        query_cache_size: int = 500,
+    ):
+        self._db_url = db_url
+        self._echo = echo
+        self._engine_options = _engine_options(
+            pool_size,
+            max_overflow,
+            pool_timeout,
+            pool_recycle,
+            pool_pre_ping,
+            query_cache_size,
+        )
+        self._engine: AsyncEngine | None = None
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+
+    def _get_session_factory(self) -> async_sessionmaker[AsyncSession]:
+        if self._session_factory is None:
+            self._engine = create_async_engine(
+                url=self._to_async_url(self._db_url),
+                echo=self._echo,
+                **self._engine_options,
+            )
+            self._session_factory = async_sessionmaker(
+                bind=self._engine, autoflush=False, expire_on_commit=False
+            )
+        return self._session_factory
+
+    @asynccontextmanager
+    async def get_session(self) -> AsyncGenerator[AsyncSession]:
+        session = self._get_session_factory()()
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def dispose(self) -> None:
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    def _to_async_url(self, db_url: str) -> URL:
+        url = make_url(db_url)
+        driver = self._ASYNC_DRIVERS.get(url.get_backend_name())
+        if driver is None:
+            raise ValueError(f'No async driver for database URL: {db_url}')
+        return url.set(drivername=f'{url.get_backend_name()}+{driver}')
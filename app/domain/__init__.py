@@ -9,8 +9,9 @@
 - Вся сложная, "богатая" бизнес-логика (Rich Domain Model) инкапсулирована здесь.
 """
 
+from .compact_score import CompactScore
 from .ongoing_match import OngoingMatch
 from .player import Player
 from .score import PlayerIdentifier, Score
 
-__all__ = ['Score', 'OngoingMatch', 'Player', 'PlayerIdentifier']
+__all__ = ['Score', 'CompactScore', 'OngoingMatch', 'Player', 'PlayerIdentifier']
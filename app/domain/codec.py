@@ -0,0 +1,225 @@
+"""
+Бинарная сериализация текущего матча и счета.
+
+Формат версионирован: первый байт - номер версии. Целые числа переменной
+длины кодируются как беззнаковые LEB128 (varint).
+
+Счет упаковывается через состояние `CompactScore`: заголовок из двух байт
+содержит состояние текущего сета, счет по сетам и флаг переполнения
+тай-брейка, а каждый сыгранный сет занимает один байт (плюс varint очков
+проигравшего в тай-брейке). Счет нового матча занимает 2 байта, завершенного
+в двух сетах без тай-брейков - 4. Матч хранит также номер изменения
+(`OngoingMatch.version`, varint после игроков).
+"""
+
+from __future__ import annotations
+
+import uuid as uuid_pkg
+
+from app.exceptions import InconsistentMatchStateError, SerializationError
+
+from .compact_score import _STATES_COUNT, CompactScore
+from .ongoing_match import OngoingMatch
+from .player import Player
+from .score import PlayerIdentifier, Score, SetResult, TieBreakResult, TieBreakScore
+
+FORMAT_VERSION = 1
+
+# Заголовок счета: ((state * 9 + p1_sets * 3 + p2_sets) << 1) | overflow_flag.
+_SET_VALUES = OngoingMatch._SETS_TO_WIN_MATCH + 1
+_SCORE_HEADER_SIZE = 2
+
+# Байт сыгранного сета: p1_games * 8 + p2_games и флаг тай-брейка.
+_SET_GAME_VALUES = 8
+_SET_TIE_BREAK_FLAG = 0x40
+_MIN_TIE_BREAK_WINNER_POINTS = TieBreakScore._POINTS_TO_WIN_TIE_BREAK
+
+
+def encode_ongoing_match(ongoing_match: OngoingMatch) -> bytes:
+    buffer = bytearray([FORMAT_VERSION])
+    buffer += ongoing_match.uuid.bytes
+    for player in (ongoing_match.player1, ongoing_match.player2):
+        _write_varint(buffer, player.id)
+        name = player.name.encode('utf-8')
+        _write_varint(buffer, len(name))
+        buffer += name
+    _write_varint(buffer, ongoing_match.version)
+    _write_score(buffer, ongoing_match.score)
+    return bytes(buffer)
+
+
+def decode_ongoing_match(data: bytes) -> OngoingMatch:
+    reader = _Reader(data)
+    version = reader.read_byte()
+    if version != FORMAT_VERSION:
+        raise SerializationError(f'Unsupported ongoing match format version: {version}')
+
+    match_uuid = uuid_pkg.UUID(bytes=reader.read_bytes(16))
+    players = []
+    for _ in range(2):
+        player_id = reader.read_varint()
+        name = reader.read_bytes(reader.read_varint()).decode('utf-8')
+        players.append(Player(id=player_id, name=name))
+
+    match_version = reader.read_varint()
+    score = _read_score(reader)
+    reader.ensure_consumed()
+
+    return OngoingMatch(
+        player1=players[0],
+        player2=players[1],
+        uuid=match_uuid,
+        score=score,
+        version=match_version,
+    )
+
+
+def encode_score(score: Score) -> bytes:
+    return encode_versioned_score(score, 0)
+
+
+def decode_score(data: bytes) -> Score:
+    score, _ = decode_versioned_score(data)
+    return score
+
+
+def encode_versioned_score(score: Score, match_version: int) -> bytes:
+    """Счет вместе с номером изменения матча, к которому он относится."""
+    buffer = bytearray([FORMAT_VERSION])
+    _write_varint(buffer, match_version)
+    _write_score(buffer, score)
+    return bytes(buffer)
+
+
+def decode_versioned_score(data: bytes) -> tuple[Score, int]:
+    reader = _Reader(data)
+    version = reader.read_byte()
+    if version != FORMAT_VERSION:
+        raise SerializationError(f'Unsupported score format version: {version}')
+    match_version = reader.read_varint()
+    score = _read_score(reader)
+    reader.ensure_consumed()
+    return score, match_version
+
+
+def _write_score(buffer: bytearray, score: Score) -> None:
+    if max(score.sets) >= _SET_VALUES or len(score.finished_sets) != sum(score.sets):
+        raise SerializationError(f'Cannot encode score: {score!r}')
+    try:
+        compact_score = CompactScore.from_score(score)
+    except InconsistentMatchStateError as e:
+        raise SerializationError(f'Cannot encode score: {score!r}') from e
+
+    p1_sets, p2_sets = score.sets
+    header = (compact_score.state * _SET_VALUES + p1_sets) * _SET_VALUES + p2_sets
+    header = (header << 1) | bool(compact_score.tie_break_overflow)
+    buffer += header.to_bytes(_SCORE_HEADER_SIZE, 'little')
+    if compact_score.tie_break_overflow:
+        _write_varint(buffer, compact_score.tie_break_overflow)
+
+    for set_result in score.finished_sets:
+        _write_set_result(buffer, set_result)
+
+
+def _write_set_result(buffer: bytearray, set_result: SetResult) -> None:
+    p1_games, p2_games = set_result.games
+    if not (0 <= p1_games < _SET_GAME_VALUES and 0 <= p2_games < _SET_GAME_VALUES):
+        raise SerializationError(f'Cannot encode set result: {set_result!r}')
+
+    code = p1_games * _SET_GAME_VALUES + p2_games
+    if set_result.tie_break is None:
+        buffer.append(code)
+        return
+
+    # Очки победителя тай-брейка однозначно восстанавливаются по очкам
+    # проигравшего, поэтому хранятся только последние.
+    winner = PlayerIdentifier.ONE if p1_games > p2_games else PlayerIdentifier.TWO
+    winner_points = set_result.tie_break.points[winner]
+    loser_points = set_result.tie_break.points[winner.opponent]
+    if winner_points != max(_MIN_TIE_BREAK_WINNER_POINTS, loser_points + 2):
+        raise SerializationError(f'Cannot encode set result: {set_result!r}')
+    buffer.append(code | _SET_TIE_BREAK_FLAG)
+    _write_varint(buffer, loser_points)
+
+
+def _read_score(reader: _Reader) -> Score:
+    header = int.from_bytes(reader.read_bytes(_SCORE_HEADER_SIZE), 'little')
+    has_overflow = header & 1
+    state, sets_code = divmod(header >> 1, _SET_VALUES * _SET_VALUES)
+    sets = divmod(sets_code, _SET_VALUES)
+    if state >= _STATES_COUNT:
+        raise SerializationError(f'Invalid score state: {state}')
+    overflow = reader.read_varint() if has_overflow else 0
+
+    finished_sets = tuple(_read_set_result(reader) for _ in range(sum(sets)))
+    try:
+        return CompactScore(
+            state=state,
+            sets=sets,
+            tie_break_overflow=overflow,
+            finished_sets=finished_sets,
+        ).to_score()
+    except InconsistentMatchStateError as e:
+        raise SerializationError(f'Invalid score state: {state}') from e
+
+
+def _read_set_result(reader: _Reader) -> SetResult:
+    code = reader.read_byte()
+    if code & ~(_SET_TIE_BREAK_FLAG | (_SET_GAME_VALUES * _SET_GAME_VALUES - 1)):
+        raise SerializationError(f'Invalid set result: {code}')
+    games = divmod(code & ~_SET_TIE_BREAK_FLAG, _SET_GAME_VALUES)
+    if not code & _SET_TIE_BREAK_FLAG:
+        return SetResult(games=games)
+
+    loser_points = reader.read_varint()
+    winner_points = max(_MIN_TIE_BREAK_WINNER_POINTS, loser_points + 2)
+    points = (
+        (winner_points, loser_points)
+        if games[0] > games[1]
+        else (loser_points, winner_points)
+    )
+    return SetResult(games=games, tie_break=TieBreakResult(points=points))
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    if value < 0:
+        raise SerializationError(f'Cannot encode negative value: {value}')
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self._data = data
+        self._offset = 0
+
+    def read_byte(self) -> int:
+        if self._offset >= len(self._data):
+            raise SerializationError('Unexpected end of data')
+        value = self._data[self._offset]
+        self._offset += 1
+        return value
+
+    def read_bytes(self, size: int) -> bytes:
+        end = self._offset + size
+        if end > len(self._data):
+            raise SerializationError('Unexpected end of data')
+        value = self._data[self._offset : end]
+        self._offset = end
+        return value
+
+    def read_varint(self) -> int:
+        result = 0
+        shift = 0
+        while True:
+            byte = self.read_byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+    def ensure_consumed(self) -> None:
+        if self._offset != len(self._data):
+            raise SerializationError('Trailing data after ongoing match')
@@ -0,0 +1,289 @@
+"""
+Табличный движок подсчета очков.
+
+`CompactScore` хранит состояние текущего сета (очки или очки тай-брейка и геймы)
+в одном целом числе и переходит между состояниями через заранее вычисленную
+таблицу. Таблица строится один раз при импорте прогоном эталонного
+`Score.add_point` по всем достижимым состояниям сета, поэтому результаты
+движков совпадают по построению. Объекты `Score`/`ViewScore` создаются только
+по запросу (для представления или сохранения).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import ClassVar
+
+from app.exceptions import InconsistentMatchStateError
+
+from .score import (
+    FinalScoreDict,
+    PlayerIdentifier,
+    Score,
+    SetResult,
+    TieBreakResult,
+    TieBreakScore,
+    ViewScore,
+)
+
+PointState = Score.PointState
+
+_POINT_STATES: tuple[PointState, ...] = tuple(PointState)
+_POINT_STATE_INDEX: dict[PointState, int] = {
+    state: index for index, state in enumerate(_POINT_STATES)
+}
+
+# Раскладка состояния: state = games_code * _SUB_STATES + sub_state, где
+# games_code = p1_games * _GAME_VALUES + p2_games, а sub_state - индекс пары очков
+# (p1 * 5 + p2 в обычном гейме, p1 * 8 + p2 в тай-брейке).
+_GAME_VALUES = 7
+_TIE_BREAK_VALUES = 8
+_SUB_STATES = _TIE_BREAK_VALUES * _TIE_BREAK_VALUES
+_STATES_COUNT = _GAME_VALUES * _GAME_VALUES * _SUB_STATES
+
+# Запись таблицы переходов: младшие биты - следующее состояние, старшие - флаги.
+_STATE_BITS = 12
+_STATE_MASK = (1 << _STATE_BITS) - 1
+_SET_WON = 1 << _STATE_BITS
+_TIE_BREAK_OVERFLOW = 2 << _STATE_BITS
+_INVALID = -1
+
+# Тай-брейк при счете от 6:6 и выше повторяется, поэтому такие состояния
+# нормализуются вычитанием по одному очку у обоих игроков. Количество вычитаний
+# хранится отдельно (`CompactScore.tie_break_overflow`).
+_TIE_BREAK_NORMALIZATION_FLOOR = 6
+
+_DecodedState = tuple[
+    tuple[int, int], tuple[PointState, PointState], tuple[int, int] | None
+]
+
+
+def _encode(
+    games: tuple[int, int],
+    points: tuple[PointState, PointState],
+    tie_break_points: tuple[int, int] | None,
+) -> int:
+    games_code = games[0] * _GAME_VALUES + games[1]
+    if tie_break_points is not None:
+        sub_state = tie_break_points[0] * _TIE_BREAK_VALUES + tie_break_points[1]
+    else:
+        sub_state = (
+            _POINT_STATE_INDEX[points[0]] * len(_POINT_STATES)
+            + _POINT_STATE_INDEX[points[1]]
+        )
+    return games_code * _SUB_STATES + sub_state
+
+
+def _iter_valid_states() -> list[_DecodedState]:
+    states: list[_DecodedState] = []
+    love = (PointState.LOVE, PointState.LOVE)
+    for p1_games in range(_GAME_VALUES):
+        for p2_games in range(_GAME_VALUES):
+            games = (p1_games, p2_games)
+            if (
+                max(games) >= Score._GAMES_TO_WIN_SET
+                and abs(p1_games - p2_games) >= Score._MIN_GAME_DIFFERENCE_FOR_SET_WIN
+            ):
+                continue
+
+            if games == Score._GAMES_FOR_TIE_BREAK:
+                for p1_points in range(_TIE_BREAK_VALUES):
+                    for p2_points in range(_TIE_BREAK_VALUES):
+                        tie_break = TieBreakScore(points=(p1_points, p2_points))
+                        if tie_break.is_finished or min(p1_points, p2_points) > (
+                            _TIE_BREAK_NORMALIZATION_FLOOR
+                        ):
+                            continue
+                        states.append((games, love, tie_break.points))
+                continue
+
+            for p1_state in _POINT_STATES:
+                for p2_state in _POINT_STATES:
+                    points = (p1_state, p2_state)
+                    has_advantage = PointState.ADVANTAGE in points
+                    if has_advantage and PointState.FORTY not in points:
+                        continue
+                    states.append((games, points, None))
+    return states
+
+
+def _build_tables() -> tuple[
+    list[_DecodedState | None], list[int], list[SetResult | None]
+]:
+    decoded: list[_DecodedState | None] = [None] * _STATES_COUNT
+    transitions = [_INVALID] * (_STATES_COUNT * 2)
+    set_results: list[SetResult | None] = [None] * (_STATES_COUNT * 2)
+
+    for games, points, tie_break_points in _iter_valid_states():
+        state = _encode(games, points, tie_break_points)
+        decoded[state] = (games, points, tie_break_points)
+
+        score = Score(
+            games=games,
+            points=points,
+            tie_break_score=(
+                TieBreakScore(points=tie_break_points)
+                if tie_break_points is not None
+                else None
+            ),
+        )
+        for winner in PlayerIdentifier:
+            index = (state << 1) | winner
+            next_score = score.add_point(winner)
+
+            if next_score.finished_sets:
+                transitions[index] = _SET_WON
+                set_results[index] = next_score.finished_sets[-1]
+                continue
+
+            flags = 0
+            next_tie_break = (
+                next_score.tie_break_score.points
+                if next_score.tie_break_score is not None
+                else None
+            )
+            if (
+                next_tie_break is not None
+                and min(next_tie_break) > _TIE_BREAK_NORMALIZATION_FLOOR
+            ):
+                next_tie_break = (next_tie_break[0] - 1, next_tie_break[1] - 1)
+                flags |= _TIE_BREAK_OVERFLOW
+
+            next_state = _encode(next_score.games, next_score.points, next_tie_break)
+            transitions[index] = next_state | flags
+
+    return decoded, transitions, set_results
+
+
+_DECODED, _TRANSITIONS, _SET_RESULTS = _build_tables()
+
+
+@dataclass(frozen=True, slots=True)
+class CompactScore:
+    _INITIAL_STATE: ClassVar[int] = 0
+
+    state: int = _INITIAL_STATE
+    sets: tuple[int, int] = (0, 0)
+    tie_break_overflow: int = 0
+    finished_sets: tuple[SetResult, ...] = ()
+
+    @classmethod
+    def from_score(cls, score: Score) -> CompactScore:
+        tie_break_points = (
+            score.tie_break_score.points if score.tie_break_score is not None else None
+        )
+        overflow = 0
+        if tie_break_points is not None:
+            overflow = max(0, min(tie_break_points) - _TIE_BREAK_NORMALIZATION_FLOOR)
+            tie_break_points = (
+                tie_break_points[0] - overflow,
+                tie_break_points[1] - overflow,
+            )
+
+        decoded = (score.games, score.points, tie_break_points)
+        state = _encode(*decoded)
+        if not 0 <= state < _STATES_COUNT or _DECODED[state] != decoded:
+            raise InconsistentMatchStateError(f'Unreachable score state: {score!r}')
+
+        return cls(
+            state=state,
+            sets=score.sets,
+            tie_break_overflow=overflow,
+            finished_sets=score.finished_sets,
+        )
+
+    def to_score(self) -> Score:
+        games, points, tie_break_points = self._decode()
+        tie_break_score = None
+        if tie_break_points is not None:
+            tie_break_score = TieBreakScore(
+                points=(
+                    tie_break_points[0] + self.tie_break_overflow,
+                    tie_break_points[1] + self.tie_break_overflow,
+                )
+            )
+        return Score(
+            sets=self.sets,
+            games=games,
+            points=points,
+            tie_break_score=tie_break_score,
+            finished_sets=self.finished_sets,
+        )
+
+    def add_point(self, winner: PlayerIdentifier) -> CompactScore:
+        index = (self.state << 1) | winner
+        entry = _TRANSITIONS[index]
+
+        if entry == _INVALID:
+            raise InconsistentMatchStateError(f'Unknown score state: {self.state}')
+        if entry & _SET_WON:
+            return self._win_set(winner, _SET_RESULTS[index])
+
+        overflow = self.tie_break_overflow
+        if entry & _TIE_BREAK_OVERFLOW:
+            overflow += 1
+        return CompactScore(
+            state=entry & _STATE_MASK,
+            sets=self.sets,
+            tie_break_overflow=overflow,
+            finished_sets=self.finished_sets,
+        )
+
+    def get_final_score_data(self) -> FinalScoreDict:
+        return self.to_score().get_final_score_data()
+
+    def as_current_view_score(self) -> ViewScore:
+        games, points, tie_break_points = self._decode()
+        view_points: tuple[PointState, PointState] | tuple[int, int] = points
+        if tie_break_points is not None:
+            view_points = (
+                tie_break_points[0] + self.tie_break_overflow,
+                tie_break_points[1] + self.tie_break_overflow,
+            )
+        return ViewScore(
+            player1_sets=self.sets[PlayerIdentifier.ONE],
+            player2_sets=self.sets[PlayerIdentifier.TWO],
+            player1_games=games[PlayerIdentifier.ONE],
+            player2_games=games[PlayerIdentifier.TWO],
+            player1_points=view_points[PlayerIdentifier.ONE],
+            player2_points=view_points[PlayerIdentifier.TWO],
+        )
+
+    def as_final_view_score(self) -> ViewScore:
+        return self.to_score().as_final_view_score()
+
+    def _decode(self) -> _DecodedState:
+        decoded = _DECODED[self.state]
+        if decoded is None:
+            raise InconsistentMatchStateError(f'Unknown score state: {self.state}')
+        return decoded
+
+    def _win_set(
+        self, winner: PlayerIdentifier, set_result: SetResult | None
+    ) -> CompactScore:
+        if set_result is None:
+            raise InconsistentMatchStateError(f'Unknown score state: {self.state}')
+
+        if set_result.tie_break is not None and self.tie_break_overflow:
+            p1_points, p2_points = set_result.tie_break.points
+            set_result = SetResult(
+                games=set_result.games,
+                tie_break=TieBreakResult(
+                    points=(
+                        p1_points + self.tie_break_overflow,
+                        p2_points + self.tie_break_overflow,
+                    )
+                ),
+            )
+
+        sets = (
+            (self.sets[0] + 1, self.sets[1])
+            if winner is PlayerIdentifier.ONE
+            else (self.sets[0], self.sets[1] + 1)
+        )
+        return CompactScore(
+            state=self._INITIAL_STATE,
+            sets=sets,
+            tie_break_overflow=0,
+            finished_sets=self.finished_sets + (set_result,),
+        )
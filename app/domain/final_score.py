@@ -0,0 +1,177 @@
+"""
+Итоговый счет завершенного матча без текущего матча: по последовательности
+очков или по счету сетов (например, для импорта истории из другой системы).
+
+Последовательность очков разыгрывается табличным движком `CompactScore`,
+таблица которого построена эталонным `Score.add_point`; строка очков - блоками
+по `_BLOCK_SIZE` очков, переходы по которым запоминаются при первом розыгрыше.
+Счет сетов проверяется по тем же правилам напрямую: розыгрыш по очкам для
+каждого импортируемого матча был бы на порядки медленнее.
+"""
+
+from collections.abc import Iterable, Sequence
+
+from app.exceptions import InconsistentMatchStateError
+
+from .compact_score import (
+    _INVALID,
+    _SET_RESULTS,
+    _SET_WON,
+    _STATE_MASK,
+    _STATES_COUNT,
+    _TIE_BREAK_OVERFLOW,
+    _TRANSITIONS,
+    CompactScore,
+)
+from .ongoing_match import OngoingMatch
+from .score import (
+    FinalScoreDict,
+    PlayerIdentifier,
+    Score,
+    SetBreakDownDict,
+    TieBreakScore,
+)
+
+_SETS_TO_WIN_MATCH = OngoingMatch._SETS_TO_WIN_MATCH
+_GAMES_TO_WIN_SET = Score._GAMES_TO_WIN_SET
+_MIN_GAME_DIFFERENCE = Score._MIN_GAME_DIFFERENCE_FOR_SET_WIN
+_POINTS_TO_WIN_TIE_BREAK = TieBreakScore._POINTS_TO_WIN_TIE_BREAK
+_MIN_POINT_DIFFERENCE = TieBreakScore._MIN_POINT_DIFFERENCE_FOR_WIN
+
+# Переход по блоку очков: (состояние после блока или, если сет выигран, индекс
+# выигравшего его перехода в `_TRANSITIONS`, прирост переполнения тай-брейка,
+# число разыгранных очков, выигран ли сет). Блоков не больше 2**8 на состояние.
+_BLOCK_SIZE = 8
+_BlockTransition = tuple[int, int, int, bool]
+_BLOCK_TRANSITIONS: list[dict[str, _BlockTransition]] = [
+    {} for _ in range(_STATES_COUNT)
+]
+
+
+def final_score_from_points(points: Iterable[PlayerIdentifier]) -> FinalScoreDict:
+    """Разыгрывает матч по очкам; матч должен закончиться последним очком."""
+    score = CompactScore()
+    for point in points:
+        if max(score.sets) == _SETS_TO_WIN_MATCH:
+            raise InconsistentMatchStateError('Points continue after the match is over')
+        score = score.add_point(point)
+    if max(score.sets) != _SETS_TO_WIN_MATCH:
+        raise InconsistentMatchStateError('The match is not finished')
+    return score.get_final_score_data()
+
+
+def final_score_from_point_string(points: str) -> FinalScoreDict:
+    """
+    То же для строки номеров выигравших очко игроков из "0" и "1". Очки
+    разыгрываются блоками: на матч приходится около двух десятков переходов
+    вместо сотни с лишним.
+    """
+    if points.strip('01'):
+        raise ValueError('points must be a string of "0" and "1"')
+    state = overflow = position = 0
+    length = len(points)
+    sets_won = [0, 0]
+    sets_breakdown: list[SetBreakDownDict] = []
+    while position < length:
+        block = points[position : position + _BLOCK_SIZE]
+        transitions = _BLOCK_TRANSITIONS[state]
+        transition = transitions.get(block)
+        if transition is None:
+            transition = transitions[block] = _play_block(state, block)
+        state, added_overflow, played, set_won = transition
+        overflow += added_overflow
+        position += played
+        if set_won:
+            sets_won[state & 1] += 1
+            sets_breakdown.append(_set_breakdown(state, overflow))
+            state = overflow = 0
+            if max(sets_won) == _SETS_TO_WIN_MATCH:
+                break
+    if position < length:
+        raise InconsistentMatchStateError('Points continue after the match is over')
+    if max(sets_won) != _SETS_TO_WIN_MATCH:
+        raise InconsistentMatchStateError('The match is not finished')
+    return {
+        'player1_sets_won': sets_won[PlayerIdentifier.ONE],
+        'player2_sets_won': sets_won[PlayerIdentifier.TWO],
+        'sets_breakdown': sets_breakdown,
+    }
+
+
+def _play_block(state: int, block: str) -> _BlockTransition:
+    overflow = 0
+    for played, point in enumerate(block, start=1):
+        index = (state << 1) | (point == '1')
+        entry = _TRANSITIONS[index]
+        if entry == _INVALID:
+            raise InconsistentMatchStateError(f'Unknown score state: {state}')
+        if entry & _SET_WON:
+            return index, overflow, played, True
+        if entry & _TIE_BREAK_OVERFLOW:
+            overflow += 1
+        state = entry & _STATE_MASK
+    return state, overflow, len(block), False
+
+
+def _set_breakdown(index: int, overflow: int) -> SetBreakDownDict:
+    set_result = _SET_RESULTS[index]
+    if set_result is None:
+        raise InconsistentMatchStateError(f'Unknown score state: {index >> 1}')
+    set_data: SetBreakDownDict = {
+        'player1_games': set_result.games[PlayerIdentifier.ONE],
+        'player2_games': set_result.games[PlayerIdentifier.TWO],
+    }
+    if set_result.tie_break is not None:
+        set_data['tie_break_points'] = [
+            points + overflow for points in set_result.tie_break.points
+        ]
+    return set_data
+
+
+def final_score_from_sets(sets: Sequence[SetBreakDownDict]) -> FinalScoreDict:
+    """Проверяет счет сетов завершенного матча и возвращает итоговый счет."""
+    sets_won = [0, 0]
+    for number, set_data in enumerate(sets, start=1):
+        if max(sets_won) == _SETS_TO_WIN_MATCH:
+            raise InconsistentMatchStateError(
+                f'Set {number} is played after the match is over'
+            )
+        sets_won[_set_winner(number, set_data)] += 1
+    if max(sets_won) != _SETS_TO_WIN_MATCH:
+        raise InconsistentMatchStateError('The match is not finished')
+
+    return {
+        'player1_sets_won': sets_won[PlayerIdentifier.ONE],
+        'player2_sets_won': sets_won[PlayerIdentifier.TWO],
+        'sets_breakdown': list(sets),
+    }
+
+
+def _set_winner(number: int, set_data: SetBreakDownDict) -> PlayerIdentifier:
+    games = (set_data['player1_games'], set_data['player2_games'])
+    winner = PlayerIdentifier.ONE if games[0] > games[1] else PlayerIdentifier.TWO
+    won, lost = games[winner], games[winner.opponent]
+    tie_break = set_data.get('tie_break_points')
+
+    if tie_break is None:
+        valid = lost >= 0 and (
+            (won == _GAMES_TO_WIN_SET and lost <= won - _MIN_GAME_DIFFERENCE)
+            or (won == _GAMES_TO_WIN_SET + 1 and lost == _GAMES_TO_WIN_SET - 1)
+        )
+    else:
+        # Тай-брейк играется при 6:6 и идет до 7 очков с разницей в 2: после
+        # 6:6 по очкам он заканчивается ровно при разнице в 2.
+        points_won, points_lost = tie_break[winner], tie_break[winner.opponent]
+        valid = (
+            (won, lost) == (_GAMES_TO_WIN_SET + 1, _GAMES_TO_WIN_SET)
+            and points_lost >= 0
+            and points_won >= _POINTS_TO_WIN_TIE_BREAK
+            and points_won - points_lost >= _MIN_POINT_DIFFERENCE
+            and (
+                points_won == _POINTS_TO_WIN_TIE_BREAK
+                or points_won - points_lost == _MIN_POINT_DIFFERENCE
+            )
+        )
+    if not valid:
+        raise InconsistentMatchStateError(f'Set {number} has an impossible score')
+    return winner
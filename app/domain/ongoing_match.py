@@ -1,7 +1,9 @@
 import uuid as uuid_pkg
+from collections.abc import Iterable
 from dataclasses import dataclass, field, replace
 from typing import ClassVar, Self, TypedDict
 
+from .compact_score import CompactScore
 from .player import Player
 from .score import PlayerIdentifier, Score
 
@@ -31,6 +33,8 @@ class OngoingMatch:
 
     uuid: uuid_pkg.UUID = field(default_factory=uuid_pkg.uuid4)
     score: Score = field(default_factory=Score)
+    # Число засчитанных очков: растет с каждым изменением счета.
+    version: int = 0
 
     def get_view_model(self) -> MatchViewDict:
         view_score = (
@@ -55,7 +59,22 @@ class OngoingMatch:
 
     def add_point(self, point_winner: PlayerIdentifier) -> Self:
         new_score = self.score.add_point(point_winner)
-        return replace(self, score=new_score)
+        return replace(self, score=new_score, version=self.version + 1)
+
+    def add_points(self, point_winners: Iterable[PlayerIdentifier]) -> Self:
+        # Очки после завершения матча не засчитываются.
+        compact_score = CompactScore.from_score(self.score)
+        applied = 0
+        for point_winner in point_winners:
+            if max(compact_score.sets) == self._SETS_TO_WIN_MATCH:
+                break
+            compact_score = compact_score.add_point(point_winner)
+            applied += 1
+        if not applied:
+            return self
+        return replace(
+            self, score=compact_score.to_score(), version=self.version + applied
+        )
 
     @property
     def is_finished(self) -> bool:
@@ -0,0 +1,192 @@
+"""
+Точный расчет вероятностей выигрыша гейма, сета и матча.
+
+Матч рассматривается как марковская цепь: каждое очко первый игрок выигрывает
+с постоянной вероятностью `p`. Вероятности вычисляются мемоизированной рекурсией
+по состояниям `Score` (очки, геймы, тай-брейк, сеты). Кэши общие для всех
+вызовов и ограничены по размеру (LRU), поэтому пересчет после каждого очка
+сводится к нескольким обращениям к кэшу.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import NamedTuple
+
+from .ongoing_match import OngoingMatch
+from .score import PlayerIdentifier, Score, TieBreakScore
+
+PointState = Score.PointState
+
+_CACHE_SIZE = 65_536
+
+_POINT_STATE_TO_POINTS: dict[PointState, int] = {
+    PointState.LOVE: 0,
+    PointState.FIFTEEN: 1,
+    PointState.THIRTY: 2,
+    PointState.FORTY: 3,
+    PointState.ADVANTAGE: 4,
+}
+_POINTS_TO_WIN_GAME = 4
+_POINTS_TO_WIN_TIE_BREAK = TieBreakScore._POINTS_TO_WIN_TIE_BREAK
+
+
+@dataclass(frozen=True)
+class WinProbabilities:
+    """Вероятности выигрыша текущего гейма, сета и матча одним игроком."""
+
+    game: float
+    set: float
+    match: float
+
+    @property
+    def opponent(self) -> WinProbabilities:
+        return WinProbabilities(
+            game=1 - self.game, set=1 - self.set, match=1 - self.match
+        )
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+    max_size: int
+
+
+def calculate_win_probabilities(
+    ongoing_match: OngoingMatch, point_win_probability: float
+) -> WinProbabilities:
+    """
+    Возвращает вероятности для первого игрока; для второго - `.opponent`.
+    `point_win_probability` - вероятность первого игрока выиграть любое очко.
+    """
+    if not 0 <= point_win_probability <= 1:
+        raise ValueError('point_win_probability must be between 0 and 1')
+
+    score = ongoing_match.score
+    if ongoing_match.is_finished:
+        won = float(ongoing_match.winner == ongoing_match.player1)
+        return WinProbabilities(game=won, set=won, match=won)
+
+    if score.tie_break_score is not None:
+        p1_points, p2_points = score.tie_break_score.points
+        # Тай-брейк от 6:6 повторяется, поэтому нормализуем счет для кэша.
+        excess = max(0, min(p1_points, p2_points) - (_POINTS_TO_WIN_TIE_BREAK - 1))
+        points = (p1_points - excess, p2_points - excess)
+        in_tie_break = True
+    else:
+        points = (
+            _POINT_STATE_TO_POINTS[score.points[PlayerIdentifier.ONE]],
+            _POINT_STATE_TO_POINTS[score.points[PlayerIdentifier.TWO]],
+        )
+        in_tie_break = False
+
+    return _win_probabilities(
+        point_win_probability, score.sets, score.games, points, in_tie_break
+    )
+
+
+def cache_info() -> CacheInfo:
+    caches = (_win_probabilities, _race, _set, _match)
+    infos = [cache.cache_info() for cache in caches]
+    return CacheInfo(
+        hits=sum(info.hits for info in infos),
+        misses=sum(info.misses for info in infos),
+        size=sum(info.currsize for info in infos),
+        max_size=sum(info.maxsize or 0 for info in infos),
+    )
+
+
+def cache_clear() -> None:
+    for cache in (_win_probabilities, _race, _set, _match):
+        cache.cache_clear()
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _win_probabilities(
+    p: float,
+    sets: tuple[int, int],
+    games: tuple[int, int],
+    points: tuple[int, int],
+    in_tie_break: bool,
+) -> WinProbabilities:
+    if in_tie_break:
+        game = _tie_break(p, *points)
+    else:
+        game = _game(p, *points)
+
+    set_if_won = _set_after_game(p, games[0] + 1, games[1])
+    set_if_lost = _set_after_game(p, games[0], games[1] + 1)
+    set_ = game * set_if_won + (1 - game) * set_if_lost
+
+    match = set_ * _match(p, sets[0] + 1, sets[1]) + (1 - set_) * _match(
+        p, sets[0], sets[1] + 1
+    )
+    return WinProbabilities(game=game, set=set_, match=match)
+
+
+def _deuce(p: float) -> float:
+    # Вероятность выиграть два очка подряд раньше соперника из равного счета.
+    q = 1 - p
+    return p * p / (p * p + q * q)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _race(p: float, a: int, b: int, target: int) -> float:
+    """Вероятность первым набрать `target` очков с отрывом в 2 от счета a:b."""
+    q = 1 - p
+    if a >= target and a - b >= 2:
+        return 1.0
+    if b >= target and b - a >= 2:
+        return 0.0
+    if a >= target - 1 and b >= target - 1:
+        if a == b:
+            return _deuce(p)
+        if a > b:
+            return p + q * _deuce(p)
+        return p * _deuce(p)
+    return p * _race(p, a + 1, b, target) + q * _race(p, a, b + 1, target)
+
+
+def _game(p: float, a: int, b: int) -> float:
+    return _race(p, a, b, _POINTS_TO_WIN_GAME)
+
+
+def _tie_break(p: float, a: int, b: int) -> float:
+    return _race(p, a, b, _POINTS_TO_WIN_TIE_BREAK)
+
+
+def _set_after_game(p: float, p1_games: int, p2_games: int) -> float:
+    lead = p1_games - p2_games
+    if abs(lead) >= Score._MIN_GAME_DIFFERENCE_FOR_SET_WIN and (
+        max(p1_games, p2_games) >= Score._GAMES_TO_WIN_SET
+    ):
+        return 1.0 if lead > 0 else 0.0
+    if (p1_games, p2_games) == Score._GAMES_FOR_TIE_BREAK:
+        return _tie_break(p, 0, 0)
+    # 7:6 достигается только через тай-брейк, который обработан выше.
+    if max(p1_games, p2_games) > Score._GAMES_TO_WIN_SET:
+        return 1.0 if lead > 0 else 0.0
+    return _set(p, p1_games, p2_games)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _set(p: float, p1_games: int, p2_games: int) -> float:
+    game = _game(p, 0, 0)
+    return game * _set_after_game(p, p1_games + 1, p2_games) + (
+        1 - game
+    ) * _set_after_game(p, p1_games, p2_games + 1)
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _match(p: float, p1_sets: int, p2_sets: int) -> float:
+    sets_to_win = OngoingMatch._SETS_TO_WIN_MATCH
+    if p1_sets >= sets_to_win:
+        return 1.0
+    if p2_sets >= sets_to_win:
+        return 0.0
+    set_ = _set(p, 0, 0)
+    return set_ * _match(p, p1_sets + 1, p2_sets) + (1 - set_) * _match(
+        p, p1_sets, p2_sets + 1
+    )
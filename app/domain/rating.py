@@ -0,0 +1,59 @@
+"""
+Рейтинг Эло игроков по завершенным матчам.
+
+Рейтинг зависит от порядка матчей, поэтому матчи учитываются по одному в порядке
+их записи: пересчет с нуля в порядке id матчей дает те же рейтинги, что и
+обновление после каждого матча.
+"""
+
+import math
+from collections.abc import Iterator, Mapping
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    """Ожидаемая доля побед игрока с рейтингом `rating` над соперником."""
+    return 1.0 / (1.0 + math.pow(10.0, (opponent_rating - rating) / 400.0))
+
+
+def update_ratings(
+    winner_rating: float, loser_rating: float, k_factor: float = K_FACTOR
+) -> tuple[float, float]:
+    """Новые рейтинги победителя и проигравшего после их матча."""
+    delta = k_factor * (1.0 - expected_score(winner_rating, loser_rating))
+    return winner_rating + delta, loser_rating - delta
+
+
+class Ratings:
+    """
+    Рейтинги и число учтенных матчей по id игроков. Игрок без рейтинга
+    начинает с `INITIAL_RATING`; матч игрока с самим собой не учитывается.
+    """
+
+    def __init__(self, ratings: Mapping[int, tuple[float, int]] | None = None):
+        self._ratings = {pid: rating for pid, (rating, _) in (ratings or {}).items()}
+        self._matches = {pid: matches for pid, (_, matches) in (ratings or {}).items()}
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def __getitem__(self, player_id: int) -> float:
+        return self._ratings.get(player_id, INITIAL_RATING)
+
+    def record(self, winner_id: int, loser_id: int) -> None:
+        if winner_id == loser_id:
+            return
+        ratings, matches = self._ratings, self._matches
+        ratings[winner_id], ratings[loser_id] = update_ratings(
+            ratings.get(winner_id, INITIAL_RATING),
+            ratings.get(loser_id, INITIAL_RATING),
+        )
+        matches[winner_id] = matches.get(winner_id, 0) + 1
+        matches[loser_id] = matches.get(loser_id, 0) + 1
+
+    def items(self) -> Iterator[tuple[int, float, int]]:
+        """Тройки `(id игрока, рейтинг, число матчей)`."""
+        for player_id, rating in self._ratings.items():
+            yield player_id, rating, self._matches[player_id]
@@ -0,0 +1,300 @@
+"""
+Векторизованный Монте-Карло симулятор матчей.
+
+Состояние множества матчей (очки, геймы, сеты, тай-брейк, подача) хранится
+в массивах NumPy, и каждый шаг симуляции разыгрывает по одному очку сразу во
+всех незавершенных матчах. Правила совпадают со `Score`: гейм до 4 очков с
+преимуществом в 2, сет до 6 геймов с разницей в 2, тай-брейк при 6:6 до 7 очков.
+
+Подачу в первом гейме матча выполняет первый игрок, далее подача переходит
+каждый гейм. В тай-брейке первое очко подает игрок, чья очередь подавать гейм,
+затем подача меняется каждые два очка.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import numpy.typing as npt
+
+from .ongoing_match import OngoingMatch
+from .score import PlayerIdentifier, Score
+
+_POINTS_TO_WIN_GAME = 4
+_DEUCE_POINTS = 3
+_POINTS_TO_WIN_TIE_BREAK = 7
+_MAX_SETS = 2 * OngoingMatch._SETS_TO_WIN_MATCH - 1
+_SET_SCORE_BASE = 16
+
+_POINT_STATE_TO_POINTS: dict[Score.PointState, int] = {
+    Score.PointState.LOVE: 0,
+    Score.PointState.FIFTEEN: 1,
+    Score.PointState.THIRTY: 2,
+    Score.PointState.FORTY: 3,
+    Score.PointState.ADVANTAGE: 4,
+}
+
+IntArray = npt.NDArray[np.int16]
+BoolArray = npt.NDArray[np.bool_]
+
+
+@dataclass(frozen=True)
+class PointWinProbabilities:
+    """Вероятности игрока выиграть очко на своей подаче и на приеме."""
+
+    on_serve: float
+    on_return: float
+
+
+def serve_point_probability(
+    server: PointWinProbabilities, receiver: PointWinProbabilities
+) -> float:
+    # Усредняем две оценки одного события: подачу сервера и прием соперника.
+    return (server.on_serve + (1 - receiver.on_return)) / 2
+
+
+@dataclass(frozen=True)
+class MatchOutcomes:
+    """Покомпонентные результаты симуляции, по одной строке на матч."""
+
+    winners: npt.NDArray[np.int8]
+    set_games: IntArray
+    set_tie_breaks: BoolArray
+
+
+@dataclass(frozen=True)
+class SimulationSummary:
+    matches: int
+    player1_win_probability: float
+    player2_win_probability: float
+    # Итоговый счет по сетам, например (2, 1) -> доля матчей.
+    match_score_distribution: dict[tuple[int, int], float]
+    # Счет отдельных сетов по геймам, например (7, 6) -> доля сетов.
+    set_score_distribution: dict[tuple[int, int], float]
+    # Доля сетов, решенных на тай-брейке.
+    tie_break_frequency: float
+
+
+def simulate_outcomes(
+    player1: PointWinProbabilities,
+    player2: PointWinProbabilities,
+    n_matches: int,
+    rng: np.random.Generator,
+    initial_score: Score | None = None,
+) -> MatchOutcomes:
+    """
+    Разыгрывает `n_matches` независимых матчей от `initial_score` (по умолчанию
+    с начала матча). На каждом шаге незавершенные матчи в порядке возрастания
+    индекса получают по одному равномерному числу из `rng`.
+    """
+    p1_on_p1_serve = serve_point_probability(player1, player2)
+    p1_on_p2_serve = 1 - serve_point_probability(player2, player1)
+    score = initial_score if initial_score is not None else Score()
+
+    winners = np.full(n_matches, -1, dtype=np.int8)
+    set_games = np.full((n_matches, _MAX_SETS, 2), -1, dtype=np.int16)
+    set_tie_breaks = np.zeros((n_matches, _MAX_SETS), dtype=np.bool_)
+
+    games_played_before = 0
+    for set_index, set_result in enumerate(score.finished_sets):
+        set_games[:, set_index] = set_result.games
+        set_tie_breaks[:, set_index] = set_result.tie_break is not None
+        games_played_before += sum(set_result.games)
+
+    if max(score.sets) >= OngoingMatch._SETS_TO_WIN_MATCH:
+        p1_won = score.sets[PlayerIdentifier.ONE] > score.sets[PlayerIdentifier.TWO]
+        winners[:] = PlayerIdentifier.ONE if p1_won else PlayerIdentifier.TWO
+        return MatchOutcomes(winners, set_games, set_tie_breaks)
+
+    in_tie_break = score.tie_break_score is not None
+    if score.tie_break_score is not None:
+        initial_points = score.tie_break_score.points
+    else:
+        initial_points = (
+            _POINT_STATE_TO_POINTS[score.points[PlayerIdentifier.ONE]],
+            _POINT_STATE_TO_POINTS[score.points[PlayerIdentifier.TWO]],
+        )
+
+    # Состояние хранится отдельными одномерными массивами на каждого игрока:
+    # редукции по оси длины 2 в NumPy на порядок медленнее поэлементных операций.
+    index = np.arange(n_matches)
+    p1_points = np.full(n_matches, initial_points[0], dtype=np.int16)
+    p2_points = np.full(n_matches, initial_points[1], dtype=np.int16)
+    p1_games = np.full(n_matches, score.games[0], dtype=np.int16)
+    p2_games = np.full(n_matches, score.games[1], dtype=np.int16)
+    p1_sets = np.full(n_matches, score.sets[0], dtype=np.int16)
+    p2_sets = np.full(n_matches, score.sets[1], dtype=np.int16)
+    tie_break = np.full(n_matches, in_tie_break, dtype=np.bool_)
+    games_played = np.full(
+        n_matches, games_played_before + sum(score.games), dtype=np.int16
+    )
+
+    tie_break_p1, tie_break_p2 = Score._GAMES_FOR_TIE_BREAK
+    while index.size:
+        p1_serves = (games_played & 1) == 0
+        # В тай-брейке подача меняется после первого очка и далее каждые два.
+        switched = (((p1_points + p2_points + 1) >> 1) & 1) == 1
+        p1_serves ^= tie_break & switched
+
+        p1_point_probability = np.where(p1_serves, p1_on_p1_serve, p1_on_p2_serve)
+        p1_won_point = rng.random(index.size) < p1_point_probability
+        p1_points += p1_won_point
+        p2_points += ~p1_won_point
+
+        lead = p1_points - p2_points
+        top = np.maximum(p1_points, p2_points)
+        points_to_win = np.where(
+            tie_break, _POINTS_TO_WIN_TIE_BREAK, _POINTS_TO_WIN_GAME
+        )
+        game_won = (top >= points_to_win) & (np.abs(lead) >= 2)
+
+        # После "больше-меньше" возвращаем счет к 40:40, чтобы не копить очки.
+        deuce = ~tie_break & (lead == 0) & (top > _DEUCE_POINTS)
+        p1_points[deuce] = _DEUCE_POINTS
+        p2_points[deuce] = _DEUCE_POINTS
+
+        if not game_won.any():
+            continue
+
+        p1_games += game_won & (lead > 0)
+        p2_games += game_won & (lead < 0)
+        games_played += game_won
+        p1_points[game_won] = 0
+        p2_points[game_won] = 0
+
+        games_lead = p1_games - p2_games
+        set_won = game_won & (
+            tie_break
+            | (
+                (np.maximum(p1_games, p2_games) >= Score._GAMES_TO_WIN_SET)
+                & (np.abs(games_lead) >= Score._MIN_GAME_DIFFERENCE_FOR_SET_WIN)
+            )
+        )
+        tie_break |= (
+            game_won
+            & ~set_won
+            & (p1_games == tie_break_p1)
+            & (p2_games == tie_break_p2)
+        )
+
+        if not set_won.any():
+            continue
+
+        won_rows = np.flatnonzero(set_won)
+        won_index = index[won_rows]
+        set_number = p1_sets[won_rows] + p2_sets[won_rows]
+        set_games[won_index, set_number, 0] = p1_games[won_rows]
+        set_games[won_index, set_number, 1] = p2_games[won_rows]
+        set_tie_breaks[won_index, set_number] = tie_break[won_rows]
+
+        p1_sets += set_won & (games_lead > 0)
+        p2_sets += set_won & (games_lead < 0)
+        p1_games[set_won] = 0
+        p2_games[set_won] = 0
+        tie_break &= ~set_won
+
+        match_won = set_won & (
+            np.maximum(p1_sets, p2_sets) >= OngoingMatch._SETS_TO_WIN_MATCH
+        )
+        if not match_won.any():
+            continue
+
+        finished_rows = np.flatnonzero(match_won)
+        winners[index[finished_rows]] = np.where(
+            p1_sets[finished_rows] > p2_sets[finished_rows],
+            PlayerIdentifier.ONE,
+            PlayerIdentifier.TWO,
+        )
+
+        active = ~match_won
+        index = index[active]
+        p1_points = p1_points[active]
+        p2_points = p2_points[active]
+        p1_games = p1_games[active]
+        p2_games = p2_games[active]
+        p1_sets = p1_sets[active]
+        p2_sets = p2_sets[active]
+        tie_break = tie_break[active]
+        games_played = games_played[active]
+
+    return MatchOutcomes(winners, set_games, set_tie_breaks)
+
+
+@dataclass
+class _OutcomeCounts:
+    matches: int = 0
+    player1_wins: int = 0
+    sets: int = 0
+    tie_breaks: int = 0
+    match_scores: Counter[tuple[int, int]] = field(default_factory=Counter)
+    set_scores: Counter[tuple[int, int]] = field(default_factory=Counter)
+
+    def add(self, outcomes: MatchOutcomes) -> None:
+        self.matches += outcomes.winners.size
+        self.player1_wins += int(
+            np.count_nonzero(outcomes.winners == PlayerIdentifier.ONE)
+        )
+
+        played = outcomes.set_games[:, :, 0] >= 0
+        p1_sets = (
+            played & (outcomes.set_games[:, :, 0] > outcomes.set_games[:, :, 1])
+        ).sum(axis=1)
+        p2_sets = played.sum(axis=1) - p1_sets
+        self.match_scores.update(zip(p1_sets.tolist(), p2_sets.tolist(), strict=True))
+
+        played_games = outcomes.set_games[played]
+        self.sets += played_games.shape[0]
+        self.tie_breaks += int(np.count_nonzero(outcomes.set_tie_breaks))
+        # Счет сета кодируется одним числом, чтобы посчитать его через bincount.
+        codes = (
+            played_games[:, 0].astype(np.int64) * _SET_SCORE_BASE + played_games[:, 1]
+        )
+        counts = np.bincount(codes)
+        for code in np.flatnonzero(counts):
+            p1_games, p2_games = divmod(int(code), _SET_SCORE_BASE)
+            self.set_scores[(p1_games, p2_games)] += int(counts[code])
+
+    def summarize(self) -> SimulationSummary:
+        if self.matches == 0:
+            raise ValueError('Cannot summarize an empty simulation')
+        return SimulationSummary(
+            matches=self.matches,
+            player1_win_probability=self.player1_wins / self.matches,
+            player2_win_probability=(self.matches - self.player1_wins) / self.matches,
+            match_score_distribution={
+                score: count / self.matches
+                for score, count in sorted(self.match_scores.items())
+            },
+            set_score_distribution={
+                score: count / self.sets
+                for score, count in sorted(self.set_scores.items())
+            },
+            tie_break_frequency=self.tie_breaks / self.sets if self.sets else 0.0,
+        )
+
+
+def summarize_outcomes(outcomes: MatchOutcomes) -> SimulationSummary:
+    counts = _OutcomeCounts()
+    counts.add(outcomes)
+    return counts.summarize()
+
+
+def simulate_matches(
+    player1: PointWinProbabilities,
+    player2: PointWinProbabilities,
+    n_matches: int,
+    seed: int | None = None,
+    initial_score: Score | None = None,
+    chunk_size: int = 1_000_000,
+) -> SimulationSummary:
+    """Симулирует матчи порциями по `chunk_size`, ограничивая расход памяти."""
+    rng = np.random.default_rng(seed)
+    counts = _OutcomeCounts()
+    remaining = n_matches
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        counts.add(simulate_outcomes(player1, player2, size, rng, initial_score))
+        remaining -= size
+    return counts.summarize()
@@ -6,3 +6,9 @@ class MatchNotFoundError(AppError):
 
 class InconsistentMatchStateError(AppError):
     pass
+
+class SerializationError(AppError):
+    pass
+
+class ConcurrentUpdateError(AppError):
+    pass
@@ -22,6 +22,22 @@
 
 from .base import Base
 from .match import Match
+from .match_counter import ALL_MATCHES_KEY, MatchCounter
+from .match_set import MatchSet
+from .ongoing_match_snapshot import OngoingMatchSnapshot
 from .player import Player
+from .player_rating import PlayerRating
+from .player_stat import ALL_OPPONENTS_KEY, PlayerStat
 
-__all__ = ['Base', 'Player', 'Match']
+__all__ = [
+    'Base',
+    'Player',
+    'Match',
+    'MatchSet',
+    'MatchCounter',
+    'ALL_MATCHES_KEY',
+    'OngoingMatchSnapshot',
+    'PlayerStat',
+    'ALL_OPPONENTS_KEY',
+    'PlayerRating',
+]
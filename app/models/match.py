@@ -3,22 +3,29 @@ from __future__ import annotations
 import uuid as uuid_pkg
 from typing import TYPE_CHECKING
 
-from sqlalchemy import UUID as SQLAlchemyUUID
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .base import Base
 
 if TYPE_CHECKING:
+    from .match_set import MatchSet
     from .player import Player
 
 
 class Match(Base):
     __tablename__ = 'Matches'
+    # Составные индексы отдают матчи игрока сразу в порядке id: история
+    # с фильтром по игроку читает из них только нужную страницу.
+    __table_args__ = (
+        Index('ix_Matches_Player1_ID', 'Player1', 'ID'),
+        Index('ix_Matches_Player2_ID', 'Player2', 'ID'),
+        Index('ix_Matches_Winner', 'Winner'),
+    )
 
     id: Mapped[int] = mapped_column('ID', primary_key=True)
     uuid: Mapped[uuid_pkg.UUID] = mapped_column(
-        'UUID', SQLAlchemyUUID(as_uuid=True), nullable=False, unique=True
+        'UUID', Uuid(as_uuid=True), nullable=False, unique=True
     )
     player1_id: Mapped[int] = mapped_column(
         'Player1', ForeignKey('Players.ID'), nullable=False
@@ -34,6 +41,9 @@ class Match(Base):
     player1: Mapped[Player] = relationship('Player', foreign_keys=[player1_id])
     player2: Mapped[Player] = relationship('Player', foreign_keys=[player2_id])
     winner: Mapped[Player] = relationship('Player', foreign_keys=[winner_id])
+    sets: Mapped[list[MatchSet]] = relationship(
+        'MatchSet', order_by='MatchSet.set_number', cascade='all, delete-orphan'
+    )
 
     def __repr__(self) -> str:
         return (
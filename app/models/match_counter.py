@@ -0,0 +1,22 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# Ключ счетчика всех завершенных матчей; остальные ключи - id игроков.
+ALL_MATCHES_KEY = 0
+
+
+class MatchCounter(Base):
+    """
+    Число завершенных матчей: всего (`ALL_MATCHES_KEY`) и по каждому игроку.
+    Обновляется в той же транзакции, что и запись матча, и заменяет подсчет
+    матчей при постраничном показе истории.
+    """
+
+    __tablename__ = 'MatchCounters'
+
+    player_id: Mapped[int] = mapped_column('PlayerID', primary_key=True)
+    matches: Mapped[int] = mapped_column('Matches', nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<MatchCounter(player_id={self.player_id!r}, matches={self.matches!r})>'
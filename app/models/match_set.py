@@ -0,0 +1,43 @@
+from sqlalchemy import ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+_HAS_TIE_BREAK = text('"TieBreakPlayer1" IS NOT NULL')
+
+
+class MatchSet(Base):
+    """
+    Счет сета завершенного матча. Дублирует `Match.score_json` в колонках,
+    чтобы выборки по счету (например, матчи с тай-брейком в третьем сете)
+    выполнялись в БД по индексам, а не разбором JSON каждого матча.
+    """
+
+    __tablename__ = 'MatchSets'
+    # В индекс попадают только сеты с тай-брейком, упорядоченные по матчу.
+    __table_args__ = (
+        Index(
+            'ix_MatchSets_TieBreak',
+            'SetNumber',
+            'MatchID',
+            postgresql_where=_HAS_TIE_BREAK,
+            sqlite_where=_HAS_TIE_BREAK,
+        ),
+    )
+
+    match_id: Mapped[int] = mapped_column(
+        'MatchID', ForeignKey('Matches.ID', ondelete='CASCADE'), primary_key=True
+    )
+    # Сеты нумеруются с 1 в порядке игры.
+    set_number: Mapped[int] = mapped_column('SetNumber', primary_key=True)
+    player1_games: Mapped[int] = mapped_column('Player1Games', nullable=False)
+    player2_games: Mapped[int] = mapped_column('Player2Games', nullable=False)
+    tie_break_player1_points: Mapped[int | None] = mapped_column('TieBreakPlayer1')
+    tie_break_player2_points: Mapped[int | None] = mapped_column('TieBreakPlayer2')
+
+    def __repr__(self) -> str:
+        return (
+            f'<MatchSet(match_id={self.match_id!r}, set_number={self.set_number!r}, '
+            f'player1_games={self.player1_games!r}, '
+            f'player2_games={self.player2_games!r})>'
+        )
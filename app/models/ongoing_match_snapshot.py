@@ -0,0 +1,19 @@
+import uuid as uuid_pkg
+
+from sqlalchemy import LargeBinary, Uuid
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class OngoingMatchSnapshot(Base):
+    __tablename__ = 'OngoingMatches'
+
+    uuid: Mapped[uuid_pkg.UUID] = mapped_column(
+        'UUID', Uuid(as_uuid=True), primary_key=True
+    )
+    version: Mapped[int] = mapped_column('Version', nullable=False)
+    state: Mapped[bytes] = mapped_column('State', LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        return f'<OngoingMatchSnapshot(uuid={self.uuid!r}, version={self.version!r})>'
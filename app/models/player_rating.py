@@ -0,0 +1,25 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class PlayerRating(Base):
+    """
+    Рейтинг Эло игрока и число учтенных матчей. Обновляется в той же
+    транзакции, что и запись матча; игроков без сыгранных матчей в таблице нет.
+    """
+
+    __tablename__ = 'PlayerRatings'
+    # Таблица лидеров - конец диапазона индекса по рейтингу.
+    __table_args__ = (Index('ix_PlayerRatings_Rating', 'Rating', 'PlayerID'),)
+
+    player_id: Mapped[int] = mapped_column('PlayerID', primary_key=True)
+    rating: Mapped[float] = mapped_column('Rating', nullable=False)
+    matches: Mapped[int] = mapped_column('Matches', nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f'<PlayerRating(player_id={self.player_id!r}, rating={self.rating!r}, '
+            f'matches={self.matches!r})>'
+        )
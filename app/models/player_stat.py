@@ -0,0 +1,37 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# Ключ итогов игрока против всех соперников; остальные ключи - id соперников.
+ALL_OPPONENTS_KEY = 0
+
+
+class PlayerStat(Base):
+    """
+    Итоги завершенных матчей игрока: против каждого соперника и в целом
+    (`ALL_OPPONENTS_KEY`). Обновляются в той же транзакции, что и запись матча,
+    поэтому страница игрока не зависит от длины его истории.
+    """
+
+    __tablename__ = 'PlayerStats'
+    # Самые частые соперники игрока - конец диапазона индекса по игроку.
+    __table_args__ = (
+        Index('ix_PlayerStats_PlayerID_Matches', 'PlayerID', 'Matches', 'OpponentID'),
+    )
+
+    player_id: Mapped[int] = mapped_column('PlayerID', primary_key=True)
+    opponent_id: Mapped[int] = mapped_column('OpponentID', primary_key=True)
+    matches: Mapped[int] = mapped_column('Matches', nullable=False)
+    wins: Mapped[int] = mapped_column('Wins', nullable=False)
+    sets_won: Mapped[int] = mapped_column('SetsWon', nullable=False)
+    sets_lost: Mapped[int] = mapped_column('SetsLost', nullable=False)
+    tie_breaks_won: Mapped[int] = mapped_column('TieBreaksWon', nullable=False)
+    tie_breaks_lost: Mapped[int] = mapped_column('TieBreaksLost', nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f'<PlayerStat(player_id={self.player_id!r}, '
+            f'opponent_id={self.opponent_id!r}, matches={self.matches!r}, '
+            f'wins={self.wins!r})>'
+        )
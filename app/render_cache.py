@@ -0,0 +1,112 @@
+"""
+Кэш отрендеренных страниц счета текущих матчей.
+
+Страница счета зависит только от состояния матча, а состояние однозначно
+задается UUID и номером изменения (`OngoingMatch.version`). Поэтому для матча
+хранится одна запись - страница последней версии: новое очко дает новую
+версию, и при следующем показе старая запись заменяется. Записи вытесняются
+по давности использования (LRU), а завершенный матч удаляется из кэша явно.
+
+Если несколько потоков одновременно запрашивают еще не отрендеренную версию,
+рендерит только один, остальные ждут его результат: при сотнях зрителей
+страница рендерится один раз на очко.
+"""
+
+import threading
+import uuid as uuid_pkg
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypedDict
+
+
+@dataclass(frozen=True)
+class RenderedPage:
+    html: str
+    etag: str
+
+
+@dataclass(frozen=True)
+class _Entry:
+    version: int
+    page: RenderedPage
+
+
+class RenderCacheStats(TypedDict):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    size: int
+
+
+class RenderCache:
+    def __init__(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError('max_entries must be positive')
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[uuid_pkg.UUID, _Entry] = OrderedDict()
+        self._rendering: dict[tuple[uuid_pkg.UUID, int], threading.Event] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def get_or_render(
+        self, uuid: uuid_pkg.UUID, version: int, render: Callable[[], RenderedPage]
+    ) -> RenderedPage:
+        while True:
+            with self._lock:
+                entry = self._entries.get(uuid)
+                if entry is not None and entry.version == version:
+                    self._entries.move_to_end(uuid)
+                    self._hits += 1
+                    return entry.page
+
+                rendered = self._rendering.get((uuid, version))
+                if rendered is None:
+                    rendered = threading.Event()
+                    self._rendering[(uuid, version)] = rendered
+                    self._misses += 1
+                    break
+            # Ту же версию уже рендерит другой поток: после него запись найдется
+            # в кэше, а если рендер не удался - рендерим сами.
+            rendered.wait()
+
+        try:
+            page = render()
+            with self._lock:
+                self._store(uuid, _Entry(version=version, page=page))
+        finally:
+            with self._lock:
+                del self._rendering[(uuid, version)]
+            rendered.set()
+        return page
+
+    def invalidate(self, uuid: uuid_pkg.UUID) -> None:
+        with self._lock:
+            if self._entries.pop(uuid, None) is not None:
+                self._invalidations += 1
+
+    def stats(self) -> RenderCacheStats:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations,
+                'size': len(self._entries),
+            }
+
+    def _store(self, uuid: uuid_pkg.UUID, entry: _Entry) -> None:
+        # Страница устаревшей версии (запрос пришел после нового очка)
+        # не заменяет более новую.
+        current = self._entries.get(uuid)
+        if current is not None and current.version > entry.version:
+            return
+        self._entries[uuid] = entry
+        self._entries.move_to_end(uuid)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
@@ -1,4 +1,21 @@
-from .match_repository import MatchRepository
-from .player_repository import PlayerRepository
+from .match_counter_repository import (
+    AsyncMatchCounterRepository,
+    MatchCounterRepository,
+)
+from .match_repository import AsyncMatchRepository, MatchRepository
+from .ongoing_match_snapshot_repository import OngoingMatchSnapshotRepository
+from .player_rating_repository import PlayerRatingRepository
+from .player_repository import AsyncPlayerRepository, PlayerRepository
+from .player_stats_repository import PlayerStatsRepository
 
-__all__ = ['MatchRepository', 'PlayerRepository']
+__all__ = [
+    'MatchRepository',
+    'AsyncMatchRepository',
+    'MatchCounterRepository',
+    'AsyncMatchCounterRepository',
+    'OngoingMatchSnapshotRepository',
+    'PlayerRepository',
+    'AsyncPlayerRepository',
+    'PlayerStatsRepository',
+    'PlayerRatingRepository',
+]
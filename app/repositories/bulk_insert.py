@@ -0,0 +1,48 @@
+"""
+Массовая вставка в SQLite многострочными VALUES в обход SQLAlchemy:
+подготовка параметров SQLAlchemy для каждой строки стоила бы дороже самой
+вставки, а один многострочный запрос выполняется вдвое быстрее, чем те же
+строки в executemany.
+"""
+
+from collections.abc import Sequence
+from itertools import chain
+from typing import Any
+
+from sqlalchemy import Connection
+
+# Параметров в одном запросе не больше, чем принимает любая сборка SQLite.
+_SQLITE_MAX_PARAMS = 999
+
+
+def _insert_sql(table: str, columns: Sequence[str], rows: int, suffix: str) -> str:
+    names = ', '.join(f'"{column}"' for column in columns)
+    values = ', '.join([f'({", ".join("?" * len(columns))})'] * rows)
+    return f'INSERT INTO "{table}" ({names}) VALUES {values}{suffix}'
+
+
+def insert_values(
+    connection: Connection,
+    table: str,
+    columns: Sequence[str],
+    rows: Sequence[tuple[Any, ...]],
+    suffix: str = '',
+) -> list[int]:
+    """
+    Вставляет строки значений `columns` запросами по `_SQLITE_MAX_PARAMS`
+    параметров; `suffix` дописывается к каждому запросу (например, `ON
+    CONFLICT`). Возвращает id вставленных строк: строки одного запроса
+    получают id подряд, после наибольшего.
+    """
+    per_statement = _SQLITE_MAX_PARAMS // len(columns)
+    row_ids: list[int] = []
+    for start in range(0, len(rows), per_statement):
+        batch = rows[start : start + per_statement]
+        # Запросы полных пачек одинаковы, и драйвер готовит их один раз.
+        result = connection.exec_driver_sql(
+            _insert_sql(table, columns, len(batch), suffix),
+            tuple(chain.from_iterable(batch)),
+        )
+        last_id = result.lastrowid
+        row_ids.extend(range(last_id - len(batch) + 1, last_id + 1))
+    return row_ids
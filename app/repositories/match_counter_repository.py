@@ -0,0 +1,99 @@
+from collections import Counter
+from collections.abc import Iterable, Mapping
+
+from sqlalchemy import Select, delete, func, insert, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import ALL_MATCHES_KEY, Match, MatchCounter
+
+from .upsert import upsert_insert
+
+
+def _build_find_total_statement(player_id: int | None) -> Select[tuple[int]]:
+    key = ALL_MATCHES_KEY if player_id is None else player_id
+    return select(MatchCounter.matches).where(MatchCounter.player_id == key)
+
+
+class MatchCounterRepository:
+    def __init__(self, session: Session):
+        self._session = session
+
+    def find_total(self, player_id: int | None = None) -> int:
+        """Число матчей игрока, а без `player_id` - всех матчей."""
+        stmt = _build_find_total_statement(player_id)
+        return self._session.execute(stmt).scalar() or 0
+
+    def increment(self, player_ids: Iterable[int]) -> None:
+        """Учитывает один новый матч между игроками `player_ids`."""
+        self.add(Counter({ALL_MATCHES_KEY: 1, **dict.fromkeys(player_ids, 1)}))
+
+    def add(self, counts: Mapping[int, int]) -> None:
+        """
+        Прибавляет к счетчикам `{id игрока: число новых матчей}` одним
+        executemany: запрос на одну строку компилируется один раз, а не
+        заново для каждого числа строк, как многострочный VALUES.
+        """
+        stmt = upsert_insert(self._session, MatchCounter)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MatchCounter.player_id],
+            set_={'Matches': MatchCounter.matches + stmt.excluded.Matches},
+        )
+        self._session.execute(
+            stmt,
+            [{'player_id': key, 'matches': n} for key, n in sorted(counts.items())],
+        )
+
+    def find_all(self) -> dict[int, int]:
+        rows = self._session.execute(
+            select(MatchCounter.player_id, MatchCounter.matches)
+        )
+        return {player_id: matches for player_id, matches in rows}
+
+    def count_matches(self) -> dict[int, int]:
+        """Счетчики, посчитанные заново по таблице матчей."""
+        participants = union_all(
+            select(Match.player1_id.label('player_id')),
+            select(Match.player2_id).where(Match.player2_id != Match.player1_id),
+        ).subquery()
+        rows = self._session.execute(
+            select(participants.c.player_id, func.count()).group_by(
+                participants.c.player_id
+            )
+        )
+        counts = {player_id: matches for player_id, matches in rows}
+        total = self._session.execute(select(func.count()).select_from(Match))
+        counts[ALL_MATCHES_KEY] = total.scalar() or 0
+        return counts
+
+    def rebuild(self) -> dict[int, int]:
+        """
+        Пересчитывает счетчики по таблице матчей и возвращает новые значения.
+        Записи матчей, идущие параллельно, ждут конца пересчета: в PostgreSQL
+        таблица счетчиков блокируется, в SQLite запись и так одна.
+        """
+        if self._session.get_bind().dialect.name == 'postgresql':
+            self._session.execute(
+                text('LOCK TABLE "MatchCounters" IN SHARE ROW EXCLUSIVE MODE')
+            )
+        # Сначала удаление: в SQLite оно захватывает блокировку записи до
+        # подсчета, и подсчет видит все матчи.
+        self._session.execute(delete(MatchCounter))
+        counts = self.count_matches()
+        self._session.execute(
+            insert(MatchCounter),
+            [
+                {'player_id': player_id, 'matches': matches}
+                for player_id, matches in counts.items()
+            ],
+        )
+        return counts
+
+
+class AsyncMatchCounterRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def find_total(self, player_id: int | None = None) -> int:
+        stmt = _build_find_total_statement(player_id)
+        return (await self._session.execute(stmt)).scalar() or 0
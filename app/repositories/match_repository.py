@@ -1,9 +1,104 @@
-from collections.abc import Sequence
+import uuid as uuid_pkg
+from collections.abc import Iterator, Sequence
+from typing import Any
 
-from sqlalchemy import func, or_, select
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, Select, func, insert, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased, joinedload
 
-from app.models import Match, Player
+from app.models import Base, Match, MatchSet, Player
+
+from .bulk_insert import insert_values
+
+
+def _build_base_statement() -> Select[tuple[Match]]:
+    return select(Match).options(
+        joinedload(Match.player1, innerjoin=True),
+        joinedload(Match.player2, innerjoin=True),
+        joinedload(Match.winner, innerjoin=True),
+    )
+
+
+def _build_page_statement(
+    *,
+    limit: int,
+    offset: int = 0,
+    player: Player | None = None,
+    after_id: int | None = None,
+    before_id: int | None = None,
+) -> Select[tuple[Match]]:
+    """
+    Матчи идут от новых к старым: `after_id` - страница старше матча с этим
+    id, `before_id` - новее. Страница "новее" выбирается по возрастанию id,
+    чтобы индекс читался от курсора, а не с начала.
+    """
+    ascending = before_id is not None
+    id_order = Match.id.asc() if ascending else Match.id.desc()
+
+    if player is None:
+        stmt = _build_base_statement()
+        if before_id is not None:
+            stmt = stmt.where(Match.id > before_id)
+        if after_id is not None:
+            stmt = stmt.where(Match.id < after_id)
+        return stmt.order_by(id_order).limit(limit).offset(offset)
+
+    # Вместо `Player1 = :id OR Player2 = :id`, для которого нужен просмотр
+    # всей таблицы, - две выборки по индексам (Player1, ID) и (Player2, ID),
+    # каждая не длиннее нужного префикса, слитые через UNION ALL. Матч
+    # игрока с самим собой берется только из первой.
+    branches = []
+    for column, other in [
+        (Match.player1_id, None),
+        (Match.player2_id, Match.player1_id),
+    ]:
+        branch = select(Match.id).where(column == player.id)
+        if other is not None:
+            branch = branch.where(other != player.id)
+        if before_id is not None:
+            branch = branch.where(Match.id > before_id)
+        if after_id is not None:
+            branch = branch.where(Match.id < after_id)
+        prefix = branch.order_by(id_order).limit(limit + offset).subquery()
+        branches.append(select(prefix.c.id))
+    match_ids = union_all(*branches).subquery()
+
+    return (
+        _build_base_statement()
+        .join(match_ids, Match.id == match_ids.c.id)
+        .order_by(match_ids.c.id.asc() if ascending else match_ids.c.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def _build_tie_break_statement(
+    *, set_number: int, limit: int, after_id: int | None = None
+) -> Select[tuple[Match]]:
+    # Условие на тай-брейк совпадает с условием частичного индекса
+    # ix_MatchSets_TieBreak: выборка читает только его.
+    stmt = (
+        _build_base_statement()
+        .join(MatchSet, MatchSet.match_id == Match.id)
+        .where(
+            MatchSet.set_number == set_number,
+            MatchSet.tie_break_player1_points.is_not(None),
+        )
+    )
+    if after_id is not None:
+        stmt = stmt.where(MatchSet.match_id < after_id)
+    return stmt.order_by(MatchSet.match_id.desc()).limit(limit)
+
+
+# Колонки строк `MatchRepository.insert_many` в порядке значений кортежей.
+MATCH_ROW_COLUMNS = ('UUID', 'Player1', 'Player2', 'Winner', 'Score')
+SET_ROW_COLUMNS = (
+    'SetNumber',
+    'Player1Games',
+    'Player2Games',
+    'TieBreakPlayer1',
+    'TieBreakPlayer2',
+)
 
 
 class MatchRepository:
@@ -13,27 +108,158 @@ class MatchRepository:
     def add(self, match_: Match) -> None:
         self._session.add(match_)
 
+    def add_many(self, matches: Sequence[Match]) -> None:
+        self._session.add_all(matches)
+
+    def insert_many(
+        self,
+        matches: Sequence[tuple[Any, ...]],
+        sets: Sequence[Sequence[tuple[Any, ...]]],
+    ) -> None:
+        """
+        Вставляет матчи (кортежи значений `MATCH_ROW_COLUMNS`, uuid - объект
+        UUID) и их сеты (`sets[i]` - кортежи `SET_ROW_COLUMNS` сетов
+        `matches[i]`) пачкой запросов, минуя ORM.
+        """
+        if not matches:
+            return
+        matches_table = Base.metadata.tables[Match.__tablename__]
+        sets_table = Base.metadata.tables[MatchSet.__tablename__]
+        set_columns = ('MatchID', *SET_ROW_COLUMNS)
+        connection = self._session.connection()
+        if connection.dialect.name == 'sqlite':
+            # Блокировка записи держится до коммита, поэтому id пачки идут
+            # подряд.
+            match_ids = insert_values(
+                connection,
+                matches_table.name,
+                MATCH_ROW_COLUMNS,
+                [(row[0].hex, *row[1:]) for row in matches],
+            )
+            insert_values(
+                connection,
+                sets_table.name,
+                set_columns,
+                [
+                    (match_id, *set_row)
+                    for match_id, match_sets in zip(match_ids, sets, strict=True)
+                    for set_row in match_sets
+                ],
+            )
+            return
+
+        # В PostgreSQL вставка SQLAlchemy собирает строки в многострочные
+        # VALUES, а executemany драйвера шлет их по одной.
+        stmt = insert(matches_table).returning(matches_table.c.UUID, matches_table.c.ID)
+        rows = self._session.execute(
+            stmt, [dict(zip(MATCH_ROW_COLUMNS, row)) for row in matches]
+        )
+        ids = {match_uuid: match_id for match_uuid, match_id in rows}
+        set_rows = [
+            dict(zip(set_columns, (ids[row[0]], *set_row)))
+            for row, match_sets in zip(matches, sets, strict=True)
+            for set_row in match_sets
+        ]
+        if set_rows:
+            self._session.execute(insert(sets_table), set_rows)
+
+    def find_existing_uuids(self, uuids: Sequence[uuid_pkg.UUID]) -> set[uuid_pkg.UUID]:
+        stmt = select(Match.uuid).where(Match.uuid.in_(uuids))
+        return set(self._session.scalars(stmt))
+
+    def find_latest_id(self) -> int:
+        return self._session.execute(select(func.max(Match.id))).scalar() or 0
+
     def find_many(
         self, *, limit: int, offset: int, player: Player | None = None
-    ) -> tuple[Sequence[Match], int]:
-        stmt = select(Match).options(
-            joinedload(Match.player1, innerjoin=True),
-            joinedload(Match.player2, innerjoin=True),
-            joinedload(Match.winner, innerjoin=True),
+    ) -> Sequence[Match]:
+        stmt = _build_page_statement(limit=limit, offset=offset, player=player)
+        return self._session.scalars(stmt).all()
+
+    def find_many_by_cursor(
+        self,
+        *,
+        limit: int,
+        player: Player | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> Sequence[Match]:
+        """
+        Постраничная выборка по курсору (keyset) без OFFSET и подсчета: время
+        не зависит от глубины страницы. Матчи возвращаются от новых к старым.
+        """
+        stmt = _build_page_statement(
+            limit=limit, player=player, after_id=after_id, before_id=before_id
+        )
+        matches = self._session.scalars(stmt).all()
+        return matches[::-1] if before_id is not None else matches
+
+    def find_many_with_tie_break(
+        self, *, set_number: int, limit: int, after_id: int | None = None
+    ) -> Sequence[Match]:
+        """
+        Матчи с тай-брейком в сете `set_number` от новых к старым; `after_id` -
+        курсор, как у `find_many_by_cursor`. Матч идет до двух выигранных
+        сетов, поэтому тай-брейк в третьем сете решает матч.
+        """
+        stmt = _build_tie_break_statement(
+            set_number=set_number, limit=limit, after_id=after_id
         )
+        return self._session.scalars(stmt).all()
 
-        if player:
-            stmt = stmt.where(
-                or_(
-                    Match.player1_id == player.id,
-                    Match.player2_id == player.id,
-                )
+    def stream_with_sets(self, *, batch_size: int) -> Iterator[Row[Any]]:
+        """
+        Все матчи по возрастанию id с именами игроков и сетами, по строке на
+        сет (для матча без сетов - одна строка с `None`). Строки читаются
+        курсором на стороне сервера пачками по `batch_size`, а не загружаются
+        в память целиком; сессия должна быть открыта до конца чтения.
+        """
+        player1, player2, winner = aliased(Player), aliased(Player), aliased(Player)
+        stmt = (
+            select(
+                Match.id,
+                Match.uuid,
+                player1.name,
+                player2.name,
+                winner.name,
+                MatchSet.player1_games,
+                MatchSet.player2_games,
+                MatchSet.tie_break_player1_points,
+                MatchSet.tie_break_player2_points,
             )
+            .join(player1, player1.id == Match.player1_id)
+            .join(player2, player2.id == Match.player2_id)
+            .join(winner, winner.id == Match.winner_id)
+            .outerjoin(MatchSet, MatchSet.match_id == Match.id)
+            .order_by(Match.id, MatchSet.set_number)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self._session.execute(stmt)
 
-        count_stmt = select(func.count()).select_from(stmt.subquery())
-        total_matches = self._session.execute(count_stmt).scalar() or 0
 
-        stmt = stmt.order_by(Match.id.desc()).limit(limit).offset(offset)
+class AsyncMatchRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
 
-        matches = self._session.scalars(stmt).all()
-        return matches, total_matches
+    async def find_latest_id(self) -> int:
+        return (await self._session.execute(select(func.max(Match.id)))).scalar() or 0
+
+    async def find_many(
+        self, *, limit: int, offset: int, player: Player | None = None
+    ) -> Sequence[Match]:
+        stmt = _build_page_statement(limit=limit, offset=offset, player=player)
+        return (await self._session.scalars(stmt)).all()
+
+    async def find_many_by_cursor(
+        self,
+        *,
+        limit: int,
+        player: Player | None = None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> Sequence[Match]:
+        stmt = _build_page_statement(
+            limit=limit, player=player, after_id=after_id, before_id=before_id
+        )
+        matches = (await self._session.scalars(stmt)).all()
+        return matches[::-1] if before_id is not None else matches
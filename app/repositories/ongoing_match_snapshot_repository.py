@@ -0,0 +1,47 @@
+import uuid as uuid_pkg
+from collections.abc import Sequence
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models import OngoingMatchSnapshot
+
+
+class OngoingMatchSnapshotRepository:
+    def __init__(self, session: Session):
+        self._session = session
+
+    def find_one_by_uuid(self, uuid: uuid_pkg.UUID) -> OngoingMatchSnapshot | None:
+        stmt = select(OngoingMatchSnapshot).where(OngoingMatchSnapshot.uuid == uuid)
+        return self._session.scalars(stmt).one_or_none()
+
+    def find_all(self) -> Sequence[OngoingMatchSnapshot]:
+        return self._session.scalars(select(OngoingMatchSnapshot)).all()
+
+    def add(self, snapshot: OngoingMatchSnapshot) -> None:
+        self._session.add(snapshot)
+
+    def update_state_if_version(
+        self, uuid: uuid_pkg.UUID, expected_version: int, state: bytes
+    ) -> bool:
+        stmt = (
+            update(OngoingMatchSnapshot)
+            .where(
+                OngoingMatchSnapshot.uuid == uuid,
+                OngoingMatchSnapshot.version == expected_version,
+            )
+            .values(state=state, version=expected_version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        result = self._session.execute(stmt)
+        return result.rowcount == 1
+
+    def delete_by_uuid(
+        self, uuid: uuid_pkg.UUID, expected_version: int | None = None
+    ) -> bool:
+        stmt = delete(OngoingMatchSnapshot).where(OngoingMatchSnapshot.uuid == uuid)
+        if expected_version is not None:
+            stmt = stmt.where(OngoingMatchSnapshot.version == expected_version)
+        stmt = stmt.execution_options(synchronize_session=False)
+        result = self._session.execute(stmt)
+        return result.rowcount == 1
@@ -0,0 +1,119 @@
+from collections.abc import Iterable, Sequence
+from itertools import batched, islice
+
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.domain.rating import INITIAL_RATING, Ratings
+from app.models import Match, Player, PlayerRating
+
+from .upsert import upsert_insert
+
+_SELECT_BATCH_SIZE = 900
+
+
+def _loser_id(player1_id: int, player2_id: int, winner_id: int) -> int:
+    return player1_id + player2_id - winner_id
+
+
+class PlayerRatingRepository:
+    def __init__(self, session: Session):
+        self._session = session
+
+    def find_top(self, limit: int) -> Sequence[tuple[PlayerRating, str]]:
+        """Игроки с наибольшим рейтингом и их имена."""
+        stmt = (
+            select(PlayerRating, Player.name)
+            .join(Player, Player.id == PlayerRating.player_id)
+            .order_by(PlayerRating.rating.desc(), PlayerRating.player_id.desc())
+            .limit(limit)
+        )
+        return [(rating, name) for rating, name in self._session.execute(stmt)]
+
+    def add_matches(self, matches: Iterable[Match]) -> None:
+        """Учитывает новые матчи по порядку, начиная с текущих рейтингов игроков."""
+        self.add_results(
+            (m.winner_id, _loser_id(m.player1_id, m.player2_id, m.winner_id))
+            for m in matches
+            if m.player1_id != m.player2_id
+        )
+
+    def add_results(self, results: Iterable[tuple[int, int]]) -> None:
+        """То же для результатов `(победитель, проигравший)` по порядку."""
+        results = list(results)
+        if not results:
+            return
+
+        # Строки создаются заранее, чтобы блокировать их все в порядке id:
+        # параллельные записи матчей тех же игроков ждут друг друга без
+        # взаимных блокировок.
+        player_ids = sorted({player_id for result in results for player_id in result})
+        stmt = upsert_insert(self._session, PlayerRating)
+        self._session.execute(
+            stmt.on_conflict_do_nothing(index_elements=[PlayerRating.player_id]),
+            [
+                {'player_id': player_id, 'rating': INITIAL_RATING, 'matches': 0}
+                for player_id in player_ids
+            ],
+        )
+        # Игроки читаются частями: параметров в одном запросе SQLite не больше
+        # 999 в старых сборках, а в импорте игроков может быть сколько угодно.
+        rows = {
+            row.player_id: row
+            for ids in batched(player_ids, _SELECT_BATCH_SIZE)
+            for row in self._session.scalars(
+                select(PlayerRating)
+                .where(PlayerRating.player_id.in_(ids))
+                .order_by(PlayerRating.player_id)
+                .with_for_update()
+            )
+        }
+
+        ratings = Ratings({pid: (row.rating, row.matches) for pid, row in rows.items()})
+        for winner_id, loser_id in results:
+            ratings.record(winner_id, loser_id)
+        for player_id, rating, rated_matches in ratings.items():
+            rows[player_id].rating = rating
+            rows[player_id].matches = rated_matches
+
+    def recompute(self, chunk_size: int = 50_000) -> int:
+        """
+        Пересчитывает рейтинги с нуля по всем матчам в порядке id и возвращает
+        число прочитанных матчей. Матчи читаются пачками по `chunk_size` после
+        id последнего прочитанного, поэтому в памяти - одна пачка и рейтинги
+        игроков. Записи матчей, идущие параллельно, ждут конца пересчета.
+        """
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        if self._session.get_bind().dialect.name == 'postgresql':
+            self._session.execute(
+                text('LOCK TABLE "PlayerRatings" IN SHARE ROW EXCLUSIVE MODE')
+            )
+
+        ratings = Ratings()
+        after_id, count = 0, 0
+        while True:
+            chunk = self._session.execute(
+                select(Match.id, Match.player1_id, Match.player2_id, Match.winner_id)
+                .where(Match.id > after_id)
+                .order_by(Match.id)
+                .limit(chunk_size)
+            ).all()
+            if not chunk:
+                break
+            for _, player1_id, player2_id, winner_id in chunk:
+                ratings.record(winner_id, _loser_id(player1_id, player2_id, winner_id))
+            after_id = chunk[-1][0]
+            count += len(chunk)
+
+        self._session.execute(delete(PlayerRating))
+        items = ratings.items()
+        while rows := list(islice(items, chunk_size)):
+            self._session.execute(
+                insert(PlayerRating),
+                [
+                    {'player_id': player_id, 'rating': rating, 'matches': matches}
+                    for player_id, rating, matches in rows
+                ],
+            )
+        return count
@@ -1,23 +1,54 @@
+from collections.abc import Sequence
+
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.models import Player
 
+from .upsert import upsert_insert
+
 
 class PlayerRepository:
     def __init__(self, session: Session):
         self._session = session
 
+    def find_one_by_id(self, player_id: int) -> Player | None:
+        return self._session.get(Player, player_id)
+
     def find_one_by_name(self, name: str) -> Player | None:
         stmt = select(Player).where(Player.name == name)
         return self._session.scalars(stmt).one_or_none()
 
+    def find_all_names(self) -> Sequence[str]:
+        return self._session.scalars(select(Player.name)).all()
+
+    def find_many_by_names(self, names: Sequence[str]) -> Sequence[Player]:
+        stmt = select(Player).where(Player.name.in_(names))
+        return self._session.scalars(stmt).all()
+
     def add(self, player: Player) -> None:
         self._session.add(player)
 
-    def find_or_create(self, name: str) -> Player:
-        player = self.find_one_by_name(name)
-        if player is None:
-            player = Player(name=name)
-            self._session.add(player)
-        return player
+    def upsert_many(self, names: Sequence[str]) -> Sequence[Player]:
+        """
+        Находит или создает игроков одним запросом. Пустое обновление при
+        конфликте нужно, чтобы RETURNING вернул и уже существующих игроков;
+        одновременное создание того же имени не нарушает уникальность.
+        """
+        insert_stmt = upsert_insert(self._session, Player).values(
+            [{'name': name} for name in dict.fromkeys(names)]
+        )
+        stmt = insert_stmt.on_conflict_do_update(
+            index_elements=[Player.name], set_={'Name': insert_stmt.excluded.Name}
+        ).returning(Player)
+        return self._session.scalars(stmt).all()
+
+
+class AsyncPlayerRepository:
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def find_one_by_name(self, name: str) -> Player | None:
+        stmt = select(Player).where(Player.name == name)
+        return (await self._session.scalars(stmt)).one_or_none()
@@ -0,0 +1,230 @@
+import struct
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import (
+    ColumnElement,
+    CompoundSelect,
+    Select,
+    case,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.orm import QueryableAttribute, Session
+
+from app.models import ALL_OPPONENTS_KEY, Match, MatchSet, Player, PlayerStat
+
+from .bulk_insert import insert_values
+from .upsert import upsert_insert
+
+_TOTALS = (
+    'matches',
+    'wins',
+    'sets_won',
+    'sets_lost',
+    'tie_breaks_won',
+    'tie_breaks_lost',
+)
+
+
+# Итоги матча или пары игроков упакованы в одно целое по 32 бита на значение в
+# порядке `_TOTALS`: итоги пар копятся сложением целых, а не списков.
+_PACKED_TOTALS = struct.Struct(f'<{len(_TOTALS)}I')
+
+
+def pack_match_totals(set_rows: Iterable[Sequence[Any]], first: bool, won: bool) -> int:
+    """
+    Упакованные итоги одного матча (сеты - строки `SET_ROW_COLUMNS`) для
+    первого (`first`) или второго игрока, выигравшего (`won`) или нет.
+    """
+    sets_won = sets_lost = tie_breaks_won = tie_breaks_lost = 0
+    for _, player1_games, player2_games, tie_break1, tie_break2 in set_rows:
+        own, other = (player1_games, player2_games)[:: 1 if first else -1]
+        sets_won += own > other
+        sets_lost += own < other
+        if tie_break1 is not None:
+            own, other = (tie_break1, tie_break2 or 0)[:: 1 if first else -1]
+            tie_breaks_won += own > other
+            tie_breaks_lost += own < other
+    packed = _PACKED_TOTALS.pack(
+        1, won, sets_won, sets_lost, tie_breaks_won, tie_breaks_lost
+    )
+    return int.from_bytes(packed, 'little')
+
+
+def _unpack_totals(packed: int) -> tuple[int, ...]:
+    return _PACKED_TOTALS.unpack(packed.to_bytes(_PACKED_TOTALS.size, 'little'))
+
+
+def _count_won(
+    own: QueryableAttribute[int | None], other: QueryableAttribute[int | None]
+) -> ColumnElement[int]:
+    return func.sum(case((own > other, 1), else_=0))
+
+
+def _build_count_statement() -> CompoundSelect[Any]:
+    """Итоги по таблицам матчей и сетов: против каждого соперника и в целом."""
+    sets = (
+        select(
+            MatchSet.match_id,
+            _count_won(MatchSet.player1_games, MatchSet.player2_games).label('p1'),
+            _count_won(MatchSet.player2_games, MatchSet.player1_games).label('p2'),
+            _count_won(
+                MatchSet.tie_break_player1_points, MatchSet.tie_break_player2_points
+            ).label('p1_tie_breaks'),
+            _count_won(
+                MatchSet.tie_break_player2_points, MatchSet.tie_break_player1_points
+            ).label('p2_tie_breaks'),
+        )
+        .group_by(MatchSet.match_id)
+        .cte()
+    )
+
+    # Матч глазами каждого игрока; матч игрока с самим собой - один раз.
+    sides = []
+    for player, opponent, own, other in [
+        (Match.player1_id, Match.player2_id, 'p1', 'p2'),
+        (Match.player2_id, Match.player1_id, 'p2', 'p1'),
+    ]:
+        side = select(
+            player.label('player_id'),
+            opponent.label('opponent_id'),
+            case((Match.winner_id == player, 1), else_=0).label('wins'),
+            func.coalesce(sets.c[own], 0).label('sets_won'),
+            func.coalesce(sets.c[other], 0).label('sets_lost'),
+            func.coalesce(sets.c[f'{own}_tie_breaks'], 0).label('tie_breaks_won'),
+            func.coalesce(sets.c[f'{other}_tie_breaks'], 0).label('tie_breaks_lost'),
+        ).outerjoin(sets, sets.c.match_id == Match.id)
+        if own == 'p2':
+            side = side.where(Match.player2_id != Match.player1_id)
+        sides.append(side)
+    matches = union_all(*sides).cte()
+
+    def totals(opponent: ColumnElement[int]) -> Select[Any]:
+        return select(
+            matches.c.player_id,
+            opponent,
+            func.count(),
+            *(func.sum(matches.c[name]) for name in _TOTALS[1:]),
+        )
+
+    return union_all(
+        totals(matches.c.opponent_id).group_by(
+            matches.c.player_id, matches.c.opponent_id
+        ),
+        totals(literal(ALL_OPPONENTS_KEY)).group_by(matches.c.player_id),
+    )
+
+
+class PlayerStatsRepository:
+    def __init__(self, session: Session):
+        self._session = session
+
+    def find_one(
+        self, player_id: int, opponent_id: int = ALL_OPPONENTS_KEY
+    ) -> PlayerStat | None:
+        return self._session.get(PlayerStat, (player_id, opponent_id))
+
+    def find_opponents(
+        self, player_id: int, limit: int
+    ) -> Sequence[tuple[PlayerStat, str]]:
+        """Итоги против самых частых соперников игрока и их имена."""
+        stmt = (
+            select(PlayerStat, Player.name)
+            .join(Player, Player.id == PlayerStat.opponent_id)
+            .where(
+                PlayerStat.player_id == player_id,
+                PlayerStat.opponent_id != ALL_OPPONENTS_KEY,
+            )
+            .order_by(PlayerStat.matches.desc(), PlayerStat.opponent_id.desc())
+            .limit(limit)
+        )
+        return [(stat, name) for stat, name in self._session.execute(stmt)]
+
+    def add_matches(self, matches: Iterable[Match]) -> None:
+        """Учитывает новые матчи (со сетами)."""
+        totals: dict[tuple[int, int], int] = {}
+        for m in matches:
+            set_rows = [
+                (
+                    s.set_number,
+                    s.player1_games,
+                    s.player2_games,
+                    s.tie_break_player1_points,
+                    s.tie_break_player2_points,
+                )
+                for s in m.sets
+            ]
+            # Матч игрока с самим собой учитывается один раз.
+            sides = [(m.player1_id, m.player2_id, True)]
+            if m.player2_id != m.player1_id:
+                sides.append((m.player2_id, m.player1_id, False))
+            for player_id, opponent_id, first in sides:
+                packed = pack_match_totals(set_rows, first, m.winner_id == player_id)
+                for key in [(player_id, opponent_id), (player_id, ALL_OPPONENTS_KEY)]:
+                    totals[key] = totals.get(key, 0) + packed
+        self.add_totals(totals)
+
+    def add_totals(self, totals: Mapping[tuple[int, int], int]) -> None:
+        """
+        Прибавляет итоги `(игрок, соперник) -> сумма pack_match_totals`,
+        включая итоги против всех соперников. Запросы идут через соединение,
+        минуя ORM: массовая вставка ORM разбирает каждую строку заново, а
+        строк итогов после импорта - сотни тысяч.
+        """
+        if not totals:
+            return
+
+        columns = inspect(PlayerStat).columns
+        keys = [columns[name].name for name in ('player_id', 'opponent_id', *_TOTALS)]
+        rows = [
+            (*key, *_unpack_totals(packed)) for key, packed in sorted(totals.items())
+        ]
+        connection = self._session.connection()
+        if connection.dialect.name == 'sqlite':
+            names = [columns[name].name for name in _TOTALS]
+            insert_values(
+                connection,
+                PlayerStat.__tablename__,
+                keys,
+                rows,
+                ' ON CONFLICT ("PlayerID", "OpponentID") DO UPDATE SET '
+                + ', '.join(
+                    f'"{name}" = "{name}" + excluded."{name}"' for name in names
+                ),
+            )
+            return
+
+        stmt = upsert_insert(self._session, PlayerStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PlayerStat.player_id, PlayerStat.opponent_id],
+            set_={
+                columns[name].name: columns[name] + stmt.excluded[columns[name].name]
+                for name in _TOTALS
+            },
+        )
+        connection.execute(stmt, [dict(zip(keys, row, strict=True)) for row in rows])
+
+    def rebuild(self) -> int:
+        """
+        Пересчитывает все итоги по таблицам матчей и сетов и возвращает число
+        строк итогов. Записи матчей, идущие параллельно, ждут конца пересчета.
+        """
+        if self._session.get_bind().dialect.name == 'postgresql':
+            self._session.execute(
+                text('LOCK TABLE "PlayerStats" IN SHARE ROW EXCLUSIVE MODE')
+            )
+        self._session.execute(delete(PlayerStat))
+        columns = inspect(PlayerStat).columns
+        stmt = insert(PlayerStat).from_select(
+            [columns[name] for name in ['player_id', 'opponent_id', *_TOTALS]],
+            _build_count_statement(),
+        )
+        self._session.execute(stmt)
+        return self._session.scalar(select(func.count()).select_from(PlayerStat)) or 0
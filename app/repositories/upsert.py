@@ -0,0 +1,15 @@
+"""
+`INSERT ... ON CONFLICT` поддерживают обе используемые СУБД (PostgreSQL
+и SQLite), но конструкция в SQLAlchemy у каждой своя.
+"""
+
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert_insert(session: Session, entity: Any) -> postgresql.Insert | sqlite.Insert:
+    if session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(entity)
+    return sqlite.insert(entity)
@@ -1,29 +1,124 @@
+"""
+Маршрутизатор запросов.
+
+Маршруты без параметров хранятся в словаре и находятся одним обращением.
+Маршруты с параметрами (`/players/{player_id}`) раскладываются по сегментам пути
+в префиксное дерево, поэтому поиск зависит от длины пути, а не от числа
+маршрутов. В каждом узле сначала проверяется точное совпадение сегмента, затем
+сегмент-параметр и последними - сегменты с параметром внутри (`/file-{id}.txt`).
+"""
+
+from __future__ import annotations
+
 import re
 from collections.abc import Callable
+from dataclasses import dataclass, field
 from typing import Any
 
+Handler = Callable[..., Any]
+
+_PARAM_RE = re.compile(r'\{([a-zA-Z_][a-zA-Z0-9_]*)\}')
+
+
+@dataclass
+class _Node:
+    children: dict[str, _Node] = field(default_factory=dict)
+    params: list[tuple[str, _Node]] = field(default_factory=list)
+    patterns: list[tuple[str, re.Pattern[str], _Node]] = field(default_factory=list)
+    handler: Handler | None = None
+
 
 class Router:
     def __init__(self) -> None:
-        self.routes: dict[str, list[tuple[re.Pattern[str], Callable[..., Any]]]] = {}
+        self._static_routes: dict[str, dict[str, Handler]] = {}
+        self._trees: dict[str, _Node] = {}
+
+    def add_route(self, method: str, path: str, handler: Handler) -> None:
+        # При повторной регистрации пути действует первый обработчик.
+        if _PARAM_RE.search(path) is None:
+            self._static_routes.setdefault(method, {}).setdefault(path, handler)
+            return
 
-    def add_route(self, method: str, path: str, handler: Callable[..., Any]) -> None:
-        path_regex = self._convert_path_to_regex(path)
-        self.routes.setdefault(method, []).append((path_regex, handler))
+        node = self._trees.setdefault(method, _Node())
+        for segment in path.split('/'):
+            node = self._add_segment(node, segment)
+        if node.handler is None:
+            node.handler = handler
 
     def resolve(
         self, method: str, path: str
-    ) -> tuple[Callable[..., Any] | None, dict[str, Any] | None]:
-        routes_array = self.routes.get(method)
-        if not routes_array:
+    ) -> tuple[Handler | None, dict[str, Any] | None]:
+        handler = self._static_routes.get(method, {}).get(path)
+        if handler is not None:
+            return handler, {}
+
+        root = self._trees.get(method)
+        if root is None:
+            return None, None
+        params: dict[str, Any] = {}
+        node = self._match(root, path.split('/'), 0, params)
+        if node is None:
             return None, None
+        return node.handler, params
+
+    def _add_segment(self, node: _Node, segment: str) -> _Node:
+        param_match = _PARAM_RE.fullmatch(segment)
+        if param_match is not None:
+            name = param_match.group(1)
+            for param_name, child in node.params:
+                if param_name == name:
+                    return child
+            child = _Node()
+            node.params.append((name, child))
+            return child
+
+        if _PARAM_RE.search(segment) is not None:
+            for pattern_segment, _, child in node.patterns:
+                if pattern_segment == segment:
+                    return child
+            pattern = self._compile_segment(segment)
+            child = _Node()
+            node.patterns.append((segment, pattern, child))
+            return child
+
+        return node.children.setdefault(segment, _Node())
+
+    def _compile_segment(self, segment: str) -> re.Pattern[str]:
+        parts = []
+        position = 0
+        for param_match in _PARAM_RE.finditer(segment):
+            parts.append(re.escape(segment[position : param_match.start()]))
+            parts.append(f'(?P<{param_match.group(1)}>[^/]+?)')
+            position = param_match.end()
+        parts.append(re.escape(segment[position:]))
+        return re.compile(''.join(parts))
+
+    def _match(
+        self, node: _Node, segments: list[str], index: int, params: dict[str, Any]
+    ) -> _Node | None:
+        if index == len(segments):
+            return node if node.handler is not None else None
+
+        segment = segments[index]
+        child = node.children.get(segment)
+        if child is not None:
+            found = self._match(child, segments, index + 1, params)
+            if found is not None:
+                return found
 
-        for path_regex, handler in routes_array:
-            path_match = path_regex.fullmatch(path)
-            if path_match:
-                return handler, path_match.groupdict()
-        return None, None
+        if segment:
+            for name, child in node.params:
+                found = self._match(child, segments, index + 1, params)
+                if found is not None:
+                    params[name] = segment
+                    return found
 
-    def _convert_path_to_regex(self, path: str) -> re.Pattern[str]:
-        path_regex = re.sub(r'\{([a-zA-Z_][a-zA-Z0-9_]*)\}', r'(?P<\1>[^/]+)', path)
-        return re.compile(path_regex)
+            for _, pattern, child in node.patterns:
+                segment_match = pattern.fullmatch(segment)
+                if segment_match is None:
+                    continue
+                found = self._match(child, segments, index + 1, params)
+                if found is not None:
+                    params.update(segment_match.groupdict())
+                    return found
+        return None
@@ -1,13 +1,35 @@
-from app.controllers import MainController, MatchController
+from app.conditional import ConditionalHandler
+from app.controllers import (
+    MainController,
+    MatchController,
+    MetricsController,
+    PlayerController,
+)
 from app.router import Router
 
 
 def register_routes(
-    router: Router, main_ctrl: MainController, match_ctrl: MatchController
+    router: Router,
+    main_ctrl: MainController,
+    match_ctrl: MatchController,
+    metrics_ctrl: MetricsController | None = None,
+    player_ctrl: PlayerController | None = None,
+    use_async: bool = False,
 ) -> None:
-    router.add_route(method='GET', path='/', handler=main_ctrl.show_index_page)
+    """`use_async` регистрирует асинхронные обработчики там, где они есть (ASGI)."""
     router.add_route(
-        method='GET', path='/new-match', handler=match_ctrl.show_new_match_page
+        method='GET',
+        path='/',
+        handler=ConditionalHandler(
+            main_ctrl.show_index_page, main_ctrl.index_page_validators
+        ),
+    )
+    router.add_route(
+        method='GET',
+        path='/new-match',
+        handler=ConditionalHandler(
+            match_ctrl.show_new_match_page, match_ctrl.new_match_page_validators
+        ),
     )
     router.add_route(
         method='POST',
@@ -15,11 +37,66 @@ def register_routes(
         handler=match_ctrl.handle_new_match_creation,
     )
     router.add_route(
-        method='GET', path='/match-score', handler=match_ctrl.show_match_score_page
+        method='GET',
+        path='/match-score',
+        handler=ConditionalHandler(
+            match_ctrl.show_match_score_page, match_ctrl.match_score_page_validators
+        ),
     )
     router.add_route(
         method='POST', path='/match-score', handler=match_ctrl.handle_score_update
     )
+    if use_async:
+        # Потоковые ответы держат соединение открытым: только для ASGI, где
+        # соединение не занимает поток.
+        router.add_route(
+            method='GET',
+            path='/match-score/stream',
+            handler=match_ctrl.stream_match_score,
+        )
+    router.add_route(
+        method='POST',
+        path='/match-score/points',
+        handler=match_ctrl.handle_batch_score_update,
+    )
     router.add_route(
-        method='GET', path='/matches', handler=match_ctrl.show_matches_page
+        method='GET',
+        path='/matches',
+        handler=(
+            ConditionalHandler(
+                match_ctrl.show_matches_page_async,
+                match_ctrl.matches_page_validators_async,
+                pass_validators=True,
+            )
+            if use_async
+            else ConditionalHandler(
+                match_ctrl.show_matches_page,
+                match_ctrl.matches_page_validators,
+                pass_validators=True,
+            )
+        ),
     )
+    if not use_async:
+        # Выгрузка читает БД синхронным курсором по мере отправки ответа: только
+        # для WSGI, где тело ответа - итератор в потоке сервера.
+        router.add_route(
+            method='GET', path='/matches/export', handler=match_ctrl.export_matches
+        )
+    if player_ctrl is not None:
+        router.add_route(
+            method='GET', path='/players/search', handler=player_ctrl.search_players
+        )
+        router.add_route(
+            method='GET',
+            path='/players/{player_id}',
+            handler=player_ctrl.show_player_page,
+        )
+        router.add_route(
+            method='GET',
+            path='/leaderboard',
+            handler=player_ctrl.show_leaderboard_page,
+        )
+    if metrics_ctrl is not None:
+        router.add_route(
+            method='GET', path='/metrics', handler=metrics_ctrl.show_metrics
+        )
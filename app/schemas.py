@@ -1,6 +1,18 @@
-from pydantic import BaseModel, ConfigDict, field_validator
+import re
+import uuid as uuid_pkg
+from typing import Any, Self
+
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    NonNegativeInt,
+    field_validator,
+    model_validator,
+)
 
 from app.domain import PlayerIdentifier
+from app.domain.score import SetBreakDownDict
 
 
 class CreateMatchSchema(BaseModel):
@@ -22,3 +34,85 @@ class PointWinnerSchema(BaseModel):
             return PlayerIdentifier(int(value))
         except (ValueError, TypeError):
             raise ValueError('point_winner must be "0" or "1"')
+
+
+class PointWinnersSchema(BaseModel):
+    point_winners: list[PlayerIdentifier] = Field(min_length=1, max_length=1000)
+
+    @field_validator('point_winners', mode='before')
+    @classmethod
+    def to_enum_list(cls, value: str) -> list[PlayerIdentifier]:
+        try:
+            return [PlayerIdentifier(int(item)) for item in value.split(',')]
+        except (ValueError, TypeError, AttributeError):
+            raise ValueError(
+                'point_winners must be a comma-separated list of "0" and "1"'
+            )
+
+
+# Счет сета в обычной записи, как в выгрузке: `7-6(7-5)`.
+_SET_SCORE = re.compile(r'(\d+)-(\d+)(?:\((\d+)-(\d+)\))?')
+
+
+def parse_set_scores(value: str) -> list[SetBreakDownDict]:
+    """Сеты из строки вида `6-4 7-6(7-5)`; `ValueError` для другой строки."""
+    sets: list[SetBreakDownDict] = []
+    for part in value.split():
+        match_ = _SET_SCORE.fullmatch(part)
+        if match_ is None:
+            raise ValueError(f'sets must look like "6-4 7-6(7-5)", got {part!r}')
+        p1_games, p2_games, p1_points, p2_points = match_.groups()
+        set_data: SetBreakDownDict = {
+            'player1_games': int(p1_games),
+            'player2_games': int(p2_games),
+        }
+        if p1_points is not None:
+            set_data['tie_break_points'] = [int(p1_points), int(p2_points)]
+        sets.append(set_data)
+    return sets
+
+
+class ImportedSetSchema(BaseModel):
+    player1_games: int = Field(ge=0)
+    player2_games: int = Field(ge=0)
+    tie_break_points: tuple[NonNegativeInt, NonNegativeInt] | None = None
+
+
+class ImportedMatchSchema(BaseModel):
+    """
+    Завершенный матч из файла импорта: счет по сетам (`sets`, список или
+    строка `6-4 7-6(7-5)`) или последовательность очков (`points`, строка
+    из "0" и "1" - номеров выигравших очко игроков). Победитель и uuid
+    необязательны; поля выгрузки (`export-matches`) принимаются как есть.
+    """
+
+    player1_name: str = Field(min_length=1, max_length=255)
+    player2_name: str = Field(min_length=1, max_length=255)
+    winner_name: str | None = None
+    uuid: uuid_pkg.UUID | None = None
+    sets: list[ImportedSetSchema] | None = None
+    points: list[PlayerIdentifier] | None = None
+
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    @field_validator('sets', mode='before')
+    @classmethod
+    def parse_sets(cls, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        return parse_set_scores(value)
+
+    @field_validator('points', mode='before')
+    @classmethod
+    def parse_points(cls, value: Any) -> Any:
+        if not isinstance(value, str):
+            return value
+        if value.strip('01'):
+            raise ValueError('points must be a string of "0" and "1"')
+        return [int(point) for point in value]
+
+    @model_validator(mode='after')
+    def check_score(self) -> Self:
+        if (self.sets is None) == (self.points is None):
+            raise ValueError('Exactly one of sets and points must be given')
+        return self
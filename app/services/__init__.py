@@ -1,3 +1,18 @@
+from .finished_match_writer import FinishedMatchWriter
+from .live_score_hub import LiveScoreHub, ScoreSubscription
+from .match_importer import MatchImporter
 from .match_service import MatchService
+from .player_cache import PlayerCache
+from .player_name_index import PlayerNameIndex
+from .player_service import PlayerService
 
-__all__ = ['MatchService']
+__all__ = [
+    'MatchService',
+    'PlayerService',
+    'PlayerNameIndex',
+    'PlayerCache',
+    'FinishedMatchWriter',
+    'MatchImporter',
+    'LiveScoreHub',
+    'ScoreSubscription',
+]
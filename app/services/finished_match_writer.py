@@ -0,0 +1,217 @@
+"""
+Отложенная запись (write-behind) завершенных матчей в БД.
+
+Запрос, завершивший матч, только ставит его в ограниченную очередь, а фоновый
+поток пишет накопленные матчи пачками: одна вставка всех матчей пачки и по
+одному обновлению счетчиков, итогов и рейтингов игроков в одной транзакции
+(рейтинги - в порядке матчей в очереди). Поток ждет пачку не дольше
+`flush_interval` секунд. Когда очередь заполнена, постановка в нее ждет
+освобождения места (backpressure) не дольше `submit_timeout` секунд.
+
+Матч остается в очереди, пока его пачка не закоммичена, и до этого момента
+история матчей показывает его из очереди. При ошибке БД пачка пишется заново
+через `retry_interval` секунд. При сбое процесса незаписанные матчи теряются:
+очередь живет только в памяти; остановка ждет их записи ограниченное время.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import Counter, deque
+from collections.abc import Sequence
+from itertools import islice
+
+from app.database import Database
+from app.domain import OngoingMatch
+from app.domain.score import SetBreakDownDict
+from app.exceptions import InconsistentMatchStateError
+from app.models import ALL_MATCHES_KEY, Match, MatchSet
+from app.repositories import (
+    MatchCounterRepository,
+    MatchRepository,
+    PlayerRatingRepository,
+    PlayerStatsRepository,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def build_match_orm(ongoing_match: OngoingMatch) -> Match:
+    winner = ongoing_match.winner
+    if winner is None:
+        raise InconsistentMatchStateError(
+            'The match is over but the winner has not been determined'
+        )
+    score_data = ongoing_match.score.get_final_score_data()
+    return Match(
+        uuid=ongoing_match.uuid,
+        player1_id=ongoing_match.player1.id,
+        player2_id=ongoing_match.player2.id,
+        winner_id=winner.id,
+        score_json=json.dumps(score_data),
+        sets=[
+            _build_match_set(number, set_data)
+            for number, set_data in enumerate(score_data['sets_breakdown'], start=1)
+        ],
+    )
+
+
+def _build_match_set(number: int, set_data: SetBreakDownDict) -> MatchSet:
+    tie_break = set_data.get('tie_break_points')
+    return MatchSet(
+        set_number=number,
+        player1_games=set_data['player1_games'],
+        player2_games=set_data['player2_games'],
+        tie_break_player1_points=tie_break[0] if tie_break else None,
+        tie_break_player2_points=tie_break[1] if tie_break else None,
+    )
+
+
+class FinishedMatchWriter:
+    def __init__(
+        self,
+        db: Database,
+        max_pending: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        submit_timeout: float | None = 30.0,
+        retry_interval: float = 1.0,
+    ):
+        if max_pending < 1:
+            raise ValueError('max_pending must be positive')
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self._db = db
+        self._max_pending = max_pending
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._submit_timeout = submit_timeout
+        self._retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._pending: deque[OngoingMatch] = deque()
+        self._submitted = 0
+        self._written = 0
+        self._flush_waiters = 0
+        self._closed = False
+        # Остановка не дождалась записи: повторять пачку больше незачем.
+        self._abandoned = False
+        self._thread = threading.Thread(target=self._write_batches, daemon=True)
+        self._thread.start()
+
+    @property
+    def submitted(self) -> int:
+        """Число матчей, поставленных в очередь за все время."""
+        return self._submitted
+
+    def submit(self, ongoing_match: OngoingMatch) -> None:
+        """
+        Ставит завершенный матч в очередь записи. Ждет места в очереди и
+        бросает `TimeoutError`, если оно не освободилось за `submit_timeout`.
+        """
+        with self._lock:
+            has_room = self._changed.wait_for(
+                lambda: self._closed or len(self._pending) < self._max_pending,
+                self._submit_timeout,
+            )
+            if self._closed:
+                raise RuntimeError('FinishedMatchWriter is closed')
+            if not has_room:
+                raise TimeoutError('Finished match queue is full')
+            self._pending.append(ongoing_match)
+            self._submitted += 1
+            self._changed.notify_all()
+
+    def pending(self, player_id: int | None = None) -> list[OngoingMatch]:
+        """Еще не записанные матчи (игрока `player_id`) от новых к старым."""
+        with self._lock:
+            matches = list(self._pending)
+        if player_id is not None:
+            matches = [m for m in matches if player_id in (m.player1.id, m.player2.id)]
+        return matches[::-1]
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Ждет записи всех матчей, поставленных в очередь до вызова."""
+        with self._lock:
+            target = self._submitted
+            self._flush_waiters += 1
+            self._changed.notify_all()
+            try:
+                return self._changed.wait_for(lambda: self._written >= target, timeout)
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout: float | None = None) -> int:
+        """
+        Записывает оставшиеся матчи и останавливает фоновый поток. Ждет не
+        дольше `timeout` секунд (например, если БД недоступна и пачка
+        пишется заново) и возвращает число так и не записанных матчей.
+        """
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+        self._thread.join(timeout)
+        with self._lock:
+            self._abandoned = self._thread.is_alive()
+            dropped = len(self._pending) if self._abandoned else 0
+        if dropped:
+            logger.error('Dropped %d unwritten finished matches on close', dropped)
+        return dropped
+
+    def _write_batches(self) -> None:
+        retry = False
+        while True:
+            with self._lock:
+                self._changed.wait_for(lambda: self._closed or bool(self._pending))
+                if not self._pending:
+                    return
+                # Неполная пачка ждет новых матчей, пока ее никто не ждет: ни
+                # остановка, ни `flush`, ни запросы, которым не хватило места.
+                if not retry:
+                    self._changed.wait_for(self._batch_due, self._flush_interval)
+                batch = list(islice(self._pending, self._batch_size))
+
+            try:
+                self._write(batch, retry)
+            except Exception:
+                logger.exception('Failed to write %d finished matches', len(batch))
+                if self._abandoned:
+                    return
+                retry = True
+                time.sleep(self._retry_interval)
+                continue
+
+            retry = False
+            with self._lock:
+                for _ in batch:
+                    self._pending.popleft()
+                self._written += len(batch)
+                self._changed.notify_all()
+
+    def _batch_due(self) -> bool:
+        return (
+            self._closed
+            or self._flush_waiters > 0
+            or len(self._pending) >= min(self._batch_size, self._max_pending)
+        )
+
+    def _write(self, batch: Sequence[OngoingMatch], retry: bool) -> None:
+        with self._db.get_session() as session:
+            match_repo = MatchRepository(session)
+            if retry:
+                # Коммит прошлой попытки мог пройти, несмотря на ошибку.
+                written = match_repo.find_existing_uuids([m.uuid for m in batch])
+                batch = [m for m in batch if m.uuid not in written]
+            if not batch:
+                return
+
+            counts: Counter[int] = Counter({ALL_MATCHES_KEY: len(batch)})
+            for m in batch:
+                counts.update({m.player1.id, m.player2.id})
+            matches_orm = [build_match_orm(m) for m in batch]
+            match_repo.add_many(matches_orm)
+            MatchCounterRepository(session).add(counts)
+            PlayerStatsRepository(session).add_matches(matches_orm)
+            PlayerRatingRepository(session).add_matches(matches_orm)
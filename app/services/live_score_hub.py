@@ -0,0 +1,147 @@
+"""
+Раздача изменений счета подписчикам (зрителям) текущих матчей.
+
+Подписки живут в цикле событий ASGI-приложения: подписчик - это не поток,
+а событие `asyncio.Event` и ожидающее изменение, поэтому тысячи простаивающих
+соединений почти ничего не стоят. Публиковать изменения можно из любого
+потока (обработчики очков выполняются в пуле потоков): изменение считается
+один раз на матч, а не на подписчика, и передается в цикл событий через
+`call_soon_threadsafe`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import uuid as uuid_pkg
+from typing import Any
+
+from app.domain import OngoingMatch
+from app.domain.ongoing_match import MatchViewDict
+
+
+class ScoreSubscription:
+    """
+    Подписка на изменения одного матча. Если подписчик не успевает забирать
+    изменения, они сливаются в одно: зритель получает актуальный счет,
+    а очередь изменений не растет.
+    """
+
+    def __init__(self, hub: LiveScoreHub, uuid: uuid_pkg.UUID):
+        self.uuid = uuid
+        # Становится True, когда `get` вернул изменение с завершением матча.
+        self.is_finished = False
+        self._hub = hub
+        self._event = asyncio.Event()
+        self._pending: dict[str, Any] | None = None
+        self._pending_data: str | None = None
+
+    async def get(self) -> str:
+        """Ждет следующее изменение и возвращает его в виде JSON."""
+        while self._pending is None:
+            await self._event.wait()
+            self._event.clear()
+        pending, pending_data = self._pending, self._pending_data
+        self._pending = self._pending_data = None
+        if pending.get('is_finished'):
+            self.is_finished = True
+        return pending_data if pending_data is not None else json.dumps(pending)
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self)
+
+    def _push(self, delta: dict[str, Any], data: str) -> None:
+        if self._pending is None:
+            self._pending, self._pending_data = delta, data
+        else:
+            self._pending = {**self._pending, **delta}
+            self._pending_data = None
+        self._event.set()
+
+
+class LiveScoreHub:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._subscriptions: dict[uuid_pkg.UUID, set[ScoreSubscription]] = {}
+        # Последнее разосланное состояние матча: номер изменения и вид счета.
+        self._views: dict[uuid_pkg.UUID, tuple[int, MatchViewDict]] = {}
+
+    def subscribe(self, uuid: uuid_pkg.UUID) -> ScoreSubscription:
+        """Вызывается из цикла событий, в котором будут читаться изменения."""
+        subscription = ScoreSubscription(self, uuid)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscriptions.setdefault(uuid, set()).add(subscription)
+        return subscription
+
+    def set_baseline(self, ongoing_match: OngoingMatch) -> None:
+        """
+        Запоминает состояние, которое подписчик получил целиком, чтобы следующая
+        публикация содержала только изменения. Уже опубликованное состояние
+        не заменяется.
+        """
+        with self._lock:
+            if ongoing_match.uuid in self._subscriptions:
+                self._views.setdefault(
+                    ongoing_match.uuid,
+                    (ongoing_match.version, ongoing_match.get_view_model()),
+                )
+
+    def publish(self, ongoing_match: OngoingMatch) -> None:
+        """
+        Рассылает подписчикам поля счета, изменившиеся с прошлой публикации.
+        Публикации с номером изменения (`OngoingMatch.version`) не новее уже
+        разосланного - устаревшие, из конкурирующих потоков - отбрасываются.
+        """
+        uuid = ongoing_match.uuid
+        if uuid not in self._subscriptions:
+            return
+
+        with self._lock:
+            loop = self._loop
+            if loop is None or uuid not in self._subscriptions:
+                return
+            last_version, last_view = self._views.get(uuid, (-1, None))
+            if ongoing_match.version <= last_version:
+                return
+
+            view = ongoing_match.get_view_model()
+            self._views[uuid] = (ongoing_match.version, view)
+            if last_view is None:
+                delta: dict[str, Any] = dict(view)
+            else:
+                delta = {
+                    key: value
+                    for key, value in view.items()
+                    if last_view.get(key) != value
+                }
+            if not delta:
+                return
+            # Под блокировкой, чтобы изменения попадали в цикл событий в порядке
+            # публикации. Если цикл уже остановлен, раздавать изменения некому.
+            try:
+                loop.call_soon_threadsafe(
+                    self._dispatch, uuid, delta, json.dumps(delta)
+                )
+            except RuntimeError:
+                return
+
+    def subscriber_count(self, uuid: uuid_pkg.UUID) -> int:
+        with self._lock:
+            return len(self._subscriptions.get(uuid, ()))
+
+    def _dispatch(self, uuid: uuid_pkg.UUID, delta: dict[str, Any], data: str) -> None:
+        for subscription in list(self._subscriptions.get(uuid, ())):
+            subscription._push(delta, data)
+
+    def _unsubscribe(self, subscription: ScoreSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.uuid)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.uuid]
+                self._views.pop(subscription.uuid, None)
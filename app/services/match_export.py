@@ -0,0 +1,111 @@
+"""
+Выгрузка истории завершенных матчей в CSV или NDJSON.
+
+Матчи приходят из БД строками "матч + сет" по возрастанию id и сразу
+превращаются в строки текста, поэтому память не зависит от числа матчей.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Callable, Iterable, Iterator
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Literal, TypedDict
+
+from app.domain.score import SetBreakDownDict
+
+ExportFormat = Literal['csv', 'ndjson']
+
+CSV_COLUMNS = ['id', 'uuid', 'player1', 'player2', 'winner', 'sets']
+
+
+class ExportedMatchDict(TypedDict):
+    id: int
+    uuid: str
+    player1_name: str
+    player2_name: str
+    winner_name: str
+    sets: list[SetBreakDownDict]
+
+
+def group_match_rows(rows: Iterable[Any]) -> Iterator[ExportedMatchDict]:
+    """
+    Собирает матчи из строк `(id, uuid, игрок 1, игрок 2, победитель, геймы
+    игрока 1, геймы игрока 2, очки тай-брейка игрока 1 и 2)`, идущих по
+    возрастанию id; у матча без сетов сетовые поля - `None`.
+    """
+    for _, match_rows in groupby(rows, key=itemgetter(0)):
+        first = next(match_rows)
+        sets: list[SetBreakDownDict] = []
+        for row in (first, *match_rows):
+            if row[5] is None:
+                continue
+            set_data: SetBreakDownDict = {
+                'player1_games': row[5],
+                'player2_games': row[6],
+            }
+            if row[7] is not None:
+                set_data['tie_break_points'] = [row[7], row[8]]
+            sets.append(set_data)
+        yield {
+            'id': first[0],
+            'uuid': str(first[1]),
+            'player1_name': first[2],
+            'player2_name': first[3],
+            'winner_name': first[4],
+            'sets': sets,
+        }
+
+
+def format_sets(sets: Iterable[SetBreakDownDict]) -> str:
+    """Счет по сетам в обычной записи: `7-6(7-5) 4-6 6-0`."""
+    parts = []
+    for set_data in sets:
+        part = f'{set_data["player1_games"]}-{set_data["player2_games"]}'
+        tie_break = set_data.get('tie_break_points')
+        if tie_break:
+            part += f'({tie_break[0]}-{tie_break[1]})'
+        parts.append(part)
+    return ' '.join(parts)
+
+
+def to_ndjson(matches: Iterable[ExportedMatchDict]) -> Iterator[str]:
+    for match_ in matches:
+        yield json.dumps(match_, ensure_ascii=False) + '\n'
+
+
+def to_csv(matches: Iterable[ExportedMatchDict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def line(values: list[Any]) -> str:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    yield line(CSV_COLUMNS)
+    for m in matches:
+        yield line(
+            [
+                m['id'],
+                m['uuid'],
+                m['player1_name'],
+                m['player2_name'],
+                m['winner_name'],
+                format_sets(m['sets']),
+            ]
+        )
+
+
+EXPORT_WRITERS: dict[
+    ExportFormat, Callable[[Iterable[ExportedMatchDict]], Iterator[str]]
+] = {
+    'csv': to_csv,
+    'ndjson': to_ndjson,
+}
+EXPORT_CONTENT_TYPES: dict[ExportFormat, str] = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+}
@@ -0,0 +1,501 @@
+"""
+Импорт истории завершенных матчей из CSV или NDJSON в обход текущих матчей.
+
+Каждая строка файла проверяется: счет по сетам - по правилам подсчета,
+последовательность очков - розыгрышем через движок счета. Счет сетов строкой
+разбирается и проверяется один раз для каждого различного счета. Проверенные
+матчи пишутся пачками по `chunk_size`, каждая пачка - в своей транзакции:
+игроки ищутся в кэше, а не найденные в нем - запросами к БД, неизвестные
+создаются вставкой; матчи и их сеты вставляются пачкой вместе со счетчиками
+матчей. Итоги и рейтинги игроков копятся в памяти по записанным пачкам и
+пишутся одной транзакцией в конце импорта, в том числе прерванного ошибкой:
+обновлять их с каждой пачкой было дороже самой записи матчей. После аварийной
+остановки процесса их пересчитывают `rebuild-player-stats` и
+`recompute-ratings`.
+
+Строки с ошибками пропускаются и возвращаются вызывающему. Матчи с uuid, уже
+записанным в БД, пропускаются, поэтому файл с uuid (например, выгрузку
+`export-matches`) можно загружать повторно; матчи без uuid получают новый.
+"""
+
+import csv
+import json
+import secrets
+import time
+import uuid as uuid_pkg
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import batched
+from typing import Any, Literal
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.database import Database
+from app.domain import Player
+from app.domain.final_score import (
+    final_score_from_point_string,
+    final_score_from_points,
+    final_score_from_sets,
+)
+from app.domain.score import FinalScoreDict, SetBreakDownDict
+from app.exceptions import InconsistentMatchStateError
+from app.models import ALL_MATCHES_KEY, ALL_OPPONENTS_KEY
+from app.repositories import (
+    MatchCounterRepository,
+    MatchRepository,
+    PlayerRatingRepository,
+    PlayerRepository,
+    PlayerStatsRepository,
+)
+from app.repositories.player_stats_repository import pack_match_totals
+from app.schemas import ImportedMatchSchema, ImportedSetSchema, parse_set_scores
+from app.settings import settings
+
+from .player_cache import PlayerCache
+
+ImportFormat = Literal['csv', 'ndjson']
+
+# Колонки CSV выгрузки, названные иначе, чем поля импорта.
+_CSV_FIELDS = {
+    'player1': 'player1_name',
+    'player2': 'player2_name',
+    'winner': 'winner_name',
+}
+
+# Сколько различных счетов хранится разобранными: строки сетов - проверенными,
+# счета записываемых матчей - разложенными в строки сетов и итоги.
+_SCORE_CACHE_SIZE = 65_536
+
+# Имен игроков в одном запросе поиска или создания: параметров в запросе
+# SQLite не больше 999 в старых сборках.
+_NAMES_BATCH_SIZE = 900
+
+_SetRow = tuple[int, int, int, int | None, int | None]
+
+
+@dataclass(frozen=True)
+class ImportedMatch:
+    line: int
+    uuid: uuid_pkg.UUID | None
+    player1_name: str
+    player2_name: str
+    score: FinalScoreDict
+    # Счет в том виде, в котором он пишется в БД.
+    score_json: str
+
+
+@dataclass(frozen=True)
+class InvalidRow:
+    line: int
+    error: str
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    imported: int = 0
+    # Матчи с uuid, уже записанным в БД (или повторенным в файле).
+    existing: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+
+def read_matches(
+    lines: Iterable[str], import_format: ImportFormat
+) -> Iterator[ImportedMatch | InvalidRow]:
+    """Проверенные матчи и ошибки строк файла с номерами строк."""
+    if import_format == 'ndjson':
+        for line, text in enumerate(lines, start=1):
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+            except ValueError:
+                record = None
+            result = (
+                _validate_score_string(line, record)
+                if isinstance(record, dict)
+                else None
+            )
+            if result is None:
+                result = _validate(
+                    line, lambda: ImportedMatchSchema.model_validate_json(text)
+                )
+            yield result
+        return
+
+    # Поля строки - по заголовку, как у csv.DictReader, но без словаря строки с
+    # исходными именами колонок.
+    reader = csv.reader(lines)
+    fields = [_CSV_FIELDS.get(name, name) for name in next(reader, [])]
+    for row in reader:
+        if not row:
+            continue
+        data = {field: value for field, value in zip(fields, row) if value}
+        result = _validate_score_string(reader.line_num, data)
+        if result is None:
+            result = _validate(
+                reader.line_num, lambda: ImportedMatchSchema.model_validate(data)
+            )
+        yield result
+
+
+def _validate_score_string(
+    line: int, data: dict[str, Any]
+) -> ImportedMatch | InvalidRow | None:
+    """
+    Проверка строки со счетом строкой - по сетам (`6-4 7-6(7-5)`) или очками
+    (`0110...`) - без pydantic: построение модели на строку дороже проверки
+    счета. `None` - строку другого вида или с ошибкой в полях проверяет схема,
+    с ее текстом ошибки.
+    """
+    player1_name, player2_name = data.get('player1_name'), data.get('player2_name')
+    winner_name, match_uuid = data.get('winner_name'), data.get('uuid')
+    sets, points = data.get('sets'), data.get('points')
+    if (
+        not isinstance(player1_name, str)
+        or not isinstance(player2_name, str)
+        or (winner_name is not None and not isinstance(winner_name, str))
+        or (match_uuid is not None and not isinstance(match_uuid, str))
+    ):
+        return None
+    if (sets is None) == (points is None) or (
+        isinstance(points, str) and points.strip('01')
+    ):
+        return None
+    player1_name, player2_name = player1_name.strip(), player2_name.strip()
+    if not (0 < len(player1_name) <= 255 and 0 < len(player2_name) <= 255):
+        return None
+    parsed_uuid = None
+    if match_uuid is not None:
+        try:
+            parsed_uuid = uuid_pkg.UUID(match_uuid)
+        except ValueError:
+            return None
+        # Только обычные записи uuid: остальные разбирает схема.
+        if match_uuid.lower() not in (str(parsed_uuid), parsed_uuid.hex):
+            return None
+
+    try:
+        if isinstance(sets, str):
+            score, score_json = _score_from_set_string(sets)
+        elif isinstance(points, str):
+            score = final_score_from_point_string(points)
+            score_json = json.dumps(score)
+        else:
+            return None
+    except InconsistentMatchStateError as exc:
+        return InvalidRow(line, str(exc))
+    except ValueError:
+        return None
+    return _checked_match(
+        line,
+        parsed_uuid,
+        player1_name,
+        player2_name,
+        winner_name.strip() if winner_name is not None else None,
+        score,
+        score_json,
+    )
+
+
+@lru_cache(maxsize=_SCORE_CACHE_SIZE)
+def _score_from_set_string(sets: str) -> tuple[FinalScoreDict, str]:
+    """
+    Проверенный счет и его JSON по строке сетов. Счет общий для всех матчей с
+    этой строкой и не изменяется; ошибки не кэшируются.
+    """
+    score = final_score_from_sets(parse_set_scores(sets))
+    return score, json.dumps(score)
+
+
+def _validate(
+    line: int, parse: Callable[[], ImportedMatchSchema]
+) -> ImportedMatch | InvalidRow:
+    try:
+        data = parse()
+        if data.points is not None:
+            score = final_score_from_points(data.points)
+        else:
+            score = final_score_from_sets([_to_set_dict(s) for s in data.sets or []])
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        location = '.'.join(str(part) for part in error['loc'])
+        return InvalidRow(
+            line, f'{location}: {error["msg"]}' if location else error['msg']
+        )
+    except InconsistentMatchStateError as exc:
+        return InvalidRow(line, str(exc))
+
+    return _checked_match(
+        line,
+        data.uuid,
+        data.player1_name,
+        data.player2_name,
+        data.winner_name,
+        score,
+        json.dumps(score),
+    )
+
+
+def _checked_match(
+    line: int,
+    match_uuid: uuid_pkg.UUID | None,
+    player1_name: str,
+    player2_name: str,
+    winner_name: str | None,
+    score: FinalScoreDict,
+    score_json: str,
+) -> ImportedMatch | InvalidRow:
+    """Матч, если указанный в строке победитель совпадает с победителем по счету."""
+    first_won = score['player1_sets_won'] > score['player2_sets_won']
+    score_winner = player1_name if first_won else player2_name
+    if winner_name is not None and winner_name != score_winner:
+        return InvalidRow(line, f'The score is won by {score_winner!r}, not the winner')
+    return ImportedMatch(
+        line, match_uuid, player1_name, player2_name, score, score_json
+    )
+
+
+def _to_set_dict(set_data: ImportedSetSchema) -> SetBreakDownDict:
+    result: SetBreakDownDict = {
+        'player1_games': set_data.player1_games,
+        'player2_games': set_data.player2_games,
+    }
+    if set_data.tie_break_points is not None:
+        result['tie_break_points'] = list(set_data.tie_break_points)
+    return result
+
+
+def _time_ordered_uuids() -> Iterator[uuid_pkg.UUID]:
+    """
+    uuid версии 7 (RFC 9562): 48 бит времени в миллисекундах, затем счетчик со
+    случайным началом вместо случайных бит. uuid одного импорта возрастают, и
+    вставка дописывает конец уникального индекса, а не случайные его страницы.
+    """
+    prefix = (time.time_ns() // 1_000_000) << 80 | 7 << 76 | 2 << 62
+    # Счетчик - 12 бит после версии и 62 после варианта; старший бит - запас
+    # от переполнения.
+    counter = secrets.randbits(73)
+    while True:
+        yield uuid_pkg.UUID(
+            int=prefix | (counter >> 62) << 64 | counter & ((1 << 62) - 1)
+        )
+        counter += 1
+
+
+@dataclass(frozen=True)
+class _ScoreRows:
+    """Строки сетов счета и упакованные итоги матча для каждого из игроков."""
+
+    first_won: bool
+    set_rows: tuple[_SetRow, ...]
+    player1_totals: int
+    player2_totals: int
+
+
+class _PlayerAggregates:
+    """Итоги пар игроков и результаты для рейтингов по записанным пачкам."""
+
+    def __init__(self) -> None:
+        self._totals: dict[tuple[int, int], int] = {}
+        self._results: list[tuple[int, int]] = []
+
+    def add(
+        self, matches: Sequence[tuple[Any, ...]], score_rows: Sequence[_ScoreRows]
+    ) -> None:
+        totals = self._totals
+        for (_, player1_id, player2_id, _, _), rows in zip(
+            matches, score_rows, strict=True
+        ):
+            # Матч игрока с самим собой учитывается один раз и без рейтинга.
+            sides = [(player1_id, player2_id, rows.player1_totals)]
+            if player2_id != player1_id:
+                sides.append((player2_id, player1_id, rows.player2_totals))
+                self._results.append(
+                    (player1_id, player2_id)
+                    if rows.first_won
+                    else (player2_id, player1_id)
+                )
+            for player_id, opponent_id, packed in sides:
+                for key in [(player_id, opponent_id), (player_id, ALL_OPPONENTS_KEY)]:
+                    totals[key] = totals.get(key, 0) + packed
+
+    def write(self, db: Database) -> None:
+        if not self._totals:
+            return
+        with db.get_session() as session:
+            PlayerStatsRepository(session).add_totals(self._totals)
+            # Рейтинги - в порядке файла, то есть id матчей.
+            PlayerRatingRepository(session).add_results(self._results)
+        self._totals, self._results = {}, []
+
+
+class MatchImporter:
+    def __init__(
+        self,
+        db: Database,
+        player_cache: PlayerCache | None = None,
+        chunk_size: int = 50_000,
+    ):
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+        self._db = db
+        self._player_cache = player_cache or PlayerCache(
+            max_entries=settings.player_cache_size
+        )
+        self._chunk_size = chunk_size
+        self._score_rows: dict[str, _ScoreRows] = {}
+
+    def import_matches(
+        self,
+        rows: Iterable[ImportedMatch | InvalidRow],
+        on_invalid: Callable[[InvalidRow], None] | None = None,
+        on_progress: Callable[[ImportStats], None] | None = None,
+    ) -> ImportStats:
+        """
+        Пишет матчи пачками, а итоги и рейтинги игроков - в конце импорта.
+        `on_progress` вызывается после каждой записанной пачки.
+        """
+        stats = ImportStats()
+        started = time.perf_counter()
+        aggregates = _PlayerAggregates()
+        uuids = _time_ordered_uuids()
+
+        def valid_matches() -> Iterator[ImportedMatch]:
+            for row in rows:
+                stats.read += 1
+                if isinstance(row, ImportedMatch):
+                    yield row
+                    continue
+                stats.invalid += 1
+                if on_invalid is not None:
+                    on_invalid(row)
+
+        try:
+            for chunk in batched(valid_matches(), self._chunk_size):
+                self._write_chunk(chunk, stats, aggregates, uuids)
+                stats.seconds = time.perf_counter() - started
+                if on_progress is not None:
+                    on_progress(stats)
+        finally:
+            aggregates.write(self._db)
+
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+    def _write_chunk(
+        self,
+        chunk: Sequence[ImportedMatch],
+        stats: ImportStats,
+        aggregates: _PlayerAggregates,
+        uuids: Iterator[uuid_pkg.UUID],
+    ) -> None:
+        with self._db.get_session() as session:
+            match_repo = MatchRepository(session)
+            given = [m.uuid for m in chunk if m.uuid is not None]
+            seen = match_repo.find_existing_uuids(given) if given else set()
+            new = []
+            for m in chunk:
+                if m.uuid is not None:
+                    if m.uuid in seen:
+                        continue
+                    seen.add(m.uuid)
+                new.append(m)
+            stats.existing += len(chunk) - len(new)
+            if not new:
+                return
+
+            players = self._find_or_create_players(
+                session,
+                [name for m in new for name in (m.player1_name, m.player2_name)],
+            )
+            matches, sets, score_rows = [], [], []
+            counts: Counter[int] = Counter({ALL_MATCHES_KEY: len(new)})
+            for m in new:
+                player1_id = players[m.player1_name].id
+                player2_id = players[m.player2_name].id
+                rows = self._score_rows.get(m.score_json)
+                if rows is None:
+                    rows = self._cache_score_rows(m.score_json, m.score)
+                # Значения в порядке MATCH_ROW_COLUMNS и SET_ROW_COLUMNS.
+                matches.append(
+                    (
+                        m.uuid or next(uuids),
+                        player1_id,
+                        player2_id,
+                        player1_id if rows.first_won else player2_id,
+                        m.score_json,
+                    )
+                )
+                sets.append(rows.set_rows)
+                score_rows.append(rows)
+                counts[player1_id] += 1
+                if player2_id != player1_id:
+                    counts[player2_id] += 1
+            match_repo.insert_many(matches, sets)
+            MatchCounterRepository(session).add(counts)
+
+        # В кэш и итоги - только после коммита: созданные в откаченной пачке
+        # игроки и ее матчи в БД не попали.
+        for player in players.values():
+            self._player_cache.put(player)
+        aggregates.add(matches, score_rows)
+        stats.imported += len(new)
+
+    def _cache_score_rows(self, score_json: str, score: FinalScoreDict) -> _ScoreRows:
+        if len(self._score_rows) >= _SCORE_CACHE_SIZE:
+            self._score_rows.clear()
+        first_won = score['player1_sets_won'] > score['player2_sets_won']
+        set_rows = tuple(
+            _to_set_row(number, set_data)
+            for number, set_data in enumerate(score['sets_breakdown'], start=1)
+        )
+        rows = self._score_rows[score_json] = _ScoreRows(
+            first_won,
+            set_rows,
+            pack_match_totals(set_rows, True, first_won),
+            pack_match_totals(set_rows, False, not first_won),
+        )
+        return rows
+
+    def _find_or_create_players(
+        self, session: Session, names: Sequence[str]
+    ) -> dict[str, Player]:
+        players: dict[str, Player] = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            cached = self._player_cache.get(name)
+            if cached is None:
+                missing.append(name)
+            else:
+                players[name] = cached
+        if not missing:
+            return players
+
+        player_repo = PlayerRepository(session)
+        for names_batch in batched(missing, _NAMES_BATCH_SIZE):
+            found = player_repo.find_many_by_names(names_batch)
+            # Новые игроки получают id в порядке появления в файле.
+            found_names = {p.name for p in found}
+            unknown = [name for name in names_batch if name not in found_names]
+            created = player_repo.upsert_many(unknown) if unknown else []
+            for player_orm in (*found, *created):
+                players[player_orm.name] = Player(
+                    id=player_orm.id, name=player_orm.name
+                )
+        return players
+
+
+def _to_set_row(number: int, set_data: SetBreakDownDict) -> _SetRow:
+    tie_break = set_data.get('tie_break_points')
+    return (
+        number,
+        set_data['player1_games'],
+        set_data['player2_games'],
+        tie_break[0] if tie_break else None,
+        tie_break[1] if tie_break else None,
+    )
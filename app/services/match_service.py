@@ -1,49 +1,103 @@
-import json
+import asyncio
 import math
 import uuid as uuid_pkg
+from collections.abc import Callable, Generator, Sequence
+from itertools import islice
 from typing import TypedDict
 
-from app.database import Database
+from app.database import AsyncDatabase, Database
 from app.domain import OngoingMatch, Player, PlayerIdentifier
-from app.exceptions import InconsistentMatchStateError, MatchNotFoundError
+from app.exceptions import MatchNotFoundError
 from app.models import Match
-from app.repositories import MatchRepository, PlayerRepository
+from app.repositories import (
+    AsyncMatchCounterRepository,
+    AsyncMatchRepository,
+    AsyncPlayerRepository,
+    MatchCounterRepository,
+    MatchRepository,
+    PlayerRatingRepository,
+    PlayerRepository,
+    PlayerStatsRepository,
+)
 from app.settings import settings
 from app.store import OngoingMatchStore
 
+from .finished_match_writer import FinishedMatchWriter, build_match_orm
+from .live_score_hub import LiveScoreHub, ScoreSubscription
+from .match_export import EXPORT_WRITERS, ExportFormat, group_match_rows
+from .player_cache import PlayerCache
+from .player_name_index import PlayerNameIndex
+
 
 class FinishedMatchDict(TypedDict):
+    player1_id: int
     player1_name: str
+    player2_id: int
     player2_name: str
     winner_name: str
 
 
 class PaginatedMatchesDict(TypedDict):
     matches: list[FinishedMatchDict]
+    # 0 для страниц по курсору: число страниц для них не считается.
     total_pages: int
     current_page: int
+    next_after_id: int | None
+    prev_before_id: int | None
 
 
 class MatchService:
-    def __init__(self, db: Database, ongoing_match_store: OngoingMatchStore):
+    def __init__(
+        self,
+        db: Database,
+        ongoing_match_store: OngoingMatchStore,
+        async_db: AsyncDatabase | None = None,
+        live_score_hub: LiveScoreHub | None = None,
+        player_name_index: PlayerNameIndex | None = None,
+        player_cache: PlayerCache | None = None,
+        finished_match_writer: FinishedMatchWriter | None = None,
+    ):
         self._db = db
         self._ongoing_match_store = ongoing_match_store
+        self._async_db = async_db
+        self._live_score_hub = live_score_hub
+        self._player_name_index = player_name_index
+        self._player_cache = player_cache or PlayerCache(
+            max_entries=settings.player_cache_size
+        )
+        self._finished_match_writer = finished_match_writer
 
     def create_new_match(self, player1_name: str, player2_name: str) -> OngoingMatch:
-        with self._db.get_session() as session:
-            player_repo = PlayerRepository(session)
+        p1_domain, p2_domain = self._find_or_create_players(player1_name, player2_name)
+        ongoing_match = OngoingMatch(player1=p1_domain, player2=p2_domain)
+        self._ongoing_match_store.put(ongoing_match)
+        return ongoing_match
 
-            p1_orm = player_repo.find_or_create(player1_name)
-            p2_orm = player_repo.find_or_create(player2_name)
+    def _find_or_create_players(self, *names: str) -> list[Player]:
+        """
+        Игроки из кэша, а не найденные в нем - одним запросом к БД, который
+        заодно создает новых.
+        """
+        players: dict[str, Player] = {}
+        for name in names:
+            cached = self._player_cache.get(name)
+            if cached is not None:
+                players[name] = cached
 
-            session.flush()
+        missing = [name for name in names if name not in players]
+        if missing:
+            with self._db.get_session() as session:
+                players_orm = PlayerRepository(session).upsert_many(missing)
+                for player_orm in players_orm:
+                    player = Player(id=player_orm.id, name=player_orm.name)
+                    players[player.name] = player
+                    self._player_cache.put(player)
 
-            p1_domain = Player(id=p1_orm.id, name=p1_orm.name)
-            p2_domain = Player(id=p2_orm.id, name=p2_orm.name)
+            if self._player_name_index is not None:
+                for name in missing:
+                    self._player_name_index.add(name)
 
-        ongoing_match = OngoingMatch(player1=p1_domain, player2=p2_domain)
-        self._ongoing_match_store.put(ongoing_match)
-        return ongoing_match
+        return [players[name] for name in names]
 
     def get_ongoing_match(self, uuid: uuid_pkg.UUID) -> OngoingMatch:
         ongoing_match = self._ongoing_match_store.find_one(uuid)
@@ -51,45 +105,190 @@ class MatchService:
             raise MatchNotFoundError(f'Ongoing match with UUID {uuid} not found')
         return ongoing_match
 
+    async def subscribe_to_match(
+        self, uuid: uuid_pkg.UUID
+    ) -> tuple[OngoingMatch, ScoreSubscription]:
+        if self._live_score_hub is None:
+            raise RuntimeError('MatchService was created without live score hub')
+
+        # Подписка оформляется до чтения матча, чтобы не потерять изменение,
+        # записанное между чтением и подпиской.
+        subscription = self._live_score_hub.subscribe(uuid)
+        try:
+            ongoing_match = await asyncio.to_thread(self.get_ongoing_match, uuid)
+        except BaseException:
+            subscription.close()
+            raise
+        self._live_score_hub.set_baseline(ongoing_match)
+        return ongoing_match, subscription
+
     def record_point(
         self, uuid: uuid_pkg.UUID, point_winner: PlayerIdentifier
     ) -> OngoingMatch:
-        ongoing_match = self._ongoing_match_store.find_one(uuid)
-        if ongoing_match is None:
-            raise MatchNotFoundError(f'Ongoing match with UUID {uuid} not found')
+        return self._update_ongoing_match(
+            uuid, lambda ongoing_match: ongoing_match.add_point(point_winner)
+        )
 
-        new_ongoing_match = ongoing_match.add_point(point_winner)
+    def record_points(
+        self, uuid: uuid_pkg.UUID, point_winners: Sequence[PlayerIdentifier]
+    ) -> OngoingMatch:
+        return self._update_ongoing_match(
+            uuid, lambda ongoing_match: ongoing_match.add_points(point_winners)
+        )
 
-        if new_ongoing_match.is_finished:
-            winner = new_ongoing_match.winner
-            if winner is None:
-                raise InconsistentMatchStateError(
-                    'The match is over but the winner has not been determined'
-                )
-            with self._db.get_session() as session:
-                match_ = Match(
-                    uuid=new_ongoing_match.uuid,
-                    player1_id=new_ongoing_match.player1.id,
-                    player2_id=new_ongoing_match.player2.id,
-                    winner_id=winner.id,
-                    score_json=json.dumps(
-                        new_ongoing_match.score.get_final_score_data()
-                    ),
-                )
+    def _update_ongoing_match(
+        self, uuid: uuid_pkg.UUID, fn: Callable[[OngoingMatch], OngoingMatch]
+    ) -> OngoingMatch:
+        # Завершенный матч остается в хранилище, пока не сохранен в БД: очки
+        # поверх него не применяются. Сохраняет его только тот запрос, который
+        # матч завершил; при ошибке БД матч откатывается к предыдущему состоянию.
+        previous: OngoingMatch | None = None
 
-                match_repo = MatchRepository(session)
-                match_repo.add(match_)
+        def apply(ongoing_match: OngoingMatch) -> OngoingMatch:
+            nonlocal previous
+            if ongoing_match.is_finished:
+                previous = None
+                return ongoing_match
+            previous = ongoing_match
+            return fn(ongoing_match)
 
+        new_ongoing_match = self._ongoing_match_store.update(uuid, apply)
+        if new_ongoing_match is None:
+            raise MatchNotFoundError(f'Ongoing match with UUID {uuid} not found')
+
+        if previous is not None and new_ongoing_match.is_finished:
+            try:
+                self._save_finished_match(new_ongoing_match)
+            except Exception:
+                self._ongoing_match_store.compare_and_swap(new_ongoing_match, previous)
+                raise
             self._ongoing_match_store.delete(new_ongoing_match.uuid)
-        else:
-            self._ongoing_match_store.put(new_ongoing_match)
+
+        if previous is not None and self._live_score_hub is not None:
+            self._live_score_hub.publish(new_ongoing_match)
         return new_ongoing_match
 
+    def _save_finished_match(self, ongoing_match: OngoingMatch) -> None:
+        if self._finished_match_writer is not None:
+            self._finished_match_writer.submit(ongoing_match)
+            return
+
+        match_ = build_match_orm(ongoing_match)
+        with self._db.get_session() as session:
+            match_repo = MatchRepository(session)
+            match_repo.add(match_)
+            MatchCounterRepository(session).increment(
+                [match_.player1_id, match_.player2_id]
+            )
+            PlayerStatsRepository(session).add_matches([match_])
+            PlayerRatingRepository(session).add_matches([match_])
+
+    def evict_saved_matches(self) -> int:
+        """
+        Удаляет из хранилища завершенные матчи, уже записанные в БД, и
+        возвращает их число. Такие матчи остаются после сбоя между записью
+        матча и удалением его из хранилища (журнал восстанавливает их при
+        перезапуске), а очки поверх завершенного матча не применяются.
+        """
+        finished = [m for m in self._ongoing_match_store.find_all() if m.is_finished]
+        if not finished:
+            return 0
+        with self._db.get_session() as session:
+            saved = MatchRepository(session).find_existing_uuids(
+                [m.uuid for m in finished]
+            )
+        evicted = 0
+        for ongoing_match in finished:
+            if ongoing_match.uuid in saved:
+                evicted += self._ongoing_match_store.compare_and_swap(
+                    ongoing_match, None
+                )
+        return evicted
+
+    def export_finished_matches(
+        self, export_format: ExportFormat, batch_size: int = 1000
+    ) -> Generator[str]:
+        """
+        Все завершенные матчи в CSV или NDJSON кусками текста по `batch_size`
+        матчей. Сессия с БД открыта, пока генератор не дочитан или не закрыт;
+        матчи из очереди отложенной записи не выгружаются.
+        """
+        with self._db.get_session() as session:
+            rows = MatchRepository(session).stream_with_sets(batch_size=batch_size)
+            lines = EXPORT_WRITERS[export_format](group_match_rows(rows))
+            while chunk := ''.join(islice(lines, batch_size)):
+                yield chunk
+
+    def check_match_counters(self, rebuild: bool = False) -> dict[int, tuple[int, int]]:
+        """
+        Сверяет счетчики завершенных матчей с таблицей матчей. Возвращает
+        расхождения `{id игрока: (в счетчике, на самом деле)}`, где id 0 -
+        все матчи. С `rebuild` счетчики пересчитываются заново.
+        """
+        with self._db.get_session() as session:
+            counter_repo = MatchCounterRepository(session)
+            stored = counter_repo.find_all()
+            actual = counter_repo.rebuild() if rebuild else counter_repo.count_matches()
+
+        return {
+            player_id: (stored.get(player_id, 0), actual.get(player_id, 0))
+            for player_id in stored.keys() | actual.keys()
+            if stored.get(player_id, 0) != actual.get(player_id, 0)
+        }
+
+    def get_finished_matches_version(self) -> tuple[int, int]:
+        """
+        Версия истории матчей: завершенные матчи только добавляются, поэтому
+        версией служит наибольший id вместе с числом матчей, поставленных в
+        очередь отложенной записи.
+        """
+        with self._db.get_session() as session:
+            return MatchRepository(session).find_latest_id(), self._submitted_matches()
+
+    async def get_finished_matches_version_async(self) -> tuple[int, int]:
+        if self._async_db is None:
+            raise RuntimeError('MatchService was created without async database')
+        async with self._async_db.get_session() as session:
+            latest_id = await AsyncMatchRepository(session).find_latest_id()
+        return latest_id, self._submitted_matches()
+
+    def _submitted_matches(self) -> int:
+        writer = self._finished_match_writer
+        return writer.submitted if writer is not None else 0
+
+    def resolve_player_name(self, query: str) -> str | None:
+        """
+        Имя игрока для фильтра истории. С индексом имен фильтр может быть
+        началом имени, если под него подходит один игрок; без индекса имя
+        должно совпадать точно.
+        """
+        if self._player_name_index is None:
+            return query
+        return self._player_name_index.resolve(query)
+
+    async def resolve_player_name_async(self, query: str) -> str | None:
+        # Первое обращение заполняет индекс из БД: не в цикле событий.
+        index = self._player_name_index
+        if index is not None and not index.is_loaded:
+            await asyncio.to_thread(index.load)
+        return self.resolve_player_name(query)
+
     def get_finished_matches_paginated(
-        self, page: int, player_name: str | None
+        self,
+        page: int,
+        player_name: str | None,
+        after_id: int | None = None,
+        before_id: int | None = None,
     ) -> PaginatedMatchesDict:
+        """
+        Без курсора - страница `page` по смещению с подсчетом числа страниц.
+        С курсором (`after_id` - следующая страница, `before_id` - предыдущая)
+        страница выбирается по id без смещения и подсчета, а `page` служит
+        только номером для показа.
+        """
         limit = settings.default_page_size
         offset = (page - 1) * limit
+        resolved_name = self.resolve_player_name(player_name) if player_name else None
 
         with self._db.get_session() as session:
             player_repo = PlayerRepository(session)
@@ -98,30 +297,201 @@ class MatchService:
             player_orm = None
 
             if player_name:
-                player_orm = player_repo.find_one_by_name(player_name)
+                if resolved_name != player_name:
+                    # Индекс не знает игроков, созданных другими процессами
+                    # (воркерами, импортом): точное имя ищется в БД.
+                    player_orm = player_repo.find_one_by_name(player_name)
+                    if player_orm is not None and self._player_name_index is not None:
+                        self._player_name_index.add(player_orm.name)
+                if player_orm is None and resolved_name is not None:
+                    player_orm = player_repo.find_one_by_name(resolved_name)
+                if player_orm is not None:
+                    self._player_cache.put(Player(player_orm.id, player_orm.name))
+
+                if player_orm is None:
+                    return self._build_empty_page(page)
+
+            if after_id is not None or before_id is not None:
+                # Лишний матч показывает, есть ли страница дальше курсора.
+                matches_orm = match_repo.find_many_by_cursor(
+                    limit=limit + 1,
+                    player=player_orm,
+                    after_id=after_id,
+                    before_id=before_id,
+                )
+                return self._build_cursor_page(matches_orm, page, before_id)
+
+            player_id = player_orm.id if player_orm else None
+            pending = self._find_pending_matches(player_id)
+            db_limit, db_offset = self._db_window(len(pending), limit, offset)
+            matches_orm = match_repo.find_many(
+                limit=db_limit,
+                offset=db_offset,
+                player=player_orm,
+            )
+            total_matches = MatchCounterRepository(session).find_total(player_id)
+
+            return self._build_paginated_matches(
+                matches_orm, total_matches, page, pending
+            )
+
+    async def get_finished_matches_paginated_async(
+        self,
+        page: int,
+        player_name: str | None,
+        after_id: int | None = None,
+        before_id: int | None = None,
+    ) -> PaginatedMatchesDict:
+        if self._async_db is None:
+            raise RuntimeError('MatchService was created without async database')
+
+        limit = settings.default_page_size
+        offset = (page - 1) * limit
+        resolved_name = (
+            await self.resolve_player_name_async(player_name) if player_name else None
+        )
+
+        async with self._async_db.get_session() as session:
+            player_repo = AsyncPlayerRepository(session)
+            match_repo = AsyncMatchRepository(session)
+
+            player_orm = None
+
+            if player_name:
+                if resolved_name != player_name:
+                    player_orm = await player_repo.find_one_by_name(player_name)
+                    if player_orm is not None and self._player_name_index is not None:
+                        self._player_name_index.add(player_orm.name)
+                if player_orm is None and resolved_name is not None:
+                    player_orm = await player_repo.find_one_by_name(resolved_name)
+                if player_orm is not None:
+                    self._player_cache.put(Player(player_orm.id, player_orm.name))
 
                 if player_orm is None:
-                    return {'matches': [], 'total_pages': 0, 'current_page': page}
+                    return self._build_empty_page(page)
+
+            if after_id is not None or before_id is not None:
+                matches_orm = await match_repo.find_many_by_cursor(
+                    limit=limit + 1,
+                    player=player_orm,
+                    after_id=after_id,
+                    before_id=before_id,
+                )
+                return self._build_cursor_page(matches_orm, page, before_id)
 
-            matches_orm, total_matches = match_repo.find_many(
-                limit=limit,
-                offset=offset,
+            player_id = player_orm.id if player_orm else None
+            pending = self._find_pending_matches(player_id)
+            db_limit, db_offset = self._db_window(len(pending), limit, offset)
+            matches_orm = await match_repo.find_many(
+                limit=db_limit,
+                offset=db_offset,
                 player=player_orm,
             )
+            total_matches = await AsyncMatchCounterRepository(session).find_total(
+                player_id
+            )
+
+            return self._build_paginated_matches(
+                matches_orm, total_matches, page, pending
+            )
+
+    def _find_pending_matches(self, player_id: int | None) -> list[OngoingMatch]:
+        """
+        Матчи из очереди отложенной записи. Они новее всех матчей в БД и
+        показываются перед ними на страницах по смещению; страницы по курсору
+        читают только БД.
+        """
+        if self._finished_match_writer is None:
+            return []
+        return self._finished_match_writer.pending(player_id)
+
+    def _db_window(self, pending: int, limit: int, offset: int) -> tuple[int, int]:
+        """`limit` и `offset` для БД на странице, начало которой занимает очередь."""
+        on_page = max(0, min(pending - offset, limit))
+        return limit - on_page, max(0, offset - pending)
 
-            matches_dto: list[FinishedMatchDict] = [
-                {
-                    'player1_name': m.player1.name,
-                    'player2_name': m.player2.name,
-                    'winner_name': m.winner.name,
-                }
-                for m in matches_orm
+    def _build_paginated_matches(
+        self,
+        matches_orm: Sequence[Match],
+        total_matches: int,
+        page: int,
+        pending: Sequence[OngoingMatch] = (),
+    ) -> PaginatedMatchesDict:
+        limit = settings.default_page_size
+        offset = (page - 1) * limit
+        # Пачка могла записаться между чтением очереди и БД: такие матчи уже
+        # есть на странице из БД и учтены в счетчиках.
+        stored = {m.uuid for m in matches_orm}
+        pending = [m for m in pending if m.uuid not in stored]
+        total_matches += len(pending)
+        total_pages = math.ceil(total_matches / limit) if total_matches > 0 else 0
+        # Страницы по курсору читают только БД: пока в очереди есть матчи,
+        # они сдвинули бы страницы, поэтому ссылки остаются по номеру.
+        with_cursors = bool(matches_orm) and not pending
+
+        return {
+            'matches': [
+                self._build_pending_match(m) for m in pending[offset : offset + limit]
             ]
+            + self._build_finished_matches(matches_orm),
+            'total_pages': total_pages,
+            'current_page': page,
+            'next_after_id': (
+                matches_orm[-1].id if with_cursors and page < total_pages else None
+            ),
+            'prev_before_id': matches_orm[0].id if with_cursors and page > 1 else None,
+        }
+
+    def _build_cursor_page(
+        self, matches_orm: Sequence[Match], page: int, before_id: int | None
+    ) -> PaginatedMatchesDict:
+        limit = settings.default_page_size
+        has_more = len(matches_orm) > limit
+        # Лишний матч - самый дальний от курсора: при `before_id` он первый.
+        if before_id is not None:
+            matches_orm = matches_orm[-limit:]
+            has_newer, has_older = has_more, True
+        else:
+            matches_orm = matches_orm[:limit]
+            has_newer, has_older = True, has_more
+
+        return {
+            'matches': self._build_finished_matches(matches_orm),
+            'total_pages': 0,
+            'current_page': page,
+            'next_after_id': matches_orm[-1].id if matches_orm and has_older else None,
+            'prev_before_id': matches_orm[0].id if matches_orm and has_newer else None,
+        }
+
+    def _build_empty_page(self, page: int) -> PaginatedMatchesDict:
+        return {
+            'matches': [],
+            'total_pages': 0,
+            'current_page': page,
+            'next_after_id': None,
+            'prev_before_id': None,
+        }
 
-            total_pages = math.ceil(total_matches / limit) if total_matches > 0 else 0
+    def _build_pending_match(self, ongoing_match: OngoingMatch) -> FinishedMatchDict:
+        winner = ongoing_match.winner
+        return {
+            'player1_id': ongoing_match.player1.id,
+            'player1_name': ongoing_match.player1.name,
+            'player2_id': ongoing_match.player2.id,
+            'player2_name': ongoing_match.player2.name,
+            'winner_name': winner.name if winner is not None else '',
+        }
 
-            return {
-                'matches': matches_dto,
-                'total_pages': total_pages,
-                'current_page': page,
+    def _build_finished_matches(
+        self, matches_orm: Sequence[Match]
+    ) -> list[FinishedMatchDict]:
+        return [
+            {
+                'player1_id': m.player1_id,
+                'player1_name': m.player1.name,
+                'player2_id': m.player2_id,
+                'player2_name': m.player2.name,
+                'winner_name': m.winner.name,
             }
+            for m in matches_orm
+        ]
@@ -0,0 +1,58 @@
+"""
+Игроки по имени в памяти процесса, чтобы создание матча между известными
+игроками не обращалось к БД. Игрок не меняет имя и не удаляется, поэтому
+записи не устаревают: кэш только ограничен по размеру и вытесняет давно
+не использованные имена (LRU).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import TypedDict
+
+from app.domain import Player
+
+
+class PlayerCacheStats(TypedDict):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class PlayerCache:
+    def __init__(self, max_entries: int):
+        if max_entries < 1:
+            raise ValueError('max_entries must be positive')
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._players: OrderedDict[str, Player] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, name: str) -> Player | None:
+        with self._lock:
+            player = self._players.get(name)
+            if player is None:
+                self._misses += 1
+                return None
+            self._players.move_to_end(name)
+            self._hits += 1
+            return player
+
+    def put(self, player: Player) -> None:
+        with self._lock:
+            self._players[player.name] = player
+            self._players.move_to_end(player.name)
+            while len(self._players) > self._max_entries:
+                self._players.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> PlayerCacheStats:
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'size': len(self._players),
+            }
@@ -0,0 +1,110 @@
+"""
+Поиск игроков по началу имени или любого слова в нем ("nad" находит
+"Rafael Nadal"), без учета регистра.
+
+Имена хранятся в памяти в отсортированном списке строк "ключ\\0имя": ключ -
+имя в нижнем регистре, начиная с очередного слова. Поиск - двоичный поиск
+первого ключа с нужным началом и проход по следующим, поэтому он не зависит
+от числа игроков. Индекс заполняется из БД при первом обращении, а новые игроки
+добавляются в него сервисом при создании.
+"""
+
+import threading
+from bisect import bisect_left
+
+from app.database import Database
+from app.repositories import PlayerRepository
+
+_SEPARATOR = '\0'
+
+
+def _normalize(text: str) -> str:
+    return ' '.join(text.casefold().replace(_SEPARATOR, '').split())
+
+
+def _entries(name: str) -> set[str]:
+    words = _normalize(name).split(' ')
+    return {f'{" ".join(words[i:])}{_SEPARATOR}{name}' for i in range(len(words))}
+
+
+class PlayerNameIndex:
+    def __init__(self, db: Database):
+        self._db = db
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self._entries: list[str] = []
+        self._names: set[str] = set()
+        self._names_by_key: dict[str, str] = {}
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self) -> None:
+        """Заполняет индекс именами из БД; повторные вызовы ничего не делают."""
+        with self._load_lock:
+            if self._loaded:
+                return
+            with self._db.get_session() as session:
+                names = PlayerRepository(session).find_all_names()
+
+            entries = [entry for name in names for entry in _entries(name)]
+            entries.sort()
+            with self._lock:
+                # Игроки, добавленные во время загрузки, сохраняются.
+                if self._entries:
+                    entries = sorted({*entries, *self._entries})
+                self._entries = entries
+                for name in names:
+                    self._remember(name)
+                self._loaded = True
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            if name in self._names:
+                return
+            self._remember(name)
+            for entry in _entries(name):
+                self._entries.insert(bisect_left(self._entries, entry), entry)
+
+    def search(self, query: str, limit: int) -> list[str]:
+        """Имена, у которых имя или одно из слов начинается с `query`."""
+        self.load()
+        prefix = _normalize(query)
+        if not prefix:
+            return []
+
+        found: dict[str, None] = {}
+        with self._lock:
+            i = bisect_left(self._entries, prefix)
+            while (
+                len(found) < limit
+                and i < len(self._entries)
+                and self._entries[i].startswith(prefix)
+            ):
+                found[self._entries[i].split(_SEPARATOR, 1)[1]] = None
+                i += 1
+        return list(found)
+
+    def resolve(self, query: str) -> str | None:
+        """
+        Имя игрока по запросу: точное совпадение, совпадение без учета регистра
+        или единственное имя, подходящее по началу.
+        """
+        self.load()
+        with self._lock:
+            if query in self._names:
+                return query
+            name = self._names_by_key.get(_normalize(query))
+        if name is not None:
+            return name
+        candidates = self.search(query, limit=2)
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _remember(self, name: str) -> None:
+        self._names.add(name)
+        self._names_by_key.setdefault(_normalize(name), name)
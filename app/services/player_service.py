@@ -0,0 +1,112 @@
+from typing import TypedDict
+
+from app.database import Database
+from app.repositories import (
+    PlayerRatingRepository,
+    PlayerRepository,
+    PlayerStatsRepository,
+)
+from app.settings import settings
+
+from .player_name_index import PlayerNameIndex
+
+
+class HeadToHeadDict(TypedDict):
+    opponent_id: int
+    opponent_name: str
+    matches: int
+    wins: int
+    losses: int
+
+
+class PlayerStatsDict(TypedDict):
+    name: str
+    matches: int
+    wins: int
+    losses: int
+    sets_won: int
+    sets_lost: int
+    tie_breaks_won: int
+    tie_breaks_lost: int
+    head_to_head: list[HeadToHeadDict]
+
+
+class LeaderboardEntryDict(TypedDict):
+    rank: int
+    player_id: int
+    name: str
+    rating: int
+    matches: int
+
+
+class PlayerService:
+    def __init__(self, db: Database, player_name_index: PlayerNameIndex):
+        self._db = db
+        self._player_name_index = player_name_index
+
+    def search_player_names(self, query: str) -> list[str]:
+        return self._player_name_index.search(query, limit=settings.player_search_limit)
+
+    def get_player_stats(self, player_id: int) -> PlayerStatsDict | None:
+        """
+        Итоги игрока и личные встречи с самыми частыми соперниками по
+        заранее посчитанной таблице итогов; `None`, если игрока нет.
+        """
+        with self._db.get_session() as session:
+            player_orm = PlayerRepository(session).find_one_by_id(player_id)
+            if player_orm is None:
+                return None
+
+            stats_repo = PlayerStatsRepository(session)
+            total = stats_repo.find_one(player_orm.id)
+            opponents = stats_repo.find_opponents(
+                player_orm.id, limit=settings.head_to_head_limit
+            )
+
+            matches = total.matches if total else 0
+            wins = total.wins if total else 0
+            return {
+                'name': player_orm.name,
+                'matches': matches,
+                'wins': wins,
+                'losses': matches - wins,
+                'sets_won': total.sets_won if total else 0,
+                'sets_lost': total.sets_lost if total else 0,
+                'tie_breaks_won': total.tie_breaks_won if total else 0,
+                'tie_breaks_lost': total.tie_breaks_lost if total else 0,
+                'head_to_head': [
+                    {
+                        'opponent_id': stat.opponent_id,
+                        'opponent_name': opponent_name,
+                        'matches': stat.matches,
+                        'wins': stat.wins,
+                        'losses': stat.matches - stat.wins,
+                    }
+                    for stat, opponent_name in opponents
+                ],
+            }
+
+    def rebuild_player_stats(self) -> int:
+        """Пересчитывает итоги игроков по всем матчам; возвращает число строк."""
+        with self._db.get_session() as session:
+            return PlayerStatsRepository(session).rebuild()
+
+    def get_leaderboard(self) -> list[LeaderboardEntryDict]:
+        """Игроки с наибольшим рейтингом Эло, по индексу рейтинга."""
+        with self._db.get_session() as session:
+            top = PlayerRatingRepository(session).find_top(settings.leaderboard_size)
+            return [
+                {
+                    'rank': rank,
+                    'player_id': rating.player_id,
+                    'name': name,
+                    'rating': round(rating.rating),
+                    'matches': rating.matches,
+                }
+                for rank, (rating, name) in enumerate(top, start=1)
+            ]
+
+    def recompute_ratings(self, chunk_size: int) -> int:
+        """Пересчитывает рейтинги по всем матчам; возвращает число матчей."""
+        with self._db.get_session() as session:
+            return PlayerRatingRepository(session).recompute(chunk_size)
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,9 +9,23 @@ BASE_DIR = Path(__file__).parent.parent
 class Settings(BaseSettings):
     db_url: str
     db_echo: bool = False
+    # Пул соединений с БД; размеры без значений - умолчания SQLAlchemy (5 и 10).
+    # Соединений должно хватать потокам сервера и фоновым потокам, иначе
+    # запросы ждут соединения: ожидание видно на `/metrics`.
+    db_pool_size: int | None = None
+    db_max_overflow: int | None = None
+    db_pool_timeout: float | None = None
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = False
+    # Число скомпилированных SQL-выражений в кэше SQLAlchemy.
+    db_statement_cache_size: int = 500
 
     app_host: str = '127.0.0.1'
     app_port: int = 8080
+    # Размер пула потоков для синхронных обработчиков в ASGI-приложении.
+    asgi_max_workers: int = 8
+    # Интервал (в секундах) служебных сообщений в потоке счета без изменений.
+    live_score_heartbeat_interval: float = 15
 
     base_dir: Path = BASE_DIR
     template_dir: Path = base_dir / 'app' / 'templates'
@@ -19,6 +34,32 @@ class Settings(BaseSettings):
     static_url: str = '/static'
 
     default_page_size: int = 5
+    # Число игроков, хранимых в памяти по имени для создания матчей.
+    player_cache_size: int = 100_000
+    # Число подсказок при поиске игроков по началу имени.
+    player_search_limit: int = 10
+    # Число самых частых соперников на странице игрока.
+    head_to_head_limit: int = 20
+    # Число игроков в таблице лидеров по рейтингу.
+    leaderboard_size: int = 50
+    # Число текущих матчей, чьи отрендеренные страницы счета хранятся в кэше.
+    match_score_render_cache_size: int = 10_000
+
+    # Отложенная запись завершенных матчей в БД пачками из фонового потока.
+    finished_match_write_behind: bool = False
+    finished_match_queue_size: int = 10_000
+    finished_match_batch_size: int = 500
+    # Сколько (в секундах) фоновый поток ждет наполнения пачки.
+    finished_match_flush_interval: float = 0.05
+    # Сколько (в секундах) остановка сервера ждет записи оставшихся матчей.
+    finished_match_close_timeout: float = 10.0
+
+    ongoing_match_store_backend: Literal['memory', 'sql'] = 'memory'
+    ongoing_match_store_stripes: int = 64
+    # Каталог журнала текущих матчей для хранилища в памяти; без него журнал выключен.
+    ongoing_match_journal_dir: Path | None = None
+    ongoing_match_journal_checkpoint_interval: int = 100_000
+    ongoing_match_journal_sync_interval: float | None = None
 
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
 
@@ -0,0 +1,37 @@
+// Live score updates over Server-Sent Events instead of page reloads
+(function () {
+    const uuid = document.currentScript.dataset.uuid;
+
+    document.addEventListener("DOMContentLoaded", function () {
+        if (!window.EventSource) {
+            return;
+        }
+        const source = new EventSource("/match-score/stream?uuid=" + encodeURIComponent(uuid));
+
+        function applyScore(event) {
+            const score = JSON.parse(event.data);
+            for (const [field, value] of Object.entries(score)) {
+                const cell = document.querySelector('[data-field="' + field + '"]');
+                if (cell) {
+                    cell.textContent = value;
+                }
+            }
+            if (score.is_finished) {
+                // The finished match is no longer stored, so the page is updated in place
+                source.close();
+                const message = document.createElement("div");
+                message.className = "match-finished-message";
+                const title = document.createElement("h2");
+                title.textContent = "Match Finished, " + score.winner_name + " wins!";
+                message.appendChild(title);
+                document.querySelector(".score").prepend(message);
+                document.querySelectorAll(".score form").forEach(function (form) {
+                    form.parentElement.remove();
+                });
+            }
+        }
+
+        source.addEventListener("snapshot", applyScore);
+        source.addEventListener("score", applyScore);
+    });
+})();
@@ -0,0 +1,31 @@
+// Player name suggestions for the matches filter
+document.addEventListener("DOMContentLoaded", function () {
+    const input = document.querySelector(".input-filter");
+    const suggestions = document.getElementById("player-names");
+    let timer = null;
+    let controller = null;
+
+    input.addEventListener("input", function () {
+        clearTimeout(timer);
+        // Wait for a pause in typing instead of requesting on every key press
+        timer = setTimeout(function () {
+            if (controller) {
+                controller.abort();
+            }
+            controller = new AbortController();
+            fetch("/players/search?q=" + encodeURIComponent(input.value), {signal: controller.signal})
+                .then(function (response) {
+                    return response.json();
+                })
+                .then(function (names) {
+                    suggestions.replaceChildren(...names.map(function (name) {
+                        const option = document.createElement("option");
+                        option.value = name;
+                        return option;
+                    }));
+                })
+                .catch(function () {
+                });
+        }, 150);
+    });
+});
@@ -0,0 +1,11 @@
+from .base import OngoingMatchStore
+from .journal import MatchJournal
+from .memory import InMemoryOngoingMatchStore
+from .sql import SqlOngoingMatchStore
+
+__all__ = [
+    'OngoingMatchStore',
+    'InMemoryOngoingMatchStore',
+    'SqlOngoingMatchStore',
+    'MatchJournal',
+]
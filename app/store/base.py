@@ -0,0 +1,39 @@
+import uuid as uuid_pkg
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+
+from app.domain import OngoingMatch
+
+
+class OngoingMatchStore(ABC):
+    """
+    Хранилище текущих матчей.
+
+    `update` и `compare_and_swap` атомарны относительно других операций над тем
+    же матчем. `fn` в `update` может быть вызвана повторно (например, при
+    оптимистичной блокировке), поэтому не должна иметь побочных эффектов.
+    """
+
+    @abstractmethod
+    def put(self, match_obj: OngoingMatch) -> None: ...
+
+    @abstractmethod
+    def delete(self, uuid: uuid_pkg.UUID) -> None: ...
+
+    @abstractmethod
+    def find_one(self, uuid: uuid_pkg.UUID) -> OngoingMatch | None: ...
+
+    @abstractmethod
+    def find_all(self) -> list[OngoingMatch]: ...
+
+    @abstractmethod
+    def update(
+        self, uuid: uuid_pkg.UUID, fn: Callable[[OngoingMatch], OngoingMatch]
+    ) -> OngoingMatch | None:
+        """Заменяет матч на `fn(текущий матч)`; `None`, если матча нет."""
+
+    @abstractmethod
+    def compare_and_swap(
+        self, expected: OngoingMatch, new_match: OngoingMatch | None
+    ) -> bool:
+        """Заменяет (или удаляет при `None`) матч, только если он равен `expected`."""
@@ -0,0 +1,291 @@
+"""
+Журнал предзаписи (write-ahead log) для хранилища текущих матчей в памяти.
+
+Журнал состоит из сегментов `journal-<N>.log` и контрольной точки
+`checkpoint-<N>.bin`, которая содержит все текущие матчи на момент перехода
+к сегменту N. При восстановлении загружается последняя контрольная точка, затем
+по порядку применяются записи сегментов начиная с N.
+
+Каждая запись содержит UUID матча и его новое состояние в компактном формате
+`app.domain.codec` (при изменении счета - только счет и номер изменения).
+Записи идемпотентны: повторное применение дает то же состояние, поэтому
+контрольная точка снимается без остановки записи - запись, попавшая и в точку,
+и в новый сегмент, просто применится повторно.
+
+Записи накапливаются в буфере и сбрасываются на диск групповым коммитом:
+один поток выполняет `fsync` за всех, кто ждет устойчивости своих записей.
+С `sync_interval` запись не ждет диска: буфер сбрасывает фоновый поток раз в
+`sync_interval` секунд, и при сбое теряются изменения за последний интервал.
+"""
+
+import os
+import struct
+import threading
+import uuid as uuid_pkg
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
+from pathlib import Path
+from typing import BinaryIO
+
+from app.domain import OngoingMatch, Score
+from app.domain.codec import (
+    decode_ongoing_match,
+    decode_versioned_score,
+    encode_ongoing_match,
+    encode_versioned_score,
+)
+from app.exceptions import SerializationError
+
+_SEGMENT_PREFIX = 'journal-'
+_SEGMENT_SUFFIX = '.log'
+_CHECKPOINT_PREFIX = 'checkpoint-'
+_CHECKPOINT_SUFFIX = '.bin'
+
+# Заголовок записи: длина тела и CRC32 тела.
+_HEADER = struct.Struct('<II')
+
+_PUT = 1
+_VERSIONED_SCORE = 2
+_DELETE = 3
+
+
+class MatchJournal:
+    def __init__(
+        self,
+        directory: Path,
+        checkpoint_interval: int = 100_000,
+        sync_interval: float | None = None,
+    ):
+        if checkpoint_interval < 1:
+            raise ValueError('checkpoint_interval must be positive')
+        if sync_interval is not None and sync_interval <= 0:
+            raise ValueError('sync_interval must be positive')
+        self._directory = directory
+        self._checkpoint_interval = checkpoint_interval
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._buffer = bytearray()
+        self._flushing = False
+        self._last_lsn = 0
+        self._durable_lsn = 0
+        self._segment_records = 0
+
+        existing = self._numbers(_SEGMENT_PREFIX, _SEGMENT_SUFFIX)
+        self._segment = max(existing, default=0) + 1
+        self._file = self._open_segment(self._segment)
+
+        self._sync_interval = sync_interval
+        self._closed = threading.Event()
+        if sync_interval is not None:
+            threading.Thread(
+                target=self._sync_periodically, args=(sync_interval,), daemon=True
+            ).start()
+
+    @property
+    def checkpoint_due(self) -> bool:
+        return self._segment_records >= self._checkpoint_interval
+
+    def recover(self) -> list[OngoingMatch]:
+        """Восстанавливает матчи из файлов, записанных до открытия журнала."""
+        checkpoint = max(
+            self._numbers(_CHECKPOINT_PREFIX, _CHECKPOINT_SUFFIX), default=0
+        )
+        matches: dict[bytes, OngoingMatch] = {}
+        if checkpoint:
+            for ongoing_match in self._read_checkpoint(checkpoint):
+                matches[ongoing_match.uuid.bytes] = ongoing_match
+
+        # Записи идемпотентны, поэтому для матча достаточно последней записи
+        # матча целиком и последующей последней записи счета: декодируются
+        # только они, а не каждая запись журнала.
+        puts: dict[bytes, bytes] = {}
+        scores: dict[bytes, bytes] = {}
+        for segment in sorted(self._numbers(_SEGMENT_PREFIX, _SEGMENT_SUFFIX)):
+            if not checkpoint <= segment < self._segment:
+                continue
+            path = self._path(_SEGMENT_PREFIX, segment, _SEGMENT_SUFFIX)
+            for body in self._iter_records(path.read_bytes()):
+                record_type, key, payload = body[0], body[1:17], body[17:]
+                if record_type == _PUT:
+                    puts[key] = payload
+                    scores.pop(key, None)
+                elif record_type == _VERSIONED_SCORE:
+                    if key in puts or key in matches:
+                        scores[key] = payload
+                elif record_type == _DELETE:
+                    matches.pop(key, None)
+                    puts.pop(key, None)
+                    scores.pop(key, None)
+                else:
+                    raise SerializationError(
+                        f'Unknown journal record type: {record_type}'
+                    )
+
+        for key, payload in puts.items():
+            matches[key] = decode_ongoing_match(payload)
+        for key, payload in scores.items():
+            score, version = decode_versioned_score(payload)
+            matches[key] = replace(matches[key], score=score, version=version)
+        return list(matches.values())
+
+    def log_put(self, ongoing_match: OngoingMatch) -> int:
+        return self._append(
+            _PUT, ongoing_match.uuid, encode_ongoing_match(ongoing_match)
+        )
+
+    def log_score(self, uuid: uuid_pkg.UUID, score: Score, version: int) -> int:
+        return self._append(
+            _VERSIONED_SCORE, uuid, encode_versioned_score(score, version)
+        )
+
+    def log_delete(self, uuid: uuid_pkg.UUID) -> int:
+        return self._append(_DELETE, uuid, b'')
+
+    def sync(self, lsn: int) -> None:
+        """Ждет, пока запись с номером `lsn` и все предыдущие не окажутся на диске."""
+        if self._sync_interval is None:
+            self._flush_until(lsn)
+
+    def rotate(self) -> int:
+        """Переходит к новому сегменту и возвращает его номер."""
+        with self._lock:
+            while self._flushing:
+                self._flushed.wait()
+            self._write(self._file, bytes(self._buffer))
+            self._buffer.clear()
+            self._durable_lsn = self._last_lsn
+            self._file.close()
+
+            self._segment += 1
+            self._segment_records = 0
+            self._file = self._open_segment(self._segment)
+            return self._segment
+
+    def write_checkpoint(self, segment: int, matches: Iterable[OngoingMatch]) -> None:
+        """
+        Сохраняет контрольную точку для сегмента `segment` и удаляет файлы,
+        которые она заменяет. `matches` должны быть прочитаны после `rotate`.
+        """
+        data = bytearray()
+        for ongoing_match in matches:
+            encoded = encode_ongoing_match(ongoing_match)
+            data += _HEADER.pack(len(encoded), zlib.crc32(encoded)) + encoded
+
+        path = self._path(_CHECKPOINT_PREFIX, segment, _CHECKPOINT_SUFFIX)
+        tmp_path = path.with_suffix('.tmp')
+        with tmp_path.open('wb') as file:
+            self._write(file, bytes(data))
+        os.replace(tmp_path, path)
+        self._sync_directory()
+
+        for number in self._numbers(_CHECKPOINT_PREFIX, _CHECKPOINT_SUFFIX):
+            if number < segment:
+                self._path(_CHECKPOINT_PREFIX, number, _CHECKPOINT_SUFFIX).unlink()
+        for number in self._numbers(_SEGMENT_PREFIX, _SEGMENT_SUFFIX):
+            if number < segment:
+                self._path(_SEGMENT_PREFIX, number, _SEGMENT_SUFFIX).unlink()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            while self._flushing:
+                self._flushed.wait()
+            if self._file.closed:
+                return
+            self._write(self._file, bytes(self._buffer))
+            self._buffer.clear()
+            self._durable_lsn = self._last_lsn
+            self._file.close()
+
+    def _sync_periodically(self, interval: float) -> None:
+        while not self._closed.wait(interval):
+            self._flush_until(self._last_lsn)
+
+    def _flush_until(self, lsn: int) -> None:
+        with self._lock:
+            while self._durable_lsn < lsn:
+                if self._flushing:
+                    self._flushed.wait()
+                    continue
+
+                # Поток-лидер сбрасывает накопленный буфер за всех ожидающих.
+                self._flushing = True
+                data = bytes(self._buffer)
+                self._buffer.clear()
+                target = self._last_lsn
+                file = self._file
+                written = False
+                self._lock.release()
+                try:
+                    self._write(file, data)
+                    written = True
+                finally:
+                    self._lock.acquire()
+                    self._flushing = False
+                    self._flushed.notify_all()
+                    if not written:
+                        # Возвращаем записи в буфер, чтобы их сбросил следующий лидер.
+                        self._buffer[:0] = data
+                self._durable_lsn = max(self._durable_lsn, target)
+
+    def _append(self, record_type: int, uuid: uuid_pkg.UUID, payload: bytes) -> int:
+        body = bytes([record_type]) + uuid.bytes + payload
+        with self._lock:
+            self._buffer += _HEADER.pack(len(body), zlib.crc32(body))
+            self._buffer += body
+            self._last_lsn += 1
+            self._segment_records += 1
+            return self._last_lsn
+
+    def _read_checkpoint(self, segment: int) -> Iterator[OngoingMatch]:
+        path = self._path(_CHECKPOINT_PREFIX, segment, _CHECKPOINT_SUFFIX)
+        for body in self._iter_records(path.read_bytes()):
+            yield decode_ongoing_match(body)
+
+    @staticmethod
+    def _iter_records(data: bytes) -> Iterator[bytes]:
+        # Недописанная при сбое запись в конце файла отбрасывается.
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            size, checksum = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            body = data[start : start + size]
+            if len(body) != size or zlib.crc32(body) != checksum:
+                return
+            yield body
+            offset = start + size
+
+    def _open_segment(self, segment: int) -> BinaryIO:
+        file = self._path(_SEGMENT_PREFIX, segment, _SEGMENT_SUFFIX).open('ab')
+        self._sync_directory()
+        return file
+
+    @staticmethod
+    def _write(file: BinaryIO, data: bytes) -> None:
+        if data:
+            file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+
+    def _sync_directory(self) -> None:
+        if os.name != 'posix':
+            return
+        fd = os.open(self._directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _path(self, prefix: str, number: int, suffix: str) -> Path:
+        return self._directory / f'{prefix}{number:08d}{suffix}'
+
+    def _numbers(self, prefix: str, suffix: str) -> list[int]:
+        numbers = []
+        for path in self._directory.glob(f'{prefix}*{suffix}'):
+            number = path.name.removeprefix(prefix).removesuffix(suffix)
+            if number.isdigit():
+                numbers.append(int(number))
+        return numbers
@@ -0,0 +1,143 @@
+import threading
+import uuid as uuid_pkg
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from app.domain import OngoingMatch
+
+from .base import OngoingMatchStore
+from .journal import MatchJournal
+
+
+@dataclass
+class _Stripe:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    matches: dict[uuid_pkg.UUID, OngoingMatch] = field(default_factory=dict)
+
+
+class InMemoryOngoingMatchStore(OngoingMatchStore):
+    """
+    Потокобезопасное хранилище текущих матчей в памяти процесса с разбиением
+    на полосы (lock striping): матч попадает в полосу по своему UUID, и операции
+    над матчами из разных полос не конкурируют за одну блокировку.
+
+    С журналом (`journal`) хранилище при создании восстанавливает матчи из него,
+    а каждое изменение записывает в журнал под блокировкой полосы (чтобы порядок
+    записей совпадал с порядком изменений) и возвращает управление только после
+    сброса записи на диск.
+    """
+
+    def __init__(self, stripes: int = 64, journal: MatchJournal | None = None) -> None:
+        if stripes < 1:
+            raise ValueError('stripes must be positive')
+        self._stripes = [_Stripe() for _ in range(stripes)]
+        self._journal = journal
+        self._checkpoint_lock = threading.Lock()
+
+        if journal is not None:
+            for ongoing_match in journal.recover():
+                self._stripe_for(ongoing_match.uuid).matches[ongoing_match.uuid] = (
+                    ongoing_match
+                )
+            self.checkpoint()
+
+    def put(self, match_obj: OngoingMatch) -> None:
+        stripe = self._stripe_for(match_obj.uuid)
+        with stripe.lock:
+            lsn = self._log_put(match_obj)
+            stripe.matches[match_obj.uuid] = match_obj
+        self._sync(lsn)
+
+    def delete(self, uuid: uuid_pkg.UUID) -> None:
+        stripe = self._stripe_for(uuid)
+        with stripe.lock:
+            if uuid not in stripe.matches:
+                return
+            lsn = self._log_delete(uuid)
+            del stripe.matches[uuid]
+        self._sync(lsn)
+
+    def find_one(self, uuid: uuid_pkg.UUID) -> OngoingMatch | None:
+        stripe = self._stripe_for(uuid)
+        with stripe.lock:
+            return stripe.matches.get(uuid)
+
+    def find_all(self) -> list[OngoingMatch]:
+        matches: list[OngoingMatch] = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                matches.extend(stripe.matches.values())
+        return matches
+
+    def update(
+        self, uuid: uuid_pkg.UUID, fn: Callable[[OngoingMatch], OngoingMatch]
+    ) -> OngoingMatch | None:
+        stripe = self._stripe_for(uuid)
+        with stripe.lock:
+            current = stripe.matches.get(uuid)
+            if current is None:
+                return None
+
+            new_match = fn(current)
+            lsn = self._log_change(current, new_match)
+            stripe.matches[uuid] = new_match
+        self._sync(lsn)
+        return new_match
+
+    def compare_and_swap(
+        self, expected: OngoingMatch, new_match: OngoingMatch | None
+    ) -> bool:
+        stripe = self._stripe_for(expected.uuid)
+        with stripe.lock:
+            current = stripe.matches.get(expected.uuid)
+            if current is None or (current is not expected and current != expected):
+                return False
+            if new_match is None:
+                lsn = self._log_delete(expected.uuid)
+                del stripe.matches[expected.uuid]
+            else:
+                lsn = self._log_change(current, new_match)
+                stripe.matches[expected.uuid] = new_match
+        self._sync(lsn)
+        return True
+
+    def checkpoint(self) -> None:
+        """Сохраняет контрольную точку журнала и удаляет замененные ею сегменты."""
+        if self._journal is None:
+            return
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            segment = self._journal.rotate()
+            self._journal.write_checkpoint(segment, self.find_all())
+        finally:
+            self._checkpoint_lock.release()
+
+    def _stripe_for(self, uuid: uuid_pkg.UUID) -> _Stripe:
+        return self._stripes[uuid.int % len(self._stripes)]
+
+    def _log_put(self, match_obj: OngoingMatch) -> int:
+        if self._journal is None:
+            return 0
+        return self._journal.log_put(match_obj)
+
+    def _log_delete(self, uuid: uuid_pkg.UUID) -> int:
+        if self._journal is None:
+            return 0
+        return self._journal.log_delete(uuid)
+
+    def _log_change(self, current: OngoingMatch, new_match: OngoingMatch) -> int:
+        if self._journal is None or new_match is current:
+            return 0
+        if (new_match.player1, new_match.player2) == (current.player1, current.player2):
+            return self._journal.log_score(
+                new_match.uuid, new_match.score, new_match.version
+            )
+        return self._journal.log_put(new_match)
+
+    def _sync(self, lsn: int) -> None:
+        if self._journal is None or not lsn:
+            return
+        self._journal.sync(lsn)
+        if self._journal.checkpoint_due:
+            self.checkpoint()
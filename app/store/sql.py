@@ -0,0 +1,92 @@
+import random
+import time
+import uuid as uuid_pkg
+from collections.abc import Callable
+
+from app.database import Database
+from app.domain import OngoingMatch
+from app.domain.codec import decode_ongoing_match, encode_ongoing_match
+from app.exceptions import ConcurrentUpdateError
+from app.models import OngoingMatchSnapshot
+from app.repositories import OngoingMatchSnapshotRepository
+
+from .base import OngoingMatchStore
+
+
+class SqlOngoingMatchStore(OngoingMatchStore):
+    """
+    Хранилище текущих матчей в таблице `OngoingMatches`, общее для нескольких
+    процессов. Матч хранится в компактном бинарном виде, а конкурентные
+    изменения разрешаются оптимистичной блокировкой по колонке `Version`.
+    """
+
+    _MAX_RETRIES = 100
+    _MAX_BACKOFF_SECONDS = 0.005
+
+    def __init__(self, db: Database):
+        self._db = db
+
+    def put(self, match_obj: OngoingMatch) -> None:
+        state = encode_ongoing_match(match_obj)
+        with self._db.get_session() as session:
+            repo = OngoingMatchSnapshotRepository(session)
+            snapshot = repo.find_one_by_uuid(match_obj.uuid)
+            if snapshot is None:
+                repo.add(
+                    OngoingMatchSnapshot(uuid=match_obj.uuid, version=0, state=state)
+                )
+            else:
+                snapshot.state = state
+                snapshot.version += 1
+
+    def delete(self, uuid: uuid_pkg.UUID) -> None:
+        with self._db.get_session() as session:
+            OngoingMatchSnapshotRepository(session).delete_by_uuid(uuid)
+
+    def find_one(self, uuid: uuid_pkg.UUID) -> OngoingMatch | None:
+        with self._db.get_session() as session:
+            snapshot = OngoingMatchSnapshotRepository(session).find_one_by_uuid(uuid)
+            if snapshot is None:
+                return None
+            return decode_ongoing_match(snapshot.state)
+
+    def find_all(self) -> list[OngoingMatch]:
+        with self._db.get_session() as session:
+            snapshots = OngoingMatchSnapshotRepository(session).find_all()
+            return [decode_ongoing_match(snapshot.state) for snapshot in snapshots]
+
+    def update(
+        self, uuid: uuid_pkg.UUID, fn: Callable[[OngoingMatch], OngoingMatch]
+    ) -> OngoingMatch | None:
+        for _ in range(self._MAX_RETRIES):
+            with self._db.get_session() as session:
+                repo = OngoingMatchSnapshotRepository(session)
+                snapshot = repo.find_one_by_uuid(uuid)
+                if snapshot is None:
+                    return None
+
+                new_match = fn(decode_ongoing_match(snapshot.state))
+                if repo.update_state_if_version(
+                    uuid, snapshot.version, encode_ongoing_match(new_match)
+                ):
+                    return new_match
+            self._backoff()
+
+        raise ConcurrentUpdateError(f'Could not update ongoing match {uuid}')
+
+    def compare_and_swap(
+        self, expected: OngoingMatch, new_match: OngoingMatch | None
+    ) -> bool:
+        with self._db.get_session() as session:
+            repo = OngoingMatchSnapshotRepository(session)
+            snapshot = repo.find_one_by_uuid(expected.uuid)
+            if snapshot is None or decode_ongoing_match(snapshot.state) != expected:
+                return False
+            if new_match is None:
+                return repo.delete_by_uuid(expected.uuid, snapshot.version)
+            return repo.update_state_if_version(
+                expected.uuid, snapshot.version, encode_ongoing_match(new_match)
+            )
+
+    def _backoff(self) -> None:
+        time.sleep(random.uniform(0, self._MAX_BACKOFF_SECONDS))
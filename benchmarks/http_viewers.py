@@ -0,0 +1,187 @@
+"""
+Пропускная способность и задержки при множестве одновременных зрителей:
+WSGI-приложение под waitress против ASGI-приложения под uvicorn.
+
+Серверы запускаются в отдельных процессах на временной SQLite-базе и
+привязываются к одному ядру, чтобы сравнение шло "на ядро". Клиенты открывают
+новое соединение на каждый запрос (`Connection: close`) и запрашивают страницу
+счета текущего матча или историю завершенных матчей.
+
+Запуск: uv run python -m benchmarks.http_viewers
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from app.models import Base
+
+HOST = '127.0.0.1'
+
+SERVERS = {
+    'waitress': [
+        sys.executable,
+        '-c',
+        'import sys, main; from waitress import serve; '
+        'serve(main.application, host=sys.argv[1], port=int(sys.argv[2]), '
+        'threads=int(sys.argv[3]), _quiet=True)',
+    ],
+    'uvicorn': [
+        sys.executable,
+        '-c',
+        'import sys, uvicorn; '
+        "uvicorn.run('main:asgi_application', host=sys.argv[1], "
+        "port=int(sys.argv[2]), log_level='warning')",
+    ],
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        port: int = sock.getsockname()[1]
+        return port
+
+
+def _wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f'Server on port {port} did not start')
+
+
+async def _fetch(port: int, request: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection(HOST, port)
+    writer.write(request)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+
+def _request(method: str, target: str, body: str = '') -> bytes:
+    return (
+        f'{method} {target} HTTP/1.1\r\nHost: {HOST}\r\nConnection: close\r\n'
+        f'Content-Type: application/x-www-form-urlencoded\r\n'
+        f'Content-Length: {len(body.encode())}\r\n\r\n{body}'
+    ).encode()
+
+
+async def _load(
+    port: int, target: str, concurrency: int, duration: float
+) -> tuple[int, int, list[float]]:
+    request = _request('GET', target)
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def viewer() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await _fetch(port, request)
+            except OSError:
+                errors += 1
+                continue
+            if response.startswith(b'HTTP/1.1 200'):
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    await asyncio.gather(*(viewer() for _ in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+def run(
+    server: str,
+    path: str,
+    concurrency: int,
+    duration: float,
+    threads: int,
+    db_url: str,
+) -> tuple[float, float, int]:
+    port = _free_port()
+    env = {**os.environ, 'DB_URL': db_url, 'DB_ECHO': 'false'}
+    process = subprocess.Popen(
+        [*SERVERS[server], HOST, str(port), str(threads)],
+        env=env,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    try:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(process.pid, {0})
+        _wait_for_port(port)
+
+        target = '/matches'
+        if path == 'match-score':
+            created = asyncio.run(
+                _fetch(
+                    port,
+                    _request(
+                        'POST', '/new-match', 'player1_name=Alice&player2_name=Bob'
+                    ),
+                )
+            )
+            location = next(
+                line.split(b': ', 1)[1].decode()
+                for line in created.split(b'\r\n')
+                if line.lower().startswith(b'location:')
+            )
+            target = location
+
+        completed, errors, latencies = asyncio.run(
+            _load(port, target, concurrency, duration)
+        )
+    finally:
+        process.terminate()
+        process.wait()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99)] if latencies else float('nan')
+    return completed / duration, p99, errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--path', choices=['match-score', 'matches'], default=None)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=4, help='waitress threads')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_url = f'sqlite:///{Path(directory) / "bench.db"}'
+        Base.metadata.create_all(create_engine(db_url))
+
+        paths = [args.path] if args.path else ['match-score', 'matches']
+        for path in paths:
+            print(f'/{path}')
+            print(
+                f'{"viewers":>8} {"server":>9} {"req/s":>9} {"p99":>10} {"errors":>7}'
+            )
+            for concurrency in (8, 64, 256):
+                for server in SERVERS:
+                    rps, p99, errors = run(
+                        server, path, concurrency, args.duration, args.threads, db_url
+                    )
+                    print(
+                        f'{concurrency:>8} {server:>9} {rps:>9,.0f}'
+                        f' {p99 * 1000:>7.1f} ms {errors:>7}'
+                    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Стоимость журнала текущих матчей: пропускная способность записи очков с
+журналом и без него, и время восстановления хранилища после перезапуска.
+
+Журнал замеряется в режиме группового коммита (запрос ждет `fsync`) и со
+сбросом фоновым потоком раз в 10 мс. Восстановление замеряется дважды:
+из одного журнала без контрольных точек (худший случай) и из контрольной точки.
+
+Запуск: uv run python -m benchmarks.journal
+"""
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.store import InMemoryOngoingMatchStore, MatchJournal
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def _add_point(ongoing_match: OngoingMatch) -> OngoingMatch:
+    winner = PlayerIdentifier.ONE if random.random() < 0.5 else PlayerIdentifier.TWO
+    return ongoing_match.add_points([winner])
+
+
+def run_throughput(
+    journal_dir: Path | None,
+    sync_interval: float | None,
+    n_threads: int,
+    n_matches: int,
+    updates: int,
+) -> float:
+    journal = None
+    if journal_dir is not None:
+        journal = MatchJournal(journal_dir, sync_interval=sync_interval)
+    store = InMemoryOngoingMatchStore(journal=journal)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(n_matches)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(offset: int) -> None:
+        barrier.wait()
+        for i in range(updates):
+            store.update(matches[(offset + i) % n_matches].uuid, _add_point)
+
+    threads = [threading.Thread(target=worker, args=(t * 7,)) for t in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if journal is not None:
+        journal.close()
+    return n_threads * updates / elapsed
+
+
+def run_recovery(
+    journal_dir: Path, n_matches: int, points: int, checkpoint: bool
+) -> tuple[float, int]:
+    journal = MatchJournal(journal_dir, checkpoint_interval=n_matches * (points + 2))
+    store = InMemoryOngoingMatchStore(journal=journal)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(n_matches)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+    for _ in range(points):
+        for ongoing_match in matches:
+            store.update(ongoing_match.uuid, _add_point)
+    if checkpoint:
+        store.checkpoint()
+    journal.close()
+    size = sum(path.stat().st_size for path in journal_dir.iterdir())
+
+    started = time.perf_counter()
+    recovered = InMemoryOngoingMatchStore(journal=MatchJournal(journal_dir))
+    elapsed = time.perf_counter() - started
+    assert all(recovered.find_one(m.uuid) is not None for m in matches)
+    return elapsed, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=256)
+    parser.add_argument('--updates', type=int, default=500)
+    parser.add_argument('--recovery-matches', type=int, default=10_000)
+    parser.add_argument('--recovery-points', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f'{"threads":>8} {"no journal":>14} {"group commit":>14} {"sync 10ms":>14}')
+    for n_threads in (1, 4, 16, 64):
+        results = [run_throughput(None, None, n_threads, args.matches, args.updates)]
+        for sync_interval in (None, 0.01):
+            with tempfile.TemporaryDirectory() as directory:
+                results.append(
+                    run_throughput(
+                        Path(directory),
+                        sync_interval,
+                        n_threads,
+                        args.matches,
+                        args.updates,
+                    )
+                )
+        print(f'{n_threads:>8} ' + ' '.join(f'{r:>12,.0f}/s' for r in results))
+
+    print()
+    print(
+        f'recovery of {args.recovery_matches:,} matches'
+        f' x {args.recovery_points} points:'
+    )
+    for checkpoint in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            elapsed, size = run_recovery(
+                Path(directory),
+                args.recovery_matches,
+                args.recovery_points,
+                checkpoint,
+            )
+        label = 'checkpoint' if checkpoint else 'log replay'
+        print(f'{label:>12}: {elapsed:.3f} s, {size / 1024:,.0f} KiB on disk')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Раздача изменений счета подписчикам `LiveScoreHub`: время доставки одного
+изменения всем подписчикам матча и память на простаивающего подписчика.
+
+Подписчики - задачи asyncio, как у потоковых ответов ASGI-приложения;
+изменения публикуются из отдельного потока, как из обработчика очков.
+
+Запуск: uv run python -m benchmarks.live_score_fanout
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.services import LiveScoreHub
+
+
+async def measure(n_subscribers: int, n_points: int) -> tuple[float, float]:
+    hub = LiveScoreHub()
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='A'), player2=Player(id=2, name='B')
+    )
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    subscriptions = [hub.subscribe(ongoing_match.uuid) for _ in range(n_subscribers)]
+    hub.set_baseline(ongoing_match)
+    received = 0
+    all_received = asyncio.Event()
+
+    async def subscriber(index: int) -> None:
+        nonlocal received
+        for _ in range(n_points):
+            await subscriptions[index].get()
+            received += 1
+            if received == n_subscribers:
+                all_received.set()
+
+    tasks = [asyncio.create_task(subscriber(i)) for i in range(n_subscribers)]
+    await asyncio.sleep(0)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    current = ongoing_match
+    for sequence in range(n_points):
+        received = 0
+        all_received.clear()
+        current = current.add_point(PlayerIdentifier(sequence % 2))
+        started = time.perf_counter()
+        publisher = threading.Thread(target=hub.publish, args=(current,))
+        publisher.start()
+        await all_received.wait()
+        latencies.append(time.perf_counter() - started)
+        publisher.join()
+
+    await asyncio.gather(*tasks)
+    for subscription in subscriptions:
+        subscription.close()
+    return min(latencies), (after - before) / n_subscribers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--points', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f'{"subscribers":>12} {"delivery":>12} {"memory/subscriber":>18}')
+    for n_subscribers in (100, 1_000, 10_000, 50_000):
+        delivery, memory = asyncio.run(measure(n_subscribers, args.points))
+        print(f'{n_subscribers:>12,} {delivery * 1000:>9.2f} ms {memory:>15,.0f} B')
+
+
+if __name__ == '__main__':
+    main()
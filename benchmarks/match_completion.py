@@ -0,0 +1,89 @@
+"""
+Пропускная способность завершения матчей: запись завершенного матча в БД
+в запросе, завершившем его, против отложенной записи пачками из фонового потока
+(`FinishedMatchWriter`).
+
+База - временный SQLite-файл. `--threads` потоков завершают по `--matches`
+матчей: каждый матч создается заранее и завершается одним вызовом
+`record_points`. Для отложенной записи время считается до записи последней
+пачки, а отдельно показывается время самих завершений.
+
+Запуск: uv run python -m benchmarks.match_completion
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app import (
+    Database,
+    FinishedMatchWriter,
+    InMemoryOngoingMatchStore,
+    MatchService,
+)
+from app.domain import PlayerIdentifier
+from app.models import Base
+
+# Матч из 48 очков первого игрока: 6:0 6:0.
+FINAL_POINTS = [PlayerIdentifier.ONE] * 48
+
+
+def run(
+    db: Database, threads: int, matches: int, writer: FinishedMatchWriter | None
+) -> tuple[float, float]:
+    match_srv = MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    uuids = [
+        match_srv.create_new_match(f'Player {i % 1000}', f'Player {i % 1000 + 1}').uuid
+        for i in range(threads * matches)
+    ]
+
+    def finish(start: int) -> None:
+        for uuid in uuids[start : start + matches]:
+            match_srv.record_points(uuid, FINAL_POINTS)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(finish, range(0, len(uuids), matches)))
+    finished_s = time.perf_counter() - started
+    if writer is not None:
+        writer.flush()
+    return finished_s, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--matches', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f'{"threads":>7} {"mode":>12} {"finish/s":>10} {"persisted/s":>12}')
+    for threads in args.threads:
+        for write_behind in [False, True]:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+                Base.metadata.create_all(db._engine)
+                writer = None
+                if write_behind:
+                    writer = FinishedMatchWriter(db=db, batch_size=args.batch_size)
+                finished_s, persisted_s = run(db, threads, args.matches, writer)
+                if writer is not None:
+                    writer.close()
+                db._engine.dispose()
+
+            total = threads * args.matches
+            mode = 'write-behind' if write_behind else 'in request'
+            print(
+                f'{threads:>7} {mode:>12} {total / finished_s:>10,.0f}'
+                f' {total / persisted_s:>12,.0f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
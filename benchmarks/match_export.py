@@ -0,0 +1,66 @@
+"""
+Потоковая выгрузка истории матчей: скорость и пиковая память выгрузки
+в зависимости от числа матчей в таблице.
+
+База - временный SQLite-файл с `--matches` матчами между `--players` игроками
+для каждого размера. Выгрузка читается до конца, как ее читал бы сервер;
+пиковая память (tracemalloc) замеряется отдельным проходом, чтобы не замедлять
+замер скорости.
+
+Запуск: uv run python -m benchmarks.match_export
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from app import Database, InMemoryOngoingMatchStore, MatchService
+from app.services.match_export import ExportFormat
+
+from .match_pagination import populate
+
+FORMATS: list[ExportFormat] = ['csv', 'ndjson']
+
+
+def export(match_srv: MatchService, export_format: ExportFormat) -> int:
+    return sum(len(chunk) for chunk in match_srv.export_finished_matches(export_format))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--matches', type=int, nargs='+', default=[100_000, 300_000, 1_000_000]
+    )
+    parser.add_argument('--players', type=int, default=1_000)
+    args = parser.parse_args()
+
+    print(
+        f'{"matches":>9} {"format":>7} {"matches/s":>10} {"MB out":>7} {"peak MB":>8}'
+    )
+    for matches in args.matches:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+            populate(db, matches, args.players)
+            match_srv = MatchService(
+                db=db, ongoing_match_store=InMemoryOngoingMatchStore()
+            )
+            for export_format in FORMATS:
+                started = time.perf_counter()
+                size = export(match_srv, export_format)
+                elapsed = time.perf_counter() - started
+
+                tracemalloc.start()
+                export(match_srv, export_format)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                print(
+                    f'{matches:>9,} {export_format:>7} {matches / elapsed:>10,.0f}'
+                    f' {size / 2**20:>7.1f} {peak / 2**20:>8.1f}'
+                )
+            db._engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
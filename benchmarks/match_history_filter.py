@@ -0,0 +1,92 @@
+"""
+Страница истории матчей с фильтром по игроку на большой таблице: условие
+`Player1 = :id OR Player2 = :id` без индексов и с индексами против выборки
+через UNION ALL по индексам (Player1, ID) и (Player2, ID), которую делает
+`MatchRepository`.
+
+База - временный SQLite-файл с `--matches` матчами между `--players` игроками.
+Замеряется первая и последняя страница одного игрока: без индексов первая
+находится быстро (матчи игрока часто встречаются среди новых), а за последней
+приходится просматривать почти всю таблицу.
+
+Запуск: uv run python -m benchmarks.match_history_filter
+"""
+
+import argparse
+import math
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import Select, or_, text
+
+from app import Database
+from app.models import Match, Player
+from app.repositories import (
+    MatchCounterRepository,
+    MatchRepository,
+    PlayerRepository,
+)
+from app.repositories.match_repository import _build_base_statement
+from app.settings import settings
+
+from .match_pagination import measure, populate
+
+INDEXES = ['ix_Matches_Player1_ID', 'ix_Matches_Player2_ID']
+
+
+def build_or_statement(player: Player, page: int) -> Select[tuple[Match]]:
+    limit = settings.default_page_size
+    return (
+        _build_base_statement()
+        .where(or_(Match.player1_id == player.id, Match.player2_id == player.id))
+        .order_by(Match.id.desc())
+        .limit(limit)
+        .offset((page - 1) * limit)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    parser.add_argument('--players', type=int, default=1_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+        populate(db, args.matches, args.players)
+
+        with db.get_session() as session:
+            player = PlayerRepository(session).find_one_by_name('Player 00001')
+            assert player is not None
+            match_repo = MatchRepository(session)
+            limit = settings.default_page_size
+
+            def union_all_page(page: int) -> Callable[[], object]:
+                return lambda: match_repo.find_many(
+                    limit=limit, offset=(page - 1) * limit, player=player
+                )
+
+            def or_page(page: int) -> Callable[[], object]:
+                stmt = build_or_statement(player, page)
+                return lambda: session.scalars(stmt).all()
+
+            player_matches = MatchCounterRepository(session).find_total(player.id)
+            pages = [1, math.ceil(player_matches / limit)]
+            results = {
+                'union all': [measure(union_all_page(p), args.repeat) for p in pages],
+                'or': [measure(or_page(p), args.repeat) for p in pages],
+            }
+            for index in INDEXES:
+                session.execute(text(f'DROP INDEX "{index}"'))
+            results['or, no index'] = [measure(or_page(p), args.repeat) for p in pages]
+
+    print(f'player matches: {player_matches:,}')
+    print(f'{"query":>14} ' + ' '.join(f'{f"page {p:,} ms":>14}' for p in pages))
+    for name, timings in results.items():
+        print(f'{name:>14} ' + ' '.join(f'{ms:>14.2f}' for ms in timings))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Импорт истории матчей: скорость загрузки файла со счетом по сетам (CSV и
+NDJSON) и с последовательностями очков.
+
+Файл генерируется в памяти: `--matches` случайных матчей между `--players`
+игроками, имена которых еще не записаны в БД. Каждый замер - импорт в новый
+временный SQLite-файл; скорость считается по всему импорту, включая проверку
+строк и запись итогов и рейтингов игроков в конце.
+
+Запуск: uv run python -m benchmarks.match_import
+"""
+
+import argparse
+import io
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from app import Database, MatchImporter
+from app.models import Base
+from app.services.match_importer import ImportFormat, read_matches
+
+# Счета сетов (геймы победителя и проигравшего); 7:6 - с тай-брейком 7:4.
+SET_SCORES = [(6, 0), (6, 2), (6, 4), (7, 5), (7, 6)]
+
+
+def random_sets(rng: random.Random) -> list[tuple[int, int, bool]]:
+    """Сеты матча: `(геймы победителя, геймы проигравшего, выиграл ли 1-й)`."""
+    sets: list[tuple[int, int, bool]] = []
+    sets_won = [0, 0]
+    while max(sets_won) < 2:
+        won, lost = rng.choice(SET_SCORES)
+        first_won = rng.random() < 0.5
+        sets_won[not first_won] += 1
+        sets.append((won, lost, first_won))
+    return sets
+
+
+def set_score(won: int, lost: int, first_won: bool) -> str:
+    games = (won, lost) if first_won else (lost, won)
+    score = f'{games[0]}-{games[1]}'
+    if lost == 6:
+        score += '(7-4)' if first_won else '(4-7)'
+    return score
+
+
+def set_points(won: int, lost: int, first_won: bool) -> str:
+    winner, loser = ('0', '1') if first_won else ('1', '0')
+    shared = min(lost, won - 1)
+    games = [loser, winner] * shared + [winner] * (won - shared)
+    if lost == 6:
+        # Тай-брейк 7:4 вместо последнего гейма.
+        return ''.join(g * 4 for g in games[:-1]) + (loser + winner) * 4 + winner * 3
+    return ''.join(g * 4 for g in games)
+
+
+def generate(
+    matches: int,
+    players: int,
+    import_format: ImportFormat,
+    points: bool,
+    seed: int = 25,
+) -> str:
+    rng = random.Random(seed)
+    names = [f'Imported Player {i}' for i in range(players)]
+    score_field = 'points' if points else 'sets'
+    buffer = io.StringIO()
+    if import_format == 'csv':
+        buffer.write(f'player1,player2,{score_field}\n')
+    for _ in range(matches):
+        player1, player2 = rng.sample(names, 2)
+        sets = random_sets(rng)
+        format_set = set_points if points else set_score
+        score = ('' if points else ' ').join(format_set(*s) for s in sets)
+        if import_format == 'csv':
+            buffer.write(f'{player1},{player2},{score}\n')
+        else:
+            record = {'player1_name': player1, 'player2_name': player2}
+            buffer.write(json.dumps({**record, score_field: score}) + '\n')
+    return buffer.getvalue()
+
+
+def measure(
+    text: str, import_format: ImportFormat, chunk_size: int
+) -> tuple[int, float]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+        Base.metadata.create_all(db._engine)
+        importer = MatchImporter(db=db, chunk_size=chunk_size)
+        started = time.perf_counter()
+        stats = importer.import_matches(read_matches(io.StringIO(text), import_format))
+        elapsed = time.perf_counter() - started
+        db._engine.dispose()
+    assert stats.invalid == 0
+    return stats.imported, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=200_000)
+    parser.add_argument('--players', type=int, default=1_000)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    args = parser.parse_args()
+
+    cases: list[tuple[str, ImportFormat, bool, int]] = [
+        ('sets', 'csv', False, args.matches),
+        ('sets', 'ndjson', False, args.matches),
+        # Розыгрыш очков заметно медленнее проверки счета сетов.
+        ('points', 'csv', True, args.matches // 10),
+    ]
+    print(f'{"score":>7} {"format":>7} {"matches":>9} {"seconds":>8} {"matches/s":>10}')
+    for score, import_format, points, matches in cases:
+        text = generate(matches, args.players, import_format, points)
+        imported, elapsed = measure(text, import_format, args.chunk_size)
+        print(
+            f'{score:>7} {import_format:>7} {imported:>9,} {elapsed:>8.2f}'
+            f' {imported / elapsed:>10,.0f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Страница истории завершенных матчей на большой таблице: выборка по смещению
+с подсчетом числа страниц (`OFFSET` + `COUNT`) против выборки по курсору (id
+последнего показанного матча).
+
+База - временный SQLite-файл с `--matches` матчами между `--players` игроками.
+Замеряется первая страница и страница `--deep-page`, без фильтра и с фильтром
+по игроку.
+
+Запуск: uv run python -m benchmarks.match_pagination
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import uuid as uuid_pkg
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy import insert
+
+from app import Database, InMemoryOngoingMatchStore, MatchService
+from app.models import Base, Match, Player
+from app.repositories import MatchCounterRepository
+from app.settings import settings
+
+BATCH_SIZE = 50_000
+
+
+def populate(db: Database, matches: int, players: int) -> None:
+    Base.metadata.create_all(db._engine)
+    rng = random.Random(42)
+    with db.get_session() as session:
+        session.execute(
+            insert(Player),
+            [{'name': f'Player {i:05d}'} for i in range(1, players + 1)],
+        )
+        for start in range(0, matches, BATCH_SIZE):
+            rows = []
+            for _ in range(min(BATCH_SIZE, matches - start)):
+                player1, player2 = rng.sample(range(1, players + 1), 2)
+                rows.append(
+                    {
+                        'uuid': uuid_pkg.uuid4(),
+                        'player1_id': player1,
+                        'player2_id': player2,
+                        'winner_id': player1,
+                        'score_json': '{}',
+                    }
+                )
+            session.execute(insert(Match), rows)
+        # Матчи вставлены в обход сервиса: счетчики для числа страниц
+        # пересчитываются по таблице.
+        MatchCounterRepository(session).rebuild()
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    parser.add_argument('--players', type=int, default=1_000)
+    parser.add_argument('--deep-page', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+        populate(db, args.matches, args.players)
+        match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+
+        print(f'{"filter":>12} {"page":>7} {"offset ms":>10} {"cursor ms":>10}')
+        for player_name in [None, 'Player 00001']:
+            # Страниц с фильтром меньше: глубокая страница берется в их пределах.
+            total_pages = match_srv.get_finished_matches_paginated(1, player_name)[
+                'total_pages'
+            ]
+            for page in [1, min(args.deep_page, total_pages)]:
+                # Курсор - id последнего матча предыдущей страницы, как в ссылке
+                # "дальше" на ней; для первой страницы - id больше любого.
+                prev_page = match_srv.get_finished_matches_paginated(
+                    max(page - 1, 1), player_name
+                )
+                after_id = prev_page['next_after_id'] if page > 1 else None
+                cursor = after_id or args.matches + 1
+
+                offset_ms = measure(
+                    lambda: match_srv.get_finished_matches_paginated(page, player_name),
+                    args.repeat,
+                )
+                cursor_ms = measure(
+                    lambda: match_srv.get_finished_matches_paginated(
+                        page, player_name, after_id=cursor
+                    ),
+                    args.repeat,
+                )
+                name = player_name or '-'
+                print(f'{name:>12} {page:>7,} {offset_ms:>10.2f} {cursor_ms:>10.2f}')
+
+    print(f'page size: {settings.default_page_size}')
+
+
+if __name__ == '__main__':
+    main()
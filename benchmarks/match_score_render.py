@@ -0,0 +1,86 @@
+"""
+Показ страницы счета при множестве зрителей одного матча: рендеринг шаблона
+на каждый запрос против кэша отрендеренных страниц (`RenderCache`).
+
+На каждое очко приходится `--viewers` запросов страницы из пула потоков,
+как у waitress.
+
+Запуск: uv run python -m benchmarks.match_score_render
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from jinja2 import Environment, FileSystemLoader
+
+from app import Database, InMemoryOngoingMatchStore, MatchController, MatchService
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.render_cache import RenderCache
+from app.settings import settings
+
+
+class UncachedMatchController(MatchController):
+    def _render_match_score_page(
+        self, ongoing_match: OngoingMatch
+    ) -> tuple[str, list[tuple[str, str]], str]:
+        template = self._jinja.get_template('match-score.html')
+        html_body = template.render(ongoing_match.get_view_model())
+        return '200 OK', [('Content-Type', 'text/html; charset=utf-8')], html_body
+
+
+def run(
+    controller_cls: type[MatchController], viewers: int, points: int, threads: int
+) -> tuple[float, int]:
+    store = InMemoryOngoingMatchStore()
+    match_srv = MatchService(
+        db=Database('sqlite://', echo=False), ongoing_match_store=store
+    )
+    render_cache = RenderCache(max_entries=1_000)
+    match_ctrl = controller_cls(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        match_srv=match_srv,
+        render_cache=render_cache,
+    )
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='Player One'), player2=Player(id=2, name='Player Two')
+    )
+    store.put(ongoing_match)
+    uuid = str(ongoing_match.uuid)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for point in range(points):
+            list(
+                executor.map(
+                    lambda _: match_ctrl.show_match_score_page(uuid), range(viewers)
+                )
+            )
+            store.update(
+                ongoing_match.uuid,
+                lambda m: m.add_point(PlayerIdentifier(point % 2)),
+            )
+    elapsed = time.perf_counter() - started
+    return viewers * points / elapsed, render_cache.stats()['misses']
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--viewers', type=int, default=500)
+    parser.add_argument('--points', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f'{"mode":>9} {"req/s":>10} {"renders":>8}')
+    for name, controller_cls in [
+        ('uncached', UncachedMatchController),
+        ('cached', MatchController),
+    ]:
+        rps, renders = run(controller_cls, args.viewers, args.points, args.threads)
+        if controller_cls is UncachedMatchController:
+            renders = args.viewers * args.points
+        print(f'{name:>9} {rps:>10,.0f} {renders:>8,}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Поиск игроков по началу имени (`PlayerNameIndex`) при большом числе игроков:
+время заполнения индекса из БД, память под него и задержки поиска подсказок
+и выбора игрока для фильтра истории.
+
+База - временный SQLite-файл с `--players` игроками со случайными именами.
+
+Запуск: uv run python -m benchmarks.player_search
+"""
+
+import argparse
+import random
+import resource
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import insert
+
+from app import Database, PlayerNameIndex
+from app.models import Base, Player
+
+BATCH_SIZE = 100_000
+
+
+def random_word(rng: random.Random) -> str:
+    length = rng.randint(4, 10)
+    return rng.choice(string.ascii_uppercase) + ''.join(
+        rng.choices(string.ascii_lowercase, k=length - 1)
+    )
+
+
+def populate(db: Database, players: int) -> list[str]:
+    Base.metadata.create_all(db._engine)
+    rng = random.Random(42)
+    names: set[str] = set()
+    while len(names) < players:
+        names.add(f'{random_word(rng)} {random_word(rng)}')
+    ordered = sorted(names)
+    with db.get_session() as session:
+        for start in range(0, players, BATCH_SIZE):
+            session.execute(
+                insert(Player),
+                [{'name': name} for name in ordered[start : start + BATCH_SIZE]],
+            )
+    return ordered
+
+
+def percentiles(timings: list[float]) -> tuple[float, float]:
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--players', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+        names = populate(db, args.players)
+
+        index = PlayerNameIndex(db=db)
+        # Пиковый размер процесса растет на память индекса и временные списки
+        # загрузки: это верхняя оценка.
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        index.load()
+        load_s = time.perf_counter() - started
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        memory_mb = (rss_after - rss_before) / 1024
+
+    rng = random.Random(7)
+    # Запросы - начала имен и фамилий разной длины, как при наборе в поле.
+    queries = []
+    for _ in range(args.queries):
+        word = rng.choice(rng.choice(names).split(' '))
+        queries.append(word[: rng.randint(1, len(word))])
+
+    search_ms = []
+    resolve_ms = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=args.limit)
+        search_ms.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        index.resolve(query)
+        resolve_ms.append((time.perf_counter() - started) * 1000)
+
+    print(f'players: {len(index):,}, load: {load_s:.2f} s')
+    print(f'peak memory: +{memory_mb:.0f} MB')
+    print(f'{"operation":>9} {"p50 ms":>8} {"p99 ms":>8}')
+    for name, timings in [('search', search_ms), ('resolve', resolve_ms)]:
+        p50, p99 = percentiles(timings)
+        print(f'{name:>9} {p50:>8.4f} {p99:>8.4f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Пересчет рейтингов Эло с нуля по всей таблице матчей: матчи читаются
+пачками по курсору id, рейтинги игроков считаются в памяти.
+
+База - временный SQLite-файл с `--matches` матчами между `--players` игроками.
+Для каждого размера пачки показывается время пересчета, число матчей в секунду
+и оценка времени для 10 млн матчей.
+
+Запуск: uv run python -m benchmarks.rating_recompute
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from app import Database, PlayerNameIndex, PlayerService
+
+from .match_pagination import populate
+
+TARGET_MATCHES = 10_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=1_000_000)
+    parser.add_argument('--players', type=int, default=10_000)
+    parser.add_argument(
+        '--chunk-size', type=int, nargs='+', default=[1_000, 10_000, 50_000]
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = Database(f'sqlite:///{Path(tmp_dir) / "bench.db"}', echo=False)
+        populate(db, args.matches, args.players)
+        player_srv = PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+
+        print(f'{"chunk":>7} {"seconds":>8} {"matches/s":>10} {"10M min":>8}')
+        for chunk_size in args.chunk_size:
+            started = time.perf_counter()
+            matches = player_srv.recompute_ratings(chunk_size=chunk_size)
+            elapsed = time.perf_counter() - started
+            rate = matches / elapsed
+            print(
+                f'{chunk_size:>7} {elapsed:>8.2f} {rate:>10,.0f}'
+                f' {TARGET_MATCHES / rate / 60:>8.1f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Время `Router.resolve` в зависимости от числа зарегистрированных маршрутов.
+
+Для сравнения приведен прежний маршрутизатор с линейным перебором регулярных
+выражений. Запрашиваются последние зарегистрированные маршруты - худший случай
+для линейного перебора.
+
+Запуск: uv run python -m benchmarks.router_resolve
+"""
+
+import argparse
+import re
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from app.router import Router
+
+
+class LinearRouter:
+    def __init__(self) -> None:
+        self.routes: dict[str, list[tuple[re.Pattern[str], Callable[..., Any]]]] = {}
+
+    def add_route(self, method: str, path: str, handler: Callable[..., Any]) -> None:
+        path_regex = re.sub(r'\{([a-zA-Z_][a-zA-Z0-9_]*)\}', r'(?P<\1>[^/]+)', path)
+        self.routes.setdefault(method, []).append((re.compile(path_regex), handler))
+
+    def resolve(
+        self, method: str, path: str
+    ) -> tuple[Callable[..., Any] | None, dict[str, Any] | None]:
+        for path_regex, handler in self.routes.get(method, []):
+            path_match = path_regex.fullmatch(path)
+            if path_match:
+                return handler, path_match.groupdict()
+        return None, None
+
+
+def _handler(**kwargs: Any) -> None:
+    return None
+
+
+def build(router: Router | LinearRouter, n_routes: int) -> tuple[str, str]:
+    # Половина маршрутов статические, половина - с параметрами.
+    for i in range(n_routes // 2):
+        router.add_route('GET', f'/section-{i}/items', _handler)
+        router.add_route('GET', f'/section-{i}/items/{{item_id}}/details', _handler)
+    last = n_routes // 2 - 1
+    return f'/section-{last}/items', f'/section-{last}/items/42/details'
+
+
+def measure(router: Router | LinearRouter, path: str, number: int) -> float:
+    return (
+        min(timeit.repeat(lambda: router.resolve('GET', path), number=number, repeat=5))
+        / number
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(
+        f'{"routes":>8} {"linear static":>14} {"trie static":>12}'
+        f' {"linear param":>13} {"trie param":>11}'
+    )
+    for n_routes in (10, 100, 500, 1_000):
+        linear, trie = LinearRouter(), Router()
+        static_path, param_path = build(linear, n_routes)
+        build(trie, n_routes)
+        assert trie.resolve('GET', param_path)[1] == {'item_id': '42'}
+
+        results = [
+            measure(linear, static_path, args.number),
+            measure(trie, static_path, args.number),
+            measure(linear, param_path, args.number),
+            measure(trie, param_path, args.number),
+        ]
+        print(
+            f'{n_routes:>8} {results[0] * 1e6:>11.2f} us {results[1] * 1e6:>9.2f} us'
+            f' {results[2] * 1e6:>10.2f} us {results[3] * 1e6:>8.2f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
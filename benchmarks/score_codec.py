@@ -0,0 +1,80 @@
+"""
+Размер и скорость бинарного кодека счета в сравнении с JSON.
+
+JSON строится так же, как при сохранении завершенного матча:
+`json.dumps(score.get_final_score_data())`. Состояния берутся из случайно
+сыгранных матчей, поэтому в выборке есть и начало, и конец матча.
+
+Запуск: uv run python -m benchmarks.score_codec
+"""
+
+import argparse
+import json
+import random
+import time
+from collections.abc import Callable
+
+from app.domain import PlayerIdentifier, Score
+from app.domain.codec import decode_score, encode_score
+
+
+def sample_scores(n_scores: int, seed: int) -> list[Score]:
+    rng = random.Random(seed)
+    scores: list[Score] = []
+    score = Score()
+    while len(scores) < n_scores:
+        winner = PlayerIdentifier.ONE if rng.random() < 0.5 else PlayerIdentifier.TWO
+        score = score.add_point(winner)
+        scores.append(score)
+        if max(score.sets) == 2:
+            score = Score()
+    return scores
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--scores', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    scores = sample_scores(args.scores, args.seed)
+    encoded = [encode_score(score) for score in scores]
+    dumped = [json.dumps(score.get_final_score_data()) for score in scores]
+
+    results = {
+        'binary': (
+            sum(map(len, encoded)),
+            measure(lambda: [encode_score(s) for s in scores], args.repeat),
+            measure(lambda: [decode_score(b) for b in encoded], args.repeat),
+        ),
+        'json': (
+            sum(len(d.encode('utf-8')) for d in dumped),
+            measure(
+                lambda: [json.dumps(s.get_final_score_data()) for s in scores],
+                args.repeat,
+            ),
+            measure(lambda: [json.loads(d) for d in dumped], args.repeat),
+        ),
+    }
+
+    print(f'{"format":>8} {"avg bytes":>10} {"encode":>12} {"decode":>12}')
+    for name, (total_size, encode_time, decode_time) in results.items():
+        print(
+            f'{name:>8} {total_size / len(scores):>10.1f}'
+            f' {encode_time / len(scores) * 1e6:>9.2f} us'
+            f' {decode_time / len(scores) * 1e6:>9.2f} us'
+        )
+
+
+if __name__ == '__main__':
+    main()
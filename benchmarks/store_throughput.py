@@ -0,0 +1,72 @@
+"""
+Пропускная способность InMemoryOngoingMatchStore.update в зависимости от числа потоков.
+
+Сравнивает одну глобальную блокировку (stripes=1) с разбиением на полосы.
+Параметр --hold-us имитирует работу под блокировкой с отпусканием GIL
+(например, запись завершенного матча в БД).
+
+Запуск: uv run python -m benchmarks.store_throughput
+"""
+
+import argparse
+import threading
+import time
+from dataclasses import replace
+
+from app.domain import OngoingMatch, Player, Score
+from app.store import InMemoryOngoingMatchStore
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def run(
+    stripes: int, n_threads: int, n_matches: int, updates: int, hold_us: int
+) -> float:
+    store = InMemoryOngoingMatchStore(stripes=stripes)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(n_matches)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+
+    def increment(ongoing_match: OngoingMatch) -> OngoingMatch:
+        if hold_us:
+            time.sleep(hold_us / 1_000_000)
+        p1_games, p2_games = ongoing_match.score.games
+        return replace(ongoing_match, score=Score(games=(p1_games + 1, p2_games)))
+
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(offset: int) -> None:
+        barrier.wait()
+        for i in range(updates):
+            store.update(matches[(offset + i) % n_matches].uuid, increment)
+
+    threads = [threading.Thread(target=worker, args=(t * 7,)) for t in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return n_threads * updates / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--matches', type=int, default=256)
+    parser.add_argument('--updates', type=int, default=2_000)
+    parser.add_argument('--hold-us', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f'{"threads":>8} {"stripes=1":>14} {"stripes=64":>14}')
+    for n_threads in (1, 2, 4, 8, 16, 32):
+        results = [
+            run(stripes, n_threads, args.matches, args.updates, args.hold_us)
+            for stripes in (1, 64)
+        ]
+        print(f'{n_threads:>8} ' + ' '.join(f'{r:>12,.0f}/s' for r in results))
+
+
+if __name__ == '__main__':
+    main()
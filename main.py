@@ -1,4 +1,6 @@
-from collections.abc import Iterable
+import atexit
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import closing
 from urllib.parse import parse_qs
 from wsgiref.types import StartResponse, WSGIEnvironment
 
@@ -7,14 +9,28 @@ from waitress import serve
 from whitenoise import WhiteNoise
 
 from app import (
+    AsgiApp,
+    AsyncDatabase,
     Database,
+    FinishedMatchWriter,
+    InMemoryOngoingMatchStore,
+    LiveScoreHub,
     MainController,
     MatchController,
+    MatchJournal,
     MatchService,
+    MetricsController,
     OngoingMatchStore,
+    PlayerCache,
+    PlayerController,
+    PlayerNameIndex,
+    PlayerService,
+    RenderCache,
     Router,
+    SqlOngoingMatchStore,
     register_routes,
 )
+from app.conditional import ConditionalHandler, not_modified
 from app.settings import settings
 
 
@@ -26,7 +42,9 @@ class App:
         self, environ: WSGIEnvironment, start_response: StartResponse
     ) -> Iterable[bytes]:
         method = environ['REQUEST_METHOD']
-        path = environ['PATH_INFO']
+        # PATH_INFO по PEP 3333 - байты пути в latin-1; в маршрутах путь в UTF-8,
+        # как в ASGI.
+        path = environ['PATH_INFO'].encode('latin-1').decode('utf-8', 'replace')
 
         handler, path_params = self._router.resolve(method=method, path=path)
         if handler is None or path_params is None:
@@ -48,9 +66,23 @@ class App:
         kwargs = {**path_params, **query_params, **form_data}
 
         try:
+            if isinstance(handler, ConditionalHandler) and method == 'GET':
+                validators = handler.validators(**kwargs)
+                if validators is not None and validators.is_not_modified(
+                    environ.get('HTTP_IF_NONE_MATCH'),
+                    environ.get('HTTP_IF_MODIFIED_SINCE'),
+                ):
+                    status, headers, _ = not_modified(validators)
+                    start_response(status, headers)
+                    return [b'']
+                if handler.pass_validators:
+                    kwargs['validators'] = validators
+
             status, headers, body = handler(**kwargs)
             start_response(status, headers)
-            return [body.encode('utf-8')]
+            if isinstance(body, str):
+                return [body.encode('utf-8')]
+            return self._encode_stream(body)
 
         except Exception:
             status = '500 Internal Server Error'
@@ -59,6 +91,13 @@ class App:
             raise
             # return [b'<h1>500 Internal Server Error</h1>']
 
+    def _encode_stream(self, body: Generator[str]) -> Iterator[bytes]:
+        # Сервер закрывает тело ответа и при обрыве соединения: вместе с ним
+        # закрывается генератор обработчика и освобождает ресурсы (сессию БД).
+        with closing(body):
+            for chunk in body:
+                yield chunk.encode('utf-8')
+
     def _unpack_data(self, raw_data: dict[str, list[str]]) -> dict[str, str]:
         data = {}
         for key, value in raw_data.items():
@@ -72,19 +111,115 @@ class App:
 
 router = Router()
 jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
-ongoing_match_store = OngoingMatchStore()
-db = Database(db_url=settings.db_url, echo=settings.db_echo)
-match_srv = MatchService(db=db, ongoing_match_store=ongoing_match_store)
+db = Database(
+    db_url=settings.db_url,
+    echo=settings.db_echo,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    query_cache_size=settings.db_statement_cache_size,
+)
+async_db = AsyncDatabase(
+    db_url=settings.db_url,
+    echo=settings.db_echo,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    query_cache_size=settings.db_statement_cache_size,
+)
+ongoing_match_store: OngoingMatchStore
+if settings.ongoing_match_store_backend == 'sql':
+    ongoing_match_store = SqlOngoingMatchStore(db=db)
+else:
+    journal = None
+    if settings.ongoing_match_journal_dir is not None:
+        journal = MatchJournal(
+            directory=settings.ongoing_match_journal_dir,
+            checkpoint_interval=settings.ongoing_match_journal_checkpoint_interval,
+            sync_interval=settings.ongoing_match_journal_sync_interval,
+        )
+        atexit.register(journal.close)
+    ongoing_match_store = InMemoryOngoingMatchStore(
+        stripes=settings.ongoing_match_store_stripes, journal=journal
+    )
+live_score_hub = LiveScoreHub()
+player_name_index = PlayerNameIndex(db=db)
+player_cache = PlayerCache(max_entries=settings.player_cache_size)
+finished_match_writer = None
+if settings.finished_match_write_behind:
+    finished_match_writer = FinishedMatchWriter(
+        db=db,
+        max_pending=settings.finished_match_queue_size,
+        batch_size=settings.finished_match_batch_size,
+        flush_interval=settings.finished_match_flush_interval,
+    )
+    atexit.register(finished_match_writer.close, settings.finished_match_close_timeout)
+match_srv = MatchService(
+    db=db,
+    ongoing_match_store=ongoing_match_store,
+    async_db=async_db,
+    live_score_hub=live_score_hub,
+    player_name_index=player_name_index,
+    player_cache=player_cache,
+    finished_match_writer=finished_match_writer,
+)
+# Завершенные матчи, которые журнал восстановил уже записанными в БД.
+match_srv.evict_saved_matches()
+player_srv = PlayerService(db=db, player_name_index=player_name_index)
 main_ctrl = MainController(jinja_env=jinja_env)
-match_ctrl = MatchController(jinja_env=jinja_env, match_srv=match_srv)
+render_cache = RenderCache(max_entries=settings.match_score_render_cache_size)
+match_ctrl = MatchController(
+    jinja_env=jinja_env, match_srv=match_srv, render_cache=render_cache
+)
+player_ctrl = PlayerController(jinja_env=jinja_env, player_srv=player_srv)
+metrics_ctrl = MetricsController(
+    render_cache=render_cache, player_cache=player_cache, db=db
+)
 register_routes(
-    router=router, main_ctrl=main_ctrl, match_ctrl=match_ctrl
+    router=router,
+    main_ctrl=main_ctrl,
+    match_ctrl=match_ctrl,
+    metrics_ctrl=metrics_ctrl,
+    player_ctrl=player_ctrl,
 )
 application = App(router=router)
 application_with_static = WhiteNoise(
     application=application, root=settings.static_dir, prefix=settings.static_url
 )
 
+# Страница счета ASGI-сервера обновляется потоком `/match-score/stream`,
+# поэтому ее отрендеренные версии кэшируются отдельно.
+asgi_render_cache = RenderCache(max_entries=settings.match_score_render_cache_size)
+asgi_match_ctrl = MatchController(
+    jinja_env=jinja_env,
+    match_srv=match_srv,
+    render_cache=asgi_render_cache,
+    live_updates=True,
+)
+asgi_metrics_ctrl = MetricsController(
+    render_cache=asgi_render_cache, player_cache=player_cache, db=db
+)
+asgi_router = Router()
+register_routes(
+    router=asgi_router,
+    main_ctrl=main_ctrl,
+    match_ctrl=asgi_match_ctrl,
+    metrics_ctrl=asgi_metrics_ctrl,
+    player_ctrl=player_ctrl,
+    use_async=True,
+)
+asgi_application = AsgiApp(
+    router=asgi_router,
+    max_workers=settings.asgi_max_workers,
+    static_dir=settings.static_dir,
+    static_url=settings.static_url,
+    on_shutdown=[async_db.dispose],
+)
+
 
 if __name__ == '__main__':
     serve(application_with_static, host=settings.app_host, port=settings.app_port)
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+from app import Database
+from app.domain import PlayerIdentifier
+from app.models import Base
+
+ONE, TWO = PlayerIdentifier.ONE, PlayerIdentifier.TWO
+# Сет 7:6 через тай-брейк 7:0, сет 6:0 каждому из игроков.
+TIE_BREAK_SET = ([ONE] * 4 + [TWO] * 4) * 6 + [ONE] * 7
+WON_SET = [ONE] * 24
+LOST_SET = [TWO] * 24
+# Матч из 48 очков первого игрока: 6:0 6:0.
+FINAL_POINTS = WON_SET * 2
+
+
+def make_db(db_url: str) -> Database:
+    """БД со схемой из моделей."""
+    db = Database(db_url=db_url, echo=False)
+    Base.metadata.create_all(db._engine)
+    return db
+
+
+@pytest.fixture
+def db_url(tmp_path: Path) -> str:
+    return f'sqlite:///{tmp_path / "app.db"}'
+
+
+@pytest.fixture
+def db(db_url: str) -> Database:
+    return make_db(db_url)
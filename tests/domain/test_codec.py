@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from app.domain import OngoingMatch, Player, PlayerIdentifier, Score
+from app.domain.codec import (
+    decode_ongoing_match,
+    decode_score,
+    decode_versioned_score,
+    encode_ongoing_match,
+    encode_score,
+    encode_versioned_score,
+)
+from app.domain.score import SetResult, TieBreakResult, TieBreakScore
+from app.exceptions import SerializationError
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def _random_walk(seed: int, p1_point_probability: float) -> list[OngoingMatch]:
+    rng = random.Random(seed)
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    states = [ongoing_match]
+    while not ongoing_match.is_finished:
+        winner = (
+            PlayerIdentifier.ONE
+            if rng.random() < p1_point_probability
+            else PlayerIdentifier.TWO
+        )
+        ongoing_match = ongoing_match.add_point(winner)
+        states.append(ongoing_match)
+    return states
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_every_state_of_a_random_match_round_trips(seed: int) -> None:
+    # Равные игроки чаще доводят сеты до тай-брейка и затяжных розыгрышей.
+    p1_point_probability = 0.5 if seed % 2 else 0.6
+    for ongoing_match in _random_walk(seed, p1_point_probability):
+        assert decode_score(encode_score(ongoing_match.score)) == ongoing_match.score
+        assert decode_ongoing_match(encode_ongoing_match(ongoing_match)) == (
+            ongoing_match
+        )
+
+
+def test_versioned_score_round_trips() -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2).add_points(
+        [PlayerIdentifier.ONE] * 300
+    )
+
+    encoded = encode_versioned_score(ongoing_match.score, ongoing_match.version)
+
+    assert decode_versioned_score(encoded) == (ongoing_match.score, 48)
+
+
+@pytest.mark.parametrize(
+    'score',
+    [
+        pytest.param(
+            Score(games=(6, 6), tie_break_score=TieBreakScore(points=(23, 22))),
+            id='long tie-break',
+        ),
+        pytest.param(
+            Score(
+                sets=(1, 1),
+                finished_sets=(
+                    SetResult(games=(6, 7), tie_break=TieBreakResult(points=(18, 20))),
+                    SetResult(games=(7, 5)),
+                ),
+                games=(3, 2),
+                points=(Score.PointState.ADVANTAGE, Score.PointState.FORTY),
+            ),
+            id='deciding set',
+        ),
+    ],
+)
+def test_edge_scores_round_trip(score: Score) -> None:
+    assert decode_score(encode_score(score)) == score
+
+
+def test_encoding_is_compact() -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    finished = ongoing_match.add_points([PlayerIdentifier.ONE] * 48)
+
+    # Байт версии, номер изменения, заголовок из двух байт и по байту на
+    # сыгранный сет.
+    assert len(encode_score(ongoing_match.score)) == 4
+    assert len(encode_score(finished.score)) == 6
+
+
+@pytest.mark.parametrize(
+    'data',
+    [
+        pytest.param(b'', id='empty'),
+        pytest.param(b'\x09\x00\x00', id='unknown version'),
+        pytest.param(b'\x01\x00\x00', id='truncated'),
+        pytest.param(b'\x01\x00\xff\xff', id='invalid state'),
+        pytest.param(b'\x01\x00\x00\x00\x00', id='trailing data'),
+    ],
+)
+def test_invalid_data_is_rejected(data: bytes) -> None:
+    with pytest.raises(SerializationError):
+        decode_score(data)
+
+
+def test_inconsistent_score_is_rejected() -> None:
+    with pytest.raises(SerializationError):
+        encode_score(Score(sets=(1, 0)))
@@ -0,0 +1,91 @@
+import random
+
+import pytest
+
+from app.domain.compact_score import CompactScore
+from app.domain.score import PlayerIdentifier, Score, TieBreakScore
+from app.exceptions import InconsistentMatchStateError
+
+from .test_score import (
+    DEUCE_ADVANTAGE_POINT_CASES,
+    FINISHED_SETS_UPDATE_CASES,
+    GAME_POINT_CASES,
+    NORMAL_POINT_CASES,
+    SET_WIN_CASES,
+    TIE_BREAK_CASES,
+)
+
+PointState = Score.PointState
+
+ALL_POINT_CASES = [
+    *NORMAL_POINT_CASES,
+    *GAME_POINT_CASES,
+    *DEUCE_ADVANTAGE_POINT_CASES,
+    *SET_WIN_CASES,
+    *TIE_BREAK_CASES,
+]
+
+
+@pytest.mark.parametrize('initial_score, winner, expected_score', ALL_POINT_CASES)
+def test_add_point_matches_score(
+    initial_score: Score, winner: PlayerIdentifier, expected_score: Score
+) -> None:
+    compact = CompactScore.from_score(initial_score)
+    assert compact.add_point(winner).to_score() == expected_score
+
+
+@pytest.mark.parametrize('initial_score, winner, _', FINISHED_SETS_UPDATE_CASES)
+def test_add_point_updates_finished_sets_like_score(
+    initial_score: Score, winner: PlayerIdentifier, _: object
+) -> None:
+    compact = CompactScore.from_score(initial_score)
+    assert compact.add_point(winner).to_score() == initial_score.add_point(winner)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random_point_sequences_match_score(seed: int) -> None:
+    rng = random.Random(seed)
+    score = Score()
+    compact = CompactScore()
+    # Смещенная вероятность дает и длинные тай-брейки, и быстрые сеты.
+    p1_win_probability = rng.uniform(0.35, 0.65)
+
+    for _ in range(2000):
+        winner = (
+            PlayerIdentifier.ONE
+            if rng.random() < p1_win_probability
+            else PlayerIdentifier.TWO
+        )
+        score = score.add_point(winner)
+        compact = compact.add_point(winner)
+
+        assert compact.to_score() == score
+        assert compact.as_current_view_score() == score.as_current_view_score()
+        if score.finished_sets:
+            assert compact.as_final_view_score() == score.as_final_view_score()
+
+
+def test_long_tie_break_round_trips_through_from_score() -> None:
+    score = Score(games=(6, 6), tie_break_score=TieBreakScore(points=(15, 14)))
+    compact = CompactScore.from_score(score)
+
+    assert compact.to_score() == score
+    assert compact.add_point(PlayerIdentifier.ONE).to_score() == score.add_point(
+        PlayerIdentifier.ONE
+    )
+    assert compact.add_point(PlayerIdentifier.TWO).to_score() == score.add_point(
+        PlayerIdentifier.TWO
+    )
+
+
+@pytest.mark.parametrize(
+    'score',
+    [
+        Score(games=(6, 6)),
+        Score(games=(7, 5)),
+        Score(points=(PointState.ADVANTAGE, PointState.LOVE)),
+    ],
+)
+def test_from_score_rejects_unreachable_states(score: Score) -> None:
+    with pytest.raises(InconsistentMatchStateError):
+        CompactScore.from_score(score)
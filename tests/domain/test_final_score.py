@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from app.domain import OngoingMatch, Player
+from app.domain.final_score import (
+    final_score_from_point_string,
+    final_score_from_points,
+    final_score_from_sets,
+)
+from app.domain.score import PlayerIdentifier, SetBreakDownDict
+from app.exceptions import InconsistentMatchStateError
+
+ONE, TWO = PlayerIdentifier.ONE, PlayerIdentifier.TWO
+
+
+def race(won: int, lost: int, winner: PlayerIdentifier) -> list[PlayerIdentifier]:
+    """Победители единиц (геймов или очков) гонки, выигранной `won:lost`."""
+    loser = winner.opponent
+    shared = min(lost, won - 1)
+    return (
+        [loser, winner] * shared + [loser] * (lost - shared) + [winner] * (won - shared)
+    )
+
+
+def set_points(set_data: SetBreakDownDict) -> list[PlayerIdentifier]:
+    games = (set_data['player1_games'], set_data['player2_games'])
+    winner = ONE if games[0] > games[1] else TWO
+    tie_break = set_data.get('tie_break_points')
+    game_winners = race(games[winner], games[winner.opponent], winner)
+    if tie_break is None:
+        return [p for game_winner in game_winners for p in [game_winner] * 4]
+    points = [p for game_winner in game_winners[:-1] for p in [game_winner] * 4]
+    return points + race(tie_break[winner], tie_break[winner.opponent], winner)
+
+
+def random_set(rng: random.Random) -> SetBreakDownDict:
+    won, lost = rng.choice([(6, 0), (6, 4), (7, 5), (7, 6)])
+    set_data: SetBreakDownDict = {'player1_games': won, 'player2_games': lost}
+    if won == 7 and lost == 6:
+        points_lost = rng.randrange(12)
+        set_data['tie_break_points'] = [max(7, points_lost + 2), points_lost]
+    if rng.random() < 0.5:
+        set_data['player1_games'], set_data['player2_games'] = lost, won
+        if 'tie_break_points' in set_data:
+            set_data['tie_break_points'].reverse()
+    return set_data
+
+
+def test_sets_validation_matches_point_replay() -> None:
+    rng = random.Random(25)
+    for _ in range(200):
+        sets: list[SetBreakDownDict] = []
+        sets_won = [0, 0]
+        while max(sets_won) < 2:
+            sets.append(random_set(rng))
+            first_won = sets[-1]['player1_games'] > sets[-1]['player2_games']
+            sets_won[ONE if first_won else TWO] += 1
+
+        points = [p for set_data in sets for p in set_points(set_data)]
+        assert final_score_from_sets(sets) == final_score_from_points(points)
+
+
+@pytest.mark.parametrize(
+    'sets',
+    [
+        pytest.param([(6, 5), (6, 0)], id='set not won'),
+        pytest.param([(8, 6), (6, 0)], id='too many games'),
+        pytest.param([(7, 6), (6, 0)], id='7-6 without tie-break'),
+        pytest.param([(6, 6, 7, 0), (6, 0)], id='tie-break at 6-6'),
+        pytest.param([(7, 6, 7, 6), (6, 0)], id='tie-break not won'),
+        pytest.param([(7, 6, 9, 5), (6, 0)], id='tie-break played on'),
+        pytest.param([(7, 5, 7, 0), (6, 0)], id='tie-break without 6-6'),
+        pytest.param([(6, 0)], id='match not finished'),
+        pytest.param([(6, 0), (6, 0), (0, 6)], id='set after the match'),
+        pytest.param([], id='no sets'),
+    ],
+)
+def test_impossible_sets_are_rejected(sets: list[tuple[int, ...]]) -> None:
+    breakdown: list[SetBreakDownDict] = []
+    for player1_games, player2_games, *tie_break in sets:
+        set_data: SetBreakDownDict = {
+            'player1_games': player1_games,
+            'player2_games': player2_games,
+        }
+        if tie_break:
+            set_data['tie_break_points'] = tie_break
+        breakdown.append(set_data)
+
+    with pytest.raises(InconsistentMatchStateError):
+        final_score_from_sets(breakdown)
+
+
+def test_points_must_end_with_the_match() -> None:
+    points = [ONE] * 48
+
+    assert final_score_from_points(points)['player1_sets_won'] == 2
+    with pytest.raises(InconsistentMatchStateError):
+        final_score_from_points(points[:-1])
+    with pytest.raises(InconsistentMatchStateError):
+        final_score_from_points([*points, TWO])
+
+
+def random_points(rng: random.Random) -> list[PlayerIdentifier]:
+    """Очки случайного завершенного матча равных игроков."""
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='One'), player2=Player(id=2, name='Two')
+    )
+    points: list[PlayerIdentifier] = []
+    while not ongoing_match.is_finished:
+        points.append(ONE if rng.random() < 0.5 else TWO)
+        ongoing_match = ongoing_match.add_point(points[-1])
+    return points
+
+
+def test_point_string_matches_point_replay() -> None:
+    rng = random.Random(7)
+    # Тай-брейк до 12:10 в первом сете проверяет очки сверх 6:6.
+    long_tie_break = ([ONE] * 4 + [TWO] * 4) * 6 + [ONE, TWO] * 10 + [ONE] * 2
+    matches = [long_tie_break + [ONE] * 24] + [random_points(rng) for _ in range(200)]
+    for points in matches:
+        text = ''.join(str(int(point)) for point in points)
+
+        assert final_score_from_point_string(text) == final_score_from_points(points)
+        with pytest.raises(InconsistentMatchStateError):
+            final_score_from_point_string(text[:-1])
+        with pytest.raises(InconsistentMatchStateError):
+            final_score_from_point_string(text + '0')
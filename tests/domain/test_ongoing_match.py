@@ -0,0 +1,46 @@
+import random
+
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def test_add_points_matches_sequential_add_point() -> None:
+    rng = random.Random(7)
+    point_winners = [PlayerIdentifier(rng.random() < 0.45) for _ in range(60)]
+
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    expected = ongoing_match
+    for point_winner in point_winners:
+        expected = expected.add_point(point_winner)
+
+    assert ongoing_match.add_points(point_winners) == expected
+
+
+def test_add_points_stops_when_match_is_finished() -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    points_to_win_match = 2 * 6 * 4
+
+    finished_match = ongoing_match.add_points(
+        [PlayerIdentifier.ONE] * points_to_win_match + [PlayerIdentifier.TWO] * 10
+    )
+
+    assert finished_match.is_finished
+    assert finished_match.winner == PLAYER1
+    assert finished_match.score.sets == (2, 0)
+    assert finished_match.score.games == (0, 0)
+    assert finished_match.score.points == (
+        finished_match.score.PointState.LOVE,
+        finished_match.score.PointState.LOVE,
+    )
+
+
+def test_version_counts_recorded_points() -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+
+    assert ongoing_match.add_point(PlayerIdentifier.ONE).version == 1
+    # Очки после завершения матча не засчитываются и номер не меняют.
+    finished = ongoing_match.add_points([PlayerIdentifier.TWO] * 60)
+    assert finished.version == 48
+    assert finished.add_points([PlayerIdentifier.ONE]) is finished
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.domain.probability import cache_clear, cache_info, calculate_win_probabilities
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def _closed_form_game(p: float) -> float:
+    q = 1 - p
+    deuce = p * p / (p * p + q * q)
+    return p**4 * (1 + 4 * q + 10 * q * q) + 20 * p**3 * q**3 * deuce
+
+
+@pytest.mark.parametrize('p', [0.3, 0.5, 0.62, 0.75])
+def test_game_probability_matches_closed_form(p: float) -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+
+    probabilities = calculate_win_probabilities(ongoing_match, p)
+
+    assert probabilities.game == pytest.approx(_closed_form_game(p))
+
+
+def test_even_players_have_even_chances() -> None:
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+
+    probabilities = calculate_win_probabilities(ongoing_match, 0.5)
+
+    assert probabilities.game == pytest.approx(0.5)
+    assert probabilities.set == pytest.approx(0.5)
+    assert probabilities.match == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_probabilities_satisfy_one_step_recurrence(seed: int) -> None:
+    # P(состояние) = p * P(после выигранного очка) + q * P(после проигранного).
+    rng = random.Random(seed)
+    p = 0.55
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+
+    while not ongoing_match.is_finished:
+        current = calculate_win_probabilities(ongoing_match, p)
+        after_win = calculate_win_probabilities(
+            ongoing_match.add_point(PlayerIdentifier.ONE), p
+        )
+        after_loss = calculate_win_probabilities(
+            ongoing_match.add_point(PlayerIdentifier.TWO), p
+        )
+        assert current.match == pytest.approx(
+            p * after_win.match + (1 - p) * after_loss.match
+        )
+
+        winner = PlayerIdentifier.ONE if rng.random() < 0.5 else PlayerIdentifier.TWO
+        ongoing_match = ongoing_match.add_point(winner)
+
+    final = calculate_win_probabilities(ongoing_match, p)
+    assert final.match == (1.0 if ongoing_match.winner == PLAYER1 else 0.0)
+
+
+def test_repeated_states_are_served_from_cache() -> None:
+    cache_clear()
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2).add_point(
+        PlayerIdentifier.ONE
+    )
+
+    first = calculate_win_probabilities(ongoing_match, 0.6)
+    misses = cache_info().misses
+    second = calculate_win_probabilities(ongoing_match, 0.6)
+
+    assert first == second
+    assert cache_info().misses == misses
+    assert first.opponent.match == pytest.approx(1 - first.match)
@@ -0,0 +1,37 @@
+import pytest
+
+from app.domain.rating import INITIAL_RATING, Ratings, expected_score, update_ratings
+
+
+def test_expected_score() -> None:
+    assert expected_score(1500, 1500) == 0.5
+    assert expected_score(1900, 1500) == pytest.approx(10 / 11)
+    assert expected_score(1500, 1900) == pytest.approx(1 / 11)
+
+
+def test_update_ratings_moves_points_from_loser_to_winner() -> None:
+    assert update_ratings(1500, 1500) == (1516, 1484)
+    winner, loser = update_ratings(1900, 1500)
+    assert winner + loser == 3400
+    assert winner - 1900 == pytest.approx(32 / 11)
+
+
+def test_ratings_record_matches_in_order() -> None:
+    ratings = Ratings()
+    ratings.record(1, 2)
+    ratings.record(1, 1)
+    ratings.record(3, 1)
+
+    assert len(ratings) == 3
+    assert ratings[4] == INITIAL_RATING
+    assert ratings[1] == pytest.approx(1516 - 32 * expected_score(1516, 1500))
+    assert {player_id: matches for player_id, _, matches in ratings.items()} == {
+        1: 2,
+        2: 1,
+        3: 1,
+    }
+
+    resumed = Ratings({pid: (rating, m) for pid, rating, m in ratings.items()})
+    resumed.record(2, 3)
+    ratings.record(2, 3)
+    assert list(resumed.items()) == list(ratings.items())
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.domain import OngoingMatch, PlayerIdentifier, Score
+from app.domain.score import SetResult, TieBreakScore
+from app.domain.simulation import (
+    PointWinProbabilities,
+    serve_point_probability,
+    simulate_matches,
+    simulate_outcomes,
+)
+
+PLAYER1 = PointWinProbabilities(on_serve=0.64, on_return=0.38)
+PLAYER2 = PointWinProbabilities(on_serve=0.62, on_return=0.36)
+
+
+def _p1_serves(score: Score) -> bool:
+    games_played = sum(sum(s.games) for s in score.finished_sets) + sum(score.games)
+    p1_serves = games_played % 2 == 0
+    if score.tie_break_score is not None:
+        points_played = sum(score.tie_break_score.points)
+        p1_serves ^= ((points_played + 1) // 2) % 2 == 1
+    return p1_serves
+
+
+def _simulate_scalar(n_matches: int, seed: int, initial_score: Score) -> list[Score]:
+    """Прогоняет те же случайные числа через `Score.add_point` в лок-степе."""
+    rng = np.random.default_rng(seed)
+    p1_on_p1_serve = serve_point_probability(PLAYER1, PLAYER2)
+    p1_on_p2_serve = 1 - serve_point_probability(PLAYER2, PLAYER1)
+
+    scores = [initial_score] * n_matches
+    active = list(range(n_matches))
+    while active:
+        draws = rng.random(len(active))
+        still_active = []
+        for draw, i in zip(draws, active, strict=True):
+            probability = p1_on_p1_serve if _p1_serves(scores[i]) else p1_on_p2_serve
+            winner = (
+                PlayerIdentifier.ONE if draw < probability else PlayerIdentifier.TWO
+            )
+            scores[i] = scores[i].add_point(winner)
+            if max(scores[i].sets) < OngoingMatch._SETS_TO_WIN_MATCH:
+                still_active.append(i)
+        active = still_active
+    return scores
+
+
+MID_MATCH_SCORE = Score(
+    sets=(1, 0),
+    finished_sets=(SetResult(games=(6, 4)),),
+    games=(5, 6),
+    points=(Score.PointState.ADVANTAGE, Score.PointState.FORTY),
+)
+
+
+@pytest.mark.parametrize(
+    'initial_score',
+    [
+        pytest.param(Score(), id='from start'),
+        pytest.param(MID_MATCH_SCORE, id='mid match'),
+        pytest.param(
+            Score(games=(6, 6), tie_break_score=TieBreakScore(points=(5, 6))),
+            id='in tie-break',
+        ),
+    ],
+)
+def test_simulation_agrees_with_scalar_score(initial_score: Score) -> None:
+    n_matches = 300
+    seed = 12345
+
+    outcomes = simulate_outcomes(
+        PLAYER1, PLAYER2, n_matches, np.random.default_rng(seed), initial_score
+    )
+    scalar_scores = _simulate_scalar(n_matches, seed, initial_score)
+
+    for i, score in enumerate(scalar_scores):
+        p1_sets, p2_sets = score.sets
+        expected_winner = 0 if p1_sets > p2_sets else 1
+        assert outcomes.winners[i] == expected_winner
+
+        played = [tuple(g) for g in outcomes.set_games[i].tolist() if g[0] >= 0]
+        assert played == [s.games for s in score.finished_sets]
+        tie_breaks = outcomes.set_tie_breaks[i][: len(played)].tolist()
+        assert tie_breaks == [s.tie_break is not None for s in score.finished_sets]
+
+
+def test_simulate_matches_summary_is_consistent() -> None:
+    summary = simulate_matches(PLAYER1, PLAYER2, 20_000, seed=1, chunk_size=7_000)
+
+    assert summary.matches == 20_000
+    assert summary.player1_win_probability + summary.player2_win_probability == (
+        pytest.approx(1.0)
+    )
+    assert sum(summary.match_score_distribution.values()) == pytest.approx(1.0)
+    assert sum(summary.set_score_distribution.values()) == pytest.approx(1.0)
+    assert set(summary.match_score_distribution) <= {(2, 0), (2, 1), (1, 2), (0, 2)}
+    assert 0 < summary.tie_break_frequency < 1
+    # Первый игрок сильнее и на подаче, и на приеме.
+    assert summary.player1_win_probability > 0.5
@@ -0,0 +1,136 @@
+import random
+import threading
+import uuid as uuid_pkg
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from app import Database, MatchService
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.exceptions import MatchNotFoundError
+from app.store import InMemoryOngoingMatchStore, MatchJournal
+from tests.conftest import FINAL_POINTS, ONE
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def _add_random_point(
+    rng: random.Random,
+) -> Callable[[OngoingMatch], OngoingMatch]:
+    winner = PlayerIdentifier.ONE if rng.random() < 0.5 else PlayerIdentifier.TWO
+    return lambda ongoing_match: ongoing_match.add_points([winner])
+
+
+def _snapshot(
+    store: InMemoryOngoingMatchStore, matches: list[OngoingMatch]
+) -> dict[uuid_pkg.UUID, OngoingMatch | None]:
+    return {m.uuid: store.find_one(m.uuid) for m in matches}
+
+
+def _reopen(directory: Path, **kwargs: int) -> InMemoryOngoingMatchStore:
+    return InMemoryOngoingMatchStore(journal=MatchJournal(directory, **kwargs))
+
+
+def test_store_is_recovered_after_restart(tmp_path: Path) -> None:
+    rng = random.Random(0)
+    store = _reopen(tmp_path)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(20)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+    for _ in range(500):
+        store.update(rng.choice(matches).uuid, _add_random_point(rng))
+    store.delete(matches[0].uuid)
+    expected = _snapshot(store, matches)
+
+    # Журнал не закрывается: имитируем аварийное завершение процесса.
+    recovered = _reopen(tmp_path)
+
+    assert _snapshot(recovered, matches) == expected
+    assert expected[matches[0].uuid] is None
+
+
+def test_saved_match_is_evicted_after_restart(
+    tmp_path: Path, db: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    journal_dir = tmp_path / 'journal'
+    store = _reopen(journal_dir)
+    match_srv = MatchService(db=db, ongoing_match_store=store)
+    finished = match_srv.create_new_match('Player One', 'Player Two')
+    ongoing = match_srv.create_new_match('Player One', 'Player Two')
+    match_srv.record_point(ongoing.uuid, ONE)
+
+    # Сбой после записи матча в БД, до удаления его из хранилища.
+    def crash(uuid: uuid_pkg.UUID) -> None:
+        raise SystemExit
+
+    monkeypatch.setattr(store, 'delete', crash)
+    with pytest.raises(SystemExit):
+        match_srv.record_points(finished.uuid, FINAL_POINTS)
+
+    recovered = _reopen(journal_dir)
+    recovered_match = recovered.find_one(finished.uuid)
+    assert recovered_match is not None and recovered_match.is_finished
+    recovered_srv = MatchService(db=db, ongoing_match_store=recovered)
+
+    assert recovered_srv.evict_saved_matches() == 1
+    assert recovered.find_one(finished.uuid) is None
+    assert recovered.find_one(ongoing.uuid) is not None
+    with pytest.raises(MatchNotFoundError):
+        recovered_srv.record_point(finished.uuid, ONE)
+
+
+def test_checkpoint_bounds_replay(tmp_path: Path) -> None:
+    store = _reopen(tmp_path, checkpoint_interval=10)
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+    for _ in range(35):
+        store.update(ongoing_match.uuid, lambda m: m.add_point(PlayerIdentifier.ONE))
+
+    checkpoints = list(tmp_path.glob('checkpoint-*.bin'))
+    assert len(checkpoints) == 1
+    # Остались только сегменты, не вошедшие в контрольную точку.
+    checkpoint_segment = int(checkpoints[0].stem.removeprefix('checkpoint-'))
+    for segment in tmp_path.glob('journal-*.log'):
+        assert int(segment.stem.removeprefix('journal-')) >= checkpoint_segment
+
+    recovered = _reopen(tmp_path)
+    assert recovered.find_one(ongoing_match.uuid) == store.find_one(ongoing_match.uuid)
+
+
+def test_torn_tail_is_ignored(tmp_path: Path) -> None:
+    store = _reopen(tmp_path)
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+    updated = store.update(
+        ongoing_match.uuid, lambda m: m.add_point(PlayerIdentifier.TWO)
+    )
+
+    segment = max(tmp_path.glob('journal-*.log'))
+    with segment.open('ab') as file:
+        file.write(b'\x30\x00\x00\x00\x01\x02')
+
+    recovered = _reopen(tmp_path)
+    assert recovered.find_one(ongoing_match.uuid) == updated
+
+
+def test_concurrent_updates_are_recovered(tmp_path: Path) -> None:
+    store = _reopen(tmp_path, checkpoint_interval=200)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(8)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        for _ in range(300):
+            store.update(rng.choice(matches).uuid, _add_random_point(rng))
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    recovered = _reopen(tmp_path)
+    assert _snapshot(recovered, matches) == _snapshot(store, matches)
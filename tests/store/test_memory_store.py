@@ -0,0 +1,104 @@
+import threading
+from collections.abc import Callable
+from dataclasses import replace
+
+import pytest
+
+from app.domain import OngoingMatch, Player, Score
+from app.store import InMemoryOngoingMatchStore
+
+PLAYER1 = Player(id=1, name='Player One')
+PLAYER2 = Player(id=2, name='Player Two')
+
+
+def _increment(ongoing_match: OngoingMatch) -> OngoingMatch:
+    # Счетчик обновлений хранится в геймах: матч при этом не завершается.
+    p1_games, p2_games = ongoing_match.score.games
+    return replace(ongoing_match, score=Score(games=(p1_games + 1, p2_games)))
+
+
+def _run_threads(n_threads: int, target: Callable[[], None]) -> None:
+    barrier = threading.Barrier(n_threads)
+
+    def run() -> None:
+        barrier.wait()
+        target()
+
+    threads = [threading.Thread(target=run) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@pytest.mark.parametrize('n_threads', [1, 2, 4, 8, 16])
+def test_concurrent_updates_of_one_match_are_not_lost(n_threads: int) -> None:
+    store = InMemoryOngoingMatchStore()
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+    updates_per_thread = 2_000
+
+    def worker() -> None:
+        for _ in range(updates_per_thread):
+            store.update(ongoing_match.uuid, _increment)
+
+    _run_threads(n_threads, worker)
+
+    stored = store.find_one(ongoing_match.uuid)
+    assert stored is not None
+    assert stored.score.games[0] == n_threads * updates_per_thread
+
+
+@pytest.mark.parametrize('n_threads', [1, 2, 4, 8, 16])
+def test_concurrent_updates_of_many_matches_are_not_lost(n_threads: int) -> None:
+    store = InMemoryOngoingMatchStore(stripes=16)
+    matches = [OngoingMatch(player1=PLAYER1, player2=PLAYER2) for _ in range(64)]
+    for ongoing_match in matches:
+        store.put(ongoing_match)
+    rounds = 50
+
+    def worker() -> None:
+        for _ in range(rounds):
+            for ongoing_match in matches:
+                store.update(ongoing_match.uuid, _increment)
+
+    _run_threads(n_threads, worker)
+
+    for ongoing_match in matches:
+        stored = store.find_one(ongoing_match.uuid)
+        assert stored is not None
+        assert stored.score.games[0] == n_threads * rounds
+
+
+def test_compare_and_swap_rejects_stale_value() -> None:
+    store = InMemoryOngoingMatchStore()
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+    updated = _increment(ongoing_match)
+
+    assert store.compare_and_swap(ongoing_match, updated)
+    assert not store.compare_and_swap(ongoing_match, _increment(ongoing_match))
+    assert store.find_one(ongoing_match.uuid) is updated
+
+
+def test_compare_and_swap_with_none_deletes_match() -> None:
+    store = InMemoryOngoingMatchStore()
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+
+    assert store.compare_and_swap(ongoing_match, None)
+    assert store.find_one(ongoing_match.uuid) is None
+    assert store.update(ongoing_match.uuid, _increment) is None
+
+
+def test_failed_update_keeps_previous_match() -> None:
+    store = InMemoryOngoingMatchStore()
+    ongoing_match = OngoingMatch(player1=PLAYER1, player2=PLAYER2)
+    store.put(ongoing_match)
+
+    def fail(_: OngoingMatch) -> OngoingMatch:
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        store.update(ongoing_match.uuid, fail)
+    assert store.find_one(ongoing_match.uuid) is ongoing_match
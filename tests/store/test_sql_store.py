@@ -0,0 +1,110 @@
+import multiprocessing
+import uuid as uuid_pkg
+from collections.abc import Callable
+from dataclasses import replace
+
+from sqlalchemy import select
+
+from app.database import Database
+from app.domain import OngoingMatch, Player, PlayerIdentifier, Score
+from app.domain.score import TieBreakScore
+from app.models import Match, OngoingMatchSnapshot
+from app.services import MatchService
+from app.store import SqlOngoingMatchStore
+
+N_WORKERS = 4
+
+
+def _increment(ongoing_match: OngoingMatch) -> OngoingMatch:
+    # Равный счет в тай-брейке растет без завершения сета - удобный счетчик.
+    tie_break_score = ongoing_match.score.tie_break_score
+    points = tie_break_score.points[0] + 1 if tie_break_score is not None else 1
+    return replace(
+        ongoing_match,
+        score=Score(
+            games=(6, 6), tie_break_score=TieBreakScore(points=(points, points))
+        ),
+    )
+
+
+def _increment_worker(db_url: str, match_uuid: str, updates: int) -> None:
+    store = SqlOngoingMatchStore(db=Database(db_url=db_url, echo=False))
+    for _ in range(updates):
+        store.update(uuid_pkg.UUID(match_uuid), _increment)
+
+
+def _record_points_worker(db_url: str, match_uuid: str, points: int) -> None:
+    db = Database(db_url=db_url, echo=False)
+    match_srv = MatchService(db=db, ongoing_match_store=SqlOngoingMatchStore(db=db))
+    for _ in range(points):
+        match_srv.record_point(uuid_pkg.UUID(match_uuid), PlayerIdentifier.ONE)
+
+
+def _run_workers(target: Callable[..., object], args: tuple[object, ...]) -> None:
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=target, args=args) for _ in range(N_WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+
+def test_round_trip(db: Database) -> None:
+    store = SqlOngoingMatchStore(db=db)
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='Игрок Один'), player2=Player(id=2, name='B')
+    ).add_points([PlayerIdentifier.ONE] * 30)
+
+    store.put(ongoing_match)
+
+    assert store.find_one(ongoing_match.uuid) == ongoing_match
+    assert store.find_one(uuid_pkg.uuid4()) is None
+
+
+def test_compare_and_swap_detects_concurrent_change(db: Database) -> None:
+    store = SqlOngoingMatchStore(db=db)
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='A'), player2=Player(id=2, name='B')
+    )
+    store.put(ongoing_match)
+
+    updated = _increment(ongoing_match)
+    assert store.compare_and_swap(ongoing_match, updated)
+    assert not store.compare_and_swap(ongoing_match, _increment(updated))
+    assert store.compare_and_swap(updated, None)
+    assert store.find_one(ongoing_match.uuid) is None
+
+
+def test_processes_do_not_lose_updates(db: Database, db_url: str) -> None:
+    store = SqlOngoingMatchStore(db=db)
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='A'), player2=Player(id=2, name='B')
+    )
+    store.put(ongoing_match)
+    updates = 50
+
+    _run_workers(_increment_worker, (db_url, str(ongoing_match.uuid), updates))
+
+    stored = store.find_one(ongoing_match.uuid)
+    assert stored is not None
+    assert stored.score.tie_break_score is not None
+    assert stored.score.tie_break_score.points[0] == N_WORKERS * updates
+
+
+def test_workers_serve_the_same_match(db: Database, db_url: str) -> None:
+    match_srv = MatchService(db=db, ongoing_match_store=SqlOngoingMatchStore(db=db))
+    ongoing_match = match_srv.create_new_match('Player One', 'Player Two')
+    # 2 сета по 6 геймов по 4 очка - ровно столько нужно для победы 2:0.
+    points_to_win = 2 * 6 * 4
+
+    _run_workers(
+        _record_points_worker,
+        (db_url, str(ongoing_match.uuid), points_to_win // N_WORKERS),
+    )
+
+    with db.get_session() as session:
+        assert session.scalars(select(OngoingMatchSnapshot)).all() == []
+        finished = session.scalars(select(Match)).one()
+        assert finished.uuid == ongoing_match.uuid
+        assert finished.winner_id == ongoing_match.player1.id
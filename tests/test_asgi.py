@@ -0,0 +1,114 @@
+import asyncio
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    AsgiApp,
+    AsyncDatabase,
+    Database,
+    InMemoryOngoingMatchStore,
+    MainController,
+    MatchController,
+    MatchService,
+    Router,
+    register_routes,
+)
+from app.domain import PlayerIdentifier
+from app.settings import settings
+
+
+class _Response:
+    def __init__(self, messages: list[dict[str, Any]]):
+        start, body = messages
+        self.status: int = start['status']
+        self.headers = {
+            name.decode(): value.decode() for name, value in start['headers']
+        }
+        self.body: str = body['body'].decode('utf-8')
+
+
+@pytest.fixture
+def match_srv(db: Database, db_url: str) -> Iterator[MatchService]:
+    async_db = AsyncDatabase(db_url=db_url, echo=False)
+    yield MatchService(
+        db=db, ongoing_match_store=InMemoryOngoingMatchStore(), async_db=async_db
+    )
+    asyncio.run(async_db.dispose())
+
+
+@pytest.fixture
+def app(match_srv: MatchService) -> AsgiApp:
+    jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
+    router = Router()
+    register_routes(
+        router=router,
+        main_ctrl=MainController(jinja_env=jinja_env),
+        match_ctrl=MatchController(jinja_env=jinja_env, match_srv=match_srv),
+        use_async=True,
+    )
+    return AsgiApp(router=router, max_workers=2, static_dir=settings.static_dir)
+
+
+def _request(
+    app: AsgiApp, method: str, path: str, query: str = '', body: str = ''
+) -> _Response:
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {'type': 'http.request', 'body': body.encode(), 'more_body': False}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode(),
+    }
+    asyncio.run(app(scope, receive, send))
+    return _Response(messages)
+
+
+def test_serves_sync_handlers_from_executor(app: AsgiApp) -> None:
+    created = _request(
+        app,
+        'POST',
+        '/new-match',
+        body='player1_name=Rafael Nadal&player2_name=Roger Federer',
+    )
+    assert created.status == 303
+
+    location = created.headers['location']
+    score = _request(app, 'GET', '/match-score', query=location.split('?', 1)[1])
+    assert score.status == 200
+    assert 'Rafael Nadal' in score.body
+
+
+def test_serves_finished_matches_with_async_queries(
+    app: AsgiApp, match_srv: MatchService
+) -> None:
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    match_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.TWO] * 48)
+    match_srv.create_new_match('Novak Djokovic', 'Andy Murray')
+
+    response = _request(
+        app, 'GET', '/matches', query='filter_by_player_name=Roger Federer'
+    )
+
+    assert response.status == 200
+    assert 'Roger Federer' in response.body
+    assert 'Novak Djokovic' not in response.body
+
+
+def test_unknown_path_and_static_files(app: AsgiApp) -> None:
+    assert _request(app, 'GET', '/unknown').status == 404
+    assert _request(app, 'GET', '/static/../settings.py').status == 404
+
+    static_file = next(settings.static_dir.rglob('*.css'))
+    relative_path = static_file.relative_to(settings.static_dir).as_posix()
+    response = _request(app, 'GET', f'/static/{relative_path}')
+    assert response.status == 200
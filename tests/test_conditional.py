@@ -0,0 +1,206 @@
+import asyncio
+import io
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from typing import Any
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    AsgiApp,
+    AsyncDatabase,
+    Database,
+    InMemoryOngoingMatchStore,
+    MainController,
+    MatchController,
+    MatchService,
+    Router,
+    register_routes,
+)
+from app.conditional import Validators
+from app.domain import PlayerIdentifier
+from app.settings import settings
+from main import App
+
+MODIFIED = datetime(2025, 1, 2, 3, 4, 5, tzinfo=UTC)
+
+
+@pytest.mark.parametrize(
+    ('if_none_match', 'if_modified_since', 'expected'),
+    [
+        ('"abc"', None, True),
+        ('"x", W/"abc"', None, True),
+        ('*', None, True),
+        ('"x"', None, False),
+        # If-None-Match важнее If-Modified-Since.
+        ('"x"', 'Thu, 02 Jan 2025 03:04:05 GMT', False),
+        (None, 'Thu, 02 Jan 2025 03:04:05 GMT', True),
+        (None, 'Thu, 02 Jan 2025 03:04:04 GMT', False),
+        (None, 'not a date', False),
+        (None, None, False),
+    ],
+)
+def test_validators_match_request_headers(
+    if_none_match: str | None, if_modified_since: str | None, expected: bool
+) -> None:
+    validators = Validators(etag='"abc"', last_modified=MODIFIED)
+
+    assert validators.is_not_modified(if_none_match, if_modified_since) is expected
+
+
+@pytest.fixture
+def match_srv(db: Database, db_url: str) -> Iterator[MatchService]:
+    async_db = AsyncDatabase(db_url=db_url, echo=False)
+    yield MatchService(
+        db=db, ongoing_match_store=InMemoryOngoingMatchStore(), async_db=async_db
+    )
+    asyncio.run(async_db.dispose())
+
+
+def _router(match_srv: MatchService, use_async: bool) -> Router:
+    jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
+    router = Router()
+    register_routes(
+        router=router,
+        main_ctrl=MainController(jinja_env=jinja_env),
+        match_ctrl=MatchController(jinja_env=jinja_env, match_srv=match_srv),
+        use_async=use_async,
+    )
+    return router
+
+
+def _wsgi_get(
+    app: App, path: str, query: str = '', **headers: str
+) -> tuple[str, dict[str, str], bytes]:
+    response: dict[str, Any] = {}
+
+    def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+        response['status'], response['headers'] = status, dict(headers)
+
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'wsgi.input': io.BytesIO(),
+        **{f'HTTP_{name.upper()}': value for name, value in headers.items()},
+    }
+    body = b''.join(app(environ, start_response))  # type: ignore[arg-type]
+    return response['status'], response['headers'], body
+
+
+def _asgi_get(
+    app: AsgiApp, path: str, query: str = '', **headers: str
+) -> tuple[int, dict[str, str], bytes]:
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query.encode(),
+        'headers': [
+            (name.replace('_', '-').encode(), value.encode())
+            for name, value in headers.items()
+        ],
+    }
+    asyncio.run(app(scope, receive, send))
+    start, body = messages
+    response_headers = {
+        name.decode(): value.decode() for name, value in start['headers']
+    }
+    return start['status'], response_headers, body['body']
+
+
+def test_wsgi_match_score_page_is_not_modified_until_next_point(
+    match_srv: MatchService,
+) -> None:
+    app = App(router=_router(match_srv, use_async=False))
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    query = f'uuid={ongoing_match.uuid}'
+
+    status, headers, _ = _wsgi_get(app, '/match-score', query)
+    assert status == '200 OK'
+    etag = headers['ETag']
+
+    status, _, body = _wsgi_get(app, '/match-score', query, if_none_match=etag)
+    assert status == '304 Not Modified'
+    assert body == b''
+
+    match_srv.record_point(ongoing_match.uuid, PlayerIdentifier.ONE)
+    status, headers, _ = _wsgi_get(app, '/match-score', query, if_none_match=etag)
+    assert status == '200 OK'
+    assert headers['ETag'] != etag
+
+
+def test_wsgi_template_page_uses_last_modified(match_srv: MatchService) -> None:
+    app = App(router=_router(match_srv, use_async=False))
+
+    status, headers, _ = _wsgi_get(app, '/')
+    assert status == '200 OK'
+
+    status, _, _ = _wsgi_get(app, '/', if_modified_since=headers['Last-Modified'])
+    assert status == '304 Not Modified'
+
+
+def test_asgi_matches_page_changes_with_finished_matches(
+    match_srv: MatchService,
+) -> None:
+    app = AsgiApp(router=_router(match_srv, use_async=True), max_workers=2)
+
+    status, headers, _ = _asgi_get(app, '/matches')
+    assert status == 200
+    etag = headers['etag']
+    assert _asgi_get(app, '/matches', if_none_match=etag)[0] == 304
+    # Другая страница - другой ответ.
+    assert _asgi_get(app, '/matches', 'page=2', if_none_match=etag)[0] == 200
+
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    match_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.ONE] * 48)
+
+    status, headers, body = _asgi_get(app, '/matches', if_none_match=etag)
+    assert status == 200
+    assert headers['etag'] != etag
+    assert b'Rafael Nadal' in body
+
+
+def test_wsgi_matches_page_computes_validators_once(
+    match_srv: MatchService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    app = App(router=_router(match_srv, use_async=False))
+    versions = []
+    get_version = match_srv.get_finished_matches_version
+
+    def counted_get_version() -> tuple[int, int]:
+        versions.append(get_version())
+        return versions[-1]
+
+    monkeypatch.setattr(match_srv, 'get_finished_matches_version', counted_get_version)
+
+    assert _wsgi_get(app, '/matches')[0] == '200 OK'
+    assert len(versions) == 1
+
+
+def test_asgi_matches_page_computes_validators_once(
+    match_srv: MatchService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    app = AsgiApp(router=_router(match_srv, use_async=True), max_workers=2)
+    versions = []
+    get_version = match_srv.get_finished_matches_version_async
+
+    async def counted_get_version() -> tuple[int, int]:
+        versions.append(await get_version())
+        return versions[-1]
+
+    monkeypatch.setattr(
+        match_srv, 'get_finished_matches_version_async', counted_get_version
+    )
+
+    assert _asgi_get(app, '/matches')[0] == 200
+    assert len(versions) == 1
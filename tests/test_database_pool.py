@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import ExitStack
+from pathlib import Path
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app import AsyncDatabase, Database, MetricsController, RenderCache
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Database:
+    return Database(
+        db_url=f'sqlite:///{tmp_path / "app.db"}',
+        echo=False,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_usage_is_counted(db: Database) -> None:
+    with ExitStack() as stack:
+        stack.enter_context(db.get_session())
+        stack.enter_context(db.get_session())
+        stats = db.pool_stats()
+        assert (stats['in_use'], stats['overflow']) == (2, 1)
+        assert stats['overflow_connections'] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            stack.enter_context(db.get_session())
+
+    stats = db.pool_stats()
+    assert stats['checkouts'] == 2
+    assert stats['checkout_timeouts'] == 1
+    assert stats['checkout_wait_seconds'] >= 0.05
+    assert (stats['in_use'], stats['size'], stats['overflow']) == (0, 1, 0)
+
+
+def test_pool_metrics_are_exposed(db: Database) -> None:
+    with db.get_session():
+        pass
+    metrics_ctrl = MetricsController(render_cache=RenderCache(max_entries=1), db=db)
+
+    status, _, body = metrics_ctrl.show_metrics()
+    assert status == '200 OK'
+    assert 'db_pool_checkouts_total 1\n' in body
+    assert 'db_pool_connections_in_use 0\n' in body
+    assert '# TYPE db_pool_checkout_wait_seconds_total counter\n' in body
+
+
+def test_async_engine_is_created_on_first_session() -> None:
+    # Без асинхронного драйвера для БД падает только асинхронный запрос,
+    # а не создание приложения.
+    async_db = AsyncDatabase(db_url='mysql://user@localhost/app', echo=False)
+
+    async def query() -> None:
+        async with async_db.get_session():
+            pass
+
+    with pytest.raises(ValueError, match='No async driver'):
+        asyncio.run(query())
+    asyncio.run(async_db.dispose())
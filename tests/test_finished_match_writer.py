@@ -0,0 +1,222 @@
+import threading
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import event, func, select
+
+from app import (
+    Database,
+    FinishedMatchWriter,
+    InMemoryOngoingMatchStore,
+    MatchController,
+    MatchService,
+)
+from app.domain import OngoingMatch
+from app.models import Match
+from app.settings import settings
+from tests.conftest import FINAL_POINTS
+
+
+@pytest.fixture
+def writer(db: Database) -> Iterator[FinishedMatchWriter]:
+    writer = FinishedMatchWriter(db=db, batch_size=100, flush_interval=60)
+    yield writer
+    writer.close()
+
+
+@pytest.fixture
+def match_srv(db: Database, writer: FinishedMatchWriter) -> MatchService:
+    return MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+
+
+def finish_match(match_srv: MatchService, player1: str, player2: str) -> OngoingMatch:
+    ongoing_match = match_srv.create_new_match(player1, player2)
+    return match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+
+
+def count_matches(db: Database) -> int:
+    with db.get_session() as session:
+        return session.execute(select(func.count()).select_from(Match)).scalar() or 0
+
+
+def test_pending_matches_are_shown_until_written(
+    db: Database, writer: FinishedMatchWriter, match_srv: MatchService
+) -> None:
+    for i in range(7):
+        finish_match(match_srv, f'Player {i}', 'Rafael Nadal')
+    assert count_matches(db) == 0
+
+    first = match_srv.get_finished_matches_paginated(1, None)
+    second = match_srv.get_finished_matches_paginated(2, None)
+    filtered = match_srv.get_finished_matches_paginated(1, 'Player 0')
+    assert [m['player1_name'] for m in first['matches'] + second['matches']] == [
+        f'Player {i}' for i in reversed(range(7))
+    ]
+    assert first['total_pages'] == 2
+    assert [m['player1_name'] for m in filtered['matches']] == ['Player 0']
+
+    assert writer.flush(timeout=5)
+    assert count_matches(db) == 7
+    assert writer.pending() == []
+    assert match_srv.get_finished_matches_paginated(1, None) == {
+        **first,
+        'next_after_id': 3,
+    }
+    assert match_srv.check_match_counters() == {}
+
+
+def test_pages_with_pending_matches_link_by_page_number(
+    writer: FinishedMatchWriter, match_srv: MatchService
+) -> None:
+    for i in range(3):
+        finish_match(match_srv, f'Stored {i}', 'Rafael Nadal')
+    assert writer.flush(timeout=5)
+    for i in range(7):
+        finish_match(match_srv, f'Pending {i}', 'Rafael Nadal')
+
+    first = match_srv.get_finished_matches_paginated(1, None)
+    second = match_srv.get_finished_matches_paginated(2, None)
+    assert (first['total_pages'], len(first['matches'])) == (2, 5)
+    assert [m['player1_name'] for m in second['matches']] == [
+        'Pending 1',
+        'Pending 0',
+        'Stored 2',
+        'Stored 1',
+        'Stored 0',
+    ]
+    # Курсоры читали бы только БД и пропустили бы матчи из очереди.
+    for page in (first, second):
+        assert (page['next_after_id'], page['prev_before_id']) == (None, None)
+
+    match_ctrl = MatchController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        match_srv=match_srv,
+    )
+    _, _, first_html = match_ctrl.show_matches_page(page='1')
+    _, _, second_html = match_ctrl.show_matches_page(page='2')
+    assert '<a class="next" href="/matches?page=2">' in first_html
+    assert '<a class="prev" href="/matches?page=1">' in second_html
+    assert 'class="next"' not in second_html
+
+
+def test_batch_is_written_in_one_transaction(
+    db: Database, writer: FinishedMatchWriter, match_srv: MatchService
+) -> None:
+    commits = []
+    event.listen(db._engine, 'commit', lambda conn: commits.append(conn))
+    for i in range(10):
+        finish_match(match_srv, f'Player {i}', f'Player {i + 10}')
+    commits.clear()
+
+    writer.flush(timeout=5)
+    assert len(commits) == 1
+    assert count_matches(db) == 10
+
+
+def test_full_queue_blocks_submit(
+    db: Database, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    writer = FinishedMatchWriter(db=db, max_pending=1, submit_timeout=0.05)
+    match_srv = MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    # Фоновый поток не пишет, пока не получит разрешения.
+    release = threading.Event()
+    write = writer._write
+
+    def slow_write(*args: Any) -> None:
+        release.wait()
+        write(*args)
+
+    monkeypatch.setattr(writer, '_write', slow_write)
+
+    finish_match(match_srv, 'Rafael Nadal', 'Roger Federer')
+    ongoing_match = match_srv.create_new_match('Novak Djokovic', 'Andy Murray')
+    with pytest.raises(TimeoutError):
+        match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+    # Матч, не попавший в очередь, откатывается к состоянию до этих очков.
+    assert not match_srv.get_ongoing_match(ongoing_match.uuid).is_finished
+
+    release.set()
+    match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+    writer.close()
+    assert count_matches(db) == 2
+
+
+def test_close_writes_remaining_matches(db: Database) -> None:
+    writer = FinishedMatchWriter(db=db, flush_interval=60)
+    match_srv = MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    finish_match(match_srv, 'Rafael Nadal', 'Roger Federer')
+
+    writer.close()
+    assert count_matches(db) == 1
+    with pytest.raises(RuntimeError):
+        finish_match(match_srv, 'Novak Djokovic', 'Andy Murray')
+
+
+def test_failed_batch_is_retried(db: Database) -> None:
+    writer = FinishedMatchWriter(db=db, flush_interval=0, retry_interval=0.01)
+    match_srv = MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    failed = threading.Event()
+
+    def fail_once(conn: Any, *args: Any) -> None:
+        if not failed.is_set():
+            failed.set()
+            raise RuntimeError('database is unavailable')
+
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    event.listen(db._engine, 'before_cursor_execute', fail_once)
+    try:
+        match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+        assert writer.flush(timeout=5)
+    finally:
+        event.remove(db._engine, 'before_cursor_execute', fail_once)
+        writer.close()
+
+    assert failed.is_set()
+    assert count_matches(db) == 1
+    assert match_srv.check_match_counters() == {}
+
+
+def test_close_gives_up_when_database_is_down(
+    db: Database, caplog: pytest.LogCaptureFixture
+) -> None:
+    writer = FinishedMatchWriter(db=db, flush_interval=0, retry_interval=0.01)
+    match_srv = MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+
+    def fail(conn: Any, *args: Any) -> None:
+        raise RuntimeError('database is unavailable')
+
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    event.listen(db._engine, 'before_cursor_execute', fail)
+    try:
+        match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+        assert writer.close(timeout=0.1) == 1
+        # Фоновый поток перестает повторять пачку после неудачной остановки.
+        writer._thread.join(timeout=5)
+        assert not writer._thread.is_alive()
+    finally:
+        event.remove(db._engine, 'before_cursor_execute', fail)
+
+    assert 'Dropped 1 unwritten finished matches on close' in caplog.text
+    assert count_matches(db) == 0
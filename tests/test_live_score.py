@@ -0,0 +1,244 @@
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    AsgiApp,
+    Database,
+    InMemoryOngoingMatchStore,
+    LiveScoreHub,
+    MainController,
+    MatchController,
+    MatchService,
+    Router,
+    register_routes,
+)
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.settings import settings
+
+
+@pytest.fixture
+def hub() -> LiveScoreHub:
+    return LiveScoreHub()
+
+
+@pytest.fixture
+def match_srv(db: Database, hub: LiveScoreHub) -> Iterator[MatchService]:
+    yield MatchService(
+        db=db, ongoing_match_store=InMemoryOngoingMatchStore(), live_score_hub=hub
+    )
+
+
+@pytest.fixture
+def app(match_srv: MatchService) -> AsgiApp:
+    jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
+    router = Router()
+    register_routes(
+        router=router,
+        main_ctrl=MainController(jinja_env=jinja_env),
+        match_ctrl=MatchController(
+            jinja_env=jinja_env, match_srv=match_srv, live_updates=True
+        ),
+        use_async=True,
+    )
+    return AsgiApp(router=router, max_workers=2)
+
+
+def _match() -> OngoingMatch:
+    return OngoingMatch(player1=Player(id=1, name='A'), player2=Player(id=2, name='B'))
+
+
+def _events(chunks: list[bytes]) -> list[tuple[str, dict[str, Any]]]:
+    events = []
+    for raw_event in b''.join(chunks).decode().split('\n\n'):
+        lines = dict(
+            line.split(': ', 1) for line in raw_event.splitlines() if ': ' in line
+        )
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    return events
+
+
+def test_publishes_only_changed_fields(hub: LiveScoreHub) -> None:
+    ongoing_match = _match()
+
+    async def scenario() -> list[dict[str, Any]]:
+        subscription = hub.subscribe(ongoing_match.uuid)
+        scored = ongoing_match.add_point(PlayerIdentifier.ONE)
+        await asyncio.to_thread(hub.publish, ongoing_match)
+        first = json.loads(await subscription.get())
+        await asyncio.to_thread(hub.publish, scored)
+        second = json.loads(await subscription.get())
+        subscription.close()
+        return [first, second]
+
+    first, second = asyncio.run(scenario())
+
+    assert first == ongoing_match.get_view_model()
+    assert second == {'player1_points': '15'}
+    assert hub.subscriber_count(ongoing_match.uuid) == 0
+
+
+def test_slow_subscriber_gets_merged_changes(hub: LiveScoreHub) -> None:
+    ongoing_match = _match()
+
+    async def scenario() -> dict[str, Any]:
+        subscription = hub.subscribe(ongoing_match.uuid)
+        hub.publish(ongoing_match)
+        await subscription.get()
+
+        current = ongoing_match
+        for point_winner in [
+            PlayerIdentifier.ONE,
+            PlayerIdentifier.TWO,
+            PlayerIdentifier.TWO,
+        ]:
+            current = current.add_point(point_winner)
+            hub.publish(current)
+        # Устаревшая публикация не перезаписывает более новое состояние.
+        hub.publish(ongoing_match.add_point(PlayerIdentifier.ONE))
+        await asyncio.sleep(0)
+
+        delta: dict[str, Any] = json.loads(await subscription.get())
+        subscription.close()
+        return delta
+
+    assert asyncio.run(scenario()) == {
+        'player1_points': '15',
+        'player2_points': '30',
+    }
+
+
+def test_streams_score_until_client_disconnects(
+    app: AsgiApp, match_srv: MatchService, hub: LiveScoreHub
+) -> None:
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    messages: list[dict[str, Any]] = []
+
+    async def scenario() -> None:
+        disconnected = asyncio.Event()
+        requests = iter([{'type': 'http.request', 'body': b''}])
+
+        async def receive() -> dict[str, Any]:
+            request = next(requests, None)
+            if request is not None:
+                return request
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: dict[str, Any]) -> None:
+            messages.append(message)
+
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/match-score/stream',
+            'query_string': f'uuid={ongoing_match.uuid}'.encode(),
+        }
+        task = asyncio.create_task(app(scope, receive, send))
+        while hub.subscriber_count(ongoing_match.uuid) == 0 or len(messages) < 2:
+            await asyncio.sleep(0.01)
+
+        await asyncio.to_thread(
+            match_srv.record_point, ongoing_match.uuid, PlayerIdentifier.TWO
+        )
+        while len(messages) < 3:
+            await asyncio.sleep(0.01)
+
+        disconnected.set()
+        await task
+
+    asyncio.run(scenario())
+
+    assert messages[0]['status'] == 200
+    assert _events([message.get('body', b'') for message in messages[1:]]) == [
+        ('snapshot', ongoing_match.get_view_model()),
+        ('score', {'player2_points': '15'}),
+    ]
+    assert hub.subscriber_count(ongoing_match.uuid) == 0
+
+
+def test_stream_closes_after_match_is_finished(
+    app: AsgiApp, match_srv: MatchService
+) -> None:
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    messages: list[dict[str, Any]] = []
+
+    async def scenario() -> None:
+        async def receive() -> dict[str, Any]:
+            if not messages:
+                return {'type': 'http.request', 'body': b''}
+            await asyncio.Event().wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: dict[str, Any]) -> None:
+            messages.append(message)
+
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/match-score/stream',
+            'query_string': f'uuid={ongoing_match.uuid}'.encode(),
+        }
+        task = asyncio.create_task(app(scope, receive, send))
+        while len(messages) < 2:
+            await asyncio.sleep(0.01)
+
+        await asyncio.to_thread(
+            match_srv.record_points, ongoing_match.uuid, [PlayerIdentifier.ONE] * 48
+        )
+        await asyncio.wait_for(task, timeout=5)
+
+    asyncio.run(scenario())
+
+    events = _events([message.get('body', b'') for message in messages[1:]])
+    assert events[-1][0] == 'score'
+    assert events[-1][1]['is_finished'] is True
+    assert events[-1][1]['winner_name'] == 'Rafael Nadal'
+    assert messages[-1].get('more_body', False) is False
+
+
+def test_stream_for_unknown_match(app: AsgiApp) -> None:
+    messages: list[dict[str, Any]] = []
+
+    async def receive() -> dict[str, Any]:
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message: dict[str, Any]) -> None:
+        messages.append(message)
+
+    for query, status in [
+        (b'uuid=not-a-uuid', 400),
+        (b'uuid=00000000-0000-0000-0000-000000000000', 404),
+    ]:
+        messages.clear()
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': '/match-score/stream',
+            'query_string': query,
+        }
+        asyncio.run(app(scope, receive, send))
+        assert messages[0]['status'] == status
+
+
+@pytest.mark.parametrize('live_updates', [False, True])
+def test_score_page_subscribes_only_with_stream_route(
+    match_srv: MatchService, live_updates: bool
+) -> None:
+    # Маршрут потока есть только у ASGI-сервера: страница WSGI-сервера
+    # не открывает подписку, которая получила бы 404.
+    match_ctrl = MatchController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        match_srv=match_srv,
+        live_updates=live_updates,
+    )
+    ongoing_match = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+
+    _, _, html = match_ctrl.show_match_score_page(str(ongoing_match.uuid))
+
+    assert ('live-score.js' in html) is live_updates
@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import update
+
+from app import Database, InMemoryOngoingMatchStore, MatchService, cli
+from app.domain import PlayerIdentifier
+from app.models import MatchCounter
+from app.settings import settings
+
+
+@pytest.fixture
+def match_srv(db: Database) -> MatchService:
+    return MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+
+
+def _finish_match(match_srv: MatchService, player1: str, player2: str) -> None:
+    ongoing_match = match_srv.create_new_match(player1, player2)
+    match_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.ONE] * 48)
+
+
+def test_counters_follow_finished_matches(match_srv: MatchService) -> None:
+    for _ in range(7):
+        _finish_match(match_srv, 'Rafael Nadal', 'Roger Federer')
+    for _ in range(4):
+        _finish_match(match_srv, 'Novak Djokovic', 'Roger Federer')
+
+    assert match_srv.get_finished_matches_paginated(1, None)['total_pages'] == 3
+    pages = match_srv.get_finished_matches_paginated(1, 'Rafael Nadal')
+    assert pages['total_pages'] == 2
+    assert match_srv.check_match_counters() == {}
+
+
+def test_drifted_counters_are_reported_and_rebuilt(
+    match_srv: MatchService, monkeypatch: pytest.MonkeyPatch, db_url: str
+) -> None:
+    _finish_match(match_srv, 'Rafael Nadal', 'Roger Federer')
+    with match_srv._db.get_session() as session:
+        session.execute(update(MatchCounter).values(matches=MatchCounter.matches + 5))
+
+    assert match_srv.check_match_counters() == {0: (6, 1), 1: (6, 1), 2: (6, 1)}
+
+    monkeypatch.setattr(settings, 'db_url', db_url)
+    assert cli.main(['check-match-counters']) == 1
+    assert cli.main(['check-match-counters', '--rebuild']) == 0
+    assert cli.main(['check-match-counters']) == 0
+    assert match_srv.get_finished_matches_paginated(1, None)['total_pages'] == 1
@@ -0,0 +1,132 @@
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    Database,
+    InMemoryOngoingMatchStore,
+    MainController,
+    MatchController,
+    MatchService,
+    Router,
+    cli,
+    register_routes,
+)
+from app.settings import settings
+from main import App
+from tests.conftest import LOST_SET, TIE_BREAK_SET, WON_SET
+
+CSV_ROWS = [
+    ['1', 'Rafael Nadal', 'Roger Federer', 'Rafael Nadal', '7-6(7-0) 0-6 7-6(7-0)'],
+    ['2', 'Roger Federer', 'Novak Djokovic', 'Roger Federer', '6-0 6-0'],
+    ['3', 'Рафаэль, "Рафа"', 'Roger Federer', 'Roger Federer', '0-6 0-6'],
+]
+
+
+@pytest.fixture
+def match_srv(db: Database) -> MatchService:
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    for player1, player2, points in [
+        ('Rafael Nadal', 'Roger Federer', TIE_BREAK_SET + LOST_SET + TIE_BREAK_SET),
+        ('Roger Federer', 'Novak Djokovic', WON_SET * 2),
+        ('Рафаэль, "Рафа"', 'Roger Federer', LOST_SET * 2),
+    ]:
+        ongoing_match = match_srv.create_new_match(player1, player2)
+        match_srv.record_points(ongoing_match.uuid, points)
+    return match_srv
+
+
+@pytest.fixture
+def app(match_srv: MatchService) -> App:
+    jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
+    router = Router()
+    register_routes(
+        router=router,
+        main_ctrl=MainController(jinja_env=jinja_env),
+        match_ctrl=MatchController(jinja_env=jinja_env, match_srv=match_srv),
+    )
+    return App(router=router)
+
+
+def wsgi_get(app: App, path: str, query: str = '') -> tuple[str, dict[str, str], Any]:
+    response: dict[str, Any] = {}
+
+    def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+        response['status'], response['headers'] = status, dict(headers)
+
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'wsgi.input': io.BytesIO(),
+    }
+    body = app(environ, start_response)  # type: ignore[arg-type]
+    return response['status'], response['headers'], body
+
+
+def csv_rows(text: str) -> list[list[str]]:
+    # uuid матчей случайные: сравнивается все, кроме них.
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == ['id', 'uuid', 'player1', 'player2', 'winner', 'sets']
+    return [[row[0], *row[2:]] for row in rows[1:]]
+
+
+def test_csv_export(match_srv: MatchService) -> None:
+    chunks = list(match_srv.export_finished_matches('csv', batch_size=2))
+
+    assert len(chunks) == 2
+    assert csv_rows(''.join(chunks)) == CSV_ROWS
+
+
+def test_ndjson_export(match_srv: MatchService) -> None:
+    text = ''.join(match_srv.export_finished_matches('ndjson'))
+    matches = [json.loads(line) for line in text.splitlines()]
+
+    assert [m['id'] for m in matches] == [1, 2, 3]
+    assert matches[0]['sets'] == [
+        {'player1_games': 7, 'player2_games': 6, 'tie_break_points': [7, 0]},
+        {'player1_games': 0, 'player2_games': 6},
+        {'player1_games': 7, 'player2_games': 6, 'tie_break_points': [7, 0]},
+    ]
+    assert matches[2]['player1_name'] == 'Рафаэль, "Рафа"'
+    assert matches[2]['winner_name'] == 'Roger Federer'
+
+
+def test_export_is_streamed_through_wsgi(app: App, db: Database) -> None:
+    status, headers, body = wsgi_get(app, '/matches/export', 'format=ndjson')
+
+    assert status == '200 OK'
+    assert headers['Content-Type'] == 'application/x-ndjson; charset=utf-8'
+    # Тело - итератор: БД читается по мере отправки, а не до ответа.
+    assert not isinstance(body, list)
+    assert db.pool_stats()['in_use'] == 0
+    assert next(body).startswith(b'{"id": 1,')
+    assert db.pool_stats()['in_use'] == 1
+    # Сервер закрывает тело и при обрыве соединения: сессия освобождается.
+    body.close()
+    assert db.pool_stats()['in_use'] == 0
+
+
+def test_export_rejects_unknown_format(app: App) -> None:
+    status, _, body = wsgi_get(app, '/matches/export', 'format=xml')
+
+    assert status == '400 Bad Request'
+    assert b''.join(body) == b'<h1>400 Bad Request: Unknown export format</h1>'
+
+
+def test_export_command(
+    match_srv: MatchService,
+    db_url: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    output = tmp_path / 'matches.csv'
+    monkeypatch.setattr(settings, 'db_url', db_url)
+
+    assert cli.main(['export-matches', '--output', str(output)]) == 0
+    assert csv_rows(output.read_text(encoding='utf-8')) == CSV_ROWS
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import Engine, create_engine
+
+from app.models import Base, Player
+from app.repositories.match_repository import _build_page_statement
+
+
+@pytest.fixture
+def engine() -> Engine:
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.mark.parametrize(
+    'page',
+    [
+        {'offset': 0},
+        {'offset': 50},
+        {'after_id': 1000},
+        {'before_id': 1000},
+    ],
+)
+def test_player_filter_is_index_driven(engine: Engine, page: dict[str, int]) -> None:
+    stmt = _build_page_statement(limit=6, player=Player(id=1, name='x'), **page)
+    sql = stmt.compile(engine, compile_kwargs={'literal_binds': True})
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+    assert any('INDEX ix_Matches_Player1_ID' in step for step in plan)
+    assert any('INDEX ix_Matches_Player2_ID' in step for step in plan)
+    # Таблица матчей целиком не просматривается: по ней только поиск по ключу.
+    assert not any(step.startswith('SCAN Matches') for step in plan)
@@ -0,0 +1,195 @@
+import io
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from app import (
+    Database,
+    InMemoryOngoingMatchStore,
+    MatchImporter,
+    MatchService,
+    PlayerNameIndex,
+    PlayerService,
+    cli,
+)
+from app.repositories import PlayerRatingRepository, PlayerStatsRepository
+from app.schemas import ImportedMatchSchema
+from app.services.match_importer import (
+    InvalidRow,
+    _validate,
+    _validate_score_string,
+    read_matches,
+)
+from app.settings import settings
+from tests.conftest import LOST_SET, TIE_BREAK_SET, WON_SET, make_db
+
+MATCHES = [
+    ('Rafael Nadal', 'Roger Federer', TIE_BREAK_SET + LOST_SET + TIE_BREAK_SET),
+    ('Roger Federer', 'Novak Djokovic', WON_SET * 2),
+    ('Рафаэль, "Рафа"', 'Roger Federer', LOST_SET * 2),
+    ('Novak Djokovic', 'Rafael Nadal', LOST_SET + WON_SET + LOST_SET),
+]
+NAMES = ['Rafael Nadal', 'Roger Federer', 'Novak Djokovic', 'Рафаэль, "Рафа"']
+
+CSV_FILE = """\
+player1,player2,winner,sets,points
+Rafael Nadal,Roger Federer,,6-4 7-6(9-7),
+Andy Murray,Rafael Nadal,Rafael Nadal,,{lost_match}
+Andy Murray,Rafael Nadal,,6-4 7-7,
+Andy Murray,Rafael Nadal,Andy Murray,0-6 0-6,
+Andy Murray,,,6-0 6-0,
+Andy Murray,Rafael Nadal,,6-0 6-0,{lost_match}
+""".format(lost_match='1' * 48)
+
+
+@pytest.fixture
+def played_db(tmp_path: Path) -> Database:
+    db = make_db(f'sqlite:///{tmp_path / "played.db"}')
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    for player1, player2, points in MATCHES:
+        ongoing_match = match_srv.create_new_match(player1, player2)
+        match_srv.record_points(ongoing_match.uuid, points)
+    return db
+
+
+def export(db: Database) -> str:
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    return ''.join(match_srv.export_finished_matches('ndjson'))
+
+
+def test_imported_matches_equal_played_ones(played_db: Database, db: Database) -> None:
+    exported = export(played_db)
+    importer = MatchImporter(db=db, chunk_size=3)
+
+    stats = importer.import_matches(read_matches(io.StringIO(exported), 'ndjson'))
+
+    assert (stats.read, stats.imported, stats.existing, stats.invalid) == (4, 4, 0, 0)
+    # Матчи, сеты, uuid и игроки те же, что у сыгранных матчей.
+    assert export(db) == exported
+    played_srv, imported_srv = (
+        PlayerService(db=d, player_name_index=PlayerNameIndex(db=d))
+        for d in (played_db, db)
+    )
+    assert imported_srv.get_leaderboard() == played_srv.get_leaderboard()
+    # Игроки созданы в том же порядке и получили те же id.
+    for player_id in range(1, len(NAMES) + 1):
+        stats_dict = imported_srv.get_player_stats(player_id)
+        assert stats_dict is not None
+        assert stats_dict == played_srv.get_player_stats(player_id)
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    assert match_srv.check_match_counters() == {}
+
+
+def test_interrupted_import_keeps_player_stats(
+    played_db: Database, db: Database
+) -> None:
+    lines = export(played_db).splitlines(keepends=True)
+
+    def failing_lines() -> Iterator[str]:
+        yield from lines[:2]
+        raise OSError('read failed')
+
+    importer = MatchImporter(db=db, chunk_size=2)
+    with pytest.raises(OSError):
+        importer.import_matches(read_matches(failing_lines(), 'ndjson'))
+
+    # Записанная пачка учтена в итогах и рейтингах без пересчета.
+    player_srv = PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+    leaderboard = player_srv.get_leaderboard()
+    player_stats = [player_srv.get_player_stats(i) for i in range(1, 4)]
+    assert leaderboard
+    with db.get_session() as session:
+        PlayerStatsRepository(session).rebuild()
+    with db.get_session() as session:
+        PlayerRatingRepository(session).recompute()
+    assert player_srv.get_leaderboard() == leaderboard
+    assert [player_srv.get_player_stats(i) for i in range(1, 4)] == player_stats
+
+
+def test_existing_uuids_are_skipped(played_db: Database) -> None:
+    exported = export(played_db)
+    lines = exported.splitlines(keepends=True)
+    importer = MatchImporter(db=played_db, chunk_size=2)
+
+    stats = importer.import_matches(read_matches([*lines, lines[0]], 'ndjson'))
+
+    assert (stats.read, stats.imported, stats.existing) == (5, 0, 5)
+    assert export(played_db) == exported
+
+
+def test_csv_rows_are_validated(db: Database) -> None:
+    invalid: list[InvalidRow] = []
+    importer = MatchImporter(db=db, chunk_size=1)
+
+    stats = importer.import_matches(
+        read_matches(io.StringIO(CSV_FILE), 'csv'), on_invalid=invalid.append
+    )
+
+    assert (stats.read, stats.imported, stats.invalid) == (6, 2, 4)
+    assert invalid == [
+        InvalidRow(4, 'Set 2 has an impossible score'),
+        InvalidRow(5, "The score is won by 'Rafael Nadal', not the winner"),
+        InvalidRow(6, 'player2_name: Field required'),
+        InvalidRow(7, 'Value error, Exactly one of sets and points must be given'),
+    ]
+    player_srv = PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+    stats_dict = player_srv.get_player_stats(1)
+    assert stats_dict is not None
+    assert stats_dict['name'] == 'Rafael Nadal'
+    assert (stats_dict['matches'], stats_dict['wins']) == (2, 2)
+
+
+UUID = '6f1c2d3e-4b5a-4c7d-8e9f-0a1b2c3d4e5f'
+
+
+@pytest.mark.parametrize(
+    ('data', 'fast'),
+    [
+        ({'sets': '6-4 7-6(7-5)'}, True),
+        ({'sets': ' 6-4  7-6(7-5) ', 'winner_name': ' Rafael Nadal '}, True),
+        ({'sets': '6-4 7-6(7-5)', 'winner_name': 'Roger Federer'}, True),
+        ({'sets': '6-4 7-7'}, True),
+        ({'sets': '6-4 7-6(7-5)', 'uuid': UUID}, True),
+        ({'sets': '6-4 7-6(7-5)', 'uuid': UUID.replace('-', '').upper()}, True),
+        ({'sets': '6-4 7-6(7-5)', 'uuid': f'{{{UUID}}}'}, False),
+        ({'sets': '6-4 7-6(7-5)', 'uuid': 'not a uuid'}, False),
+        ({'sets': '6-4 seven-six'}, False),
+        ({'sets': '6-4 7-6(7-5)', 'points': '1' * 48}, False),
+        ({'sets': '6-4 7-6(7-5)', 'player2_name': ' '}, False),
+        ({'points': '1' * 48}, True),
+        ({'points': '1' * 47}, True),
+        ({'points': '1' * 48, 'winner_name': 'Rafael Nadal'}, True),
+        ({'points': ' ' + '1' * 48}, False),
+    ],
+)
+def test_score_strings_are_validated_like_the_schema(
+    data: dict[str, str], fast: bool
+) -> None:
+    data = {'player1_name': ' Rafael Nadal', 'player2_name': 'Roger Federer', **data}
+
+    result = _validate_score_string(2, data)
+
+    assert (result is not None) is fast
+    if result is not None:
+        assert result == _validate(2, lambda: ImportedMatchSchema.model_validate(data))
+
+
+def test_import_command(
+    played_db: Database,
+    db: Database,
+    db_url: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    path = tmp_path / 'matches.ndjson'
+    path.write_text(export(played_db) + '{"player1_name": "Andy Murray"}\n')
+    monkeypatch.setattr(settings, 'db_url', db_url)
+
+    assert cli.main(['import-matches', str(path), '--chunk-size', '2']) == 1
+    out, err = capsys.readouterr()
+    assert out == 'Imported 4 matches in ' + out.split(' in ', 1)[1]
+    assert out.endswith('skipped 0 already imported and 1 invalid\n')
+    assert err.splitlines()[0].startswith('2 imported, 2 read (')
+    assert 'line 5: player2_name: Field required' in err
@@ -0,0 +1,97 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    AsyncDatabase,
+    Database,
+    InMemoryOngoingMatchStore,
+    MatchController,
+    MatchService,
+)
+from app.domain import PlayerIdentifier
+from app.settings import settings
+
+PAGE_SIZE = settings.default_page_size
+PLAYERS = ['Rafael Nadal', 'Roger Federer', 'Novak Djokovic']
+
+
+@pytest.fixture
+def match_srv(db: Database, db_url: str) -> Iterator[MatchService]:
+    async_db = AsyncDatabase(db_url=db_url, echo=False)
+    match_srv = MatchService(
+        db=db, ongoing_match_store=InMemoryOngoingMatchStore(), async_db=async_db
+    )
+    for i in range(PAGE_SIZE * 2 + 3):
+        player1, player2 = PLAYERS[i % 3], PLAYERS[(i + 1) % 3]
+        ongoing_match = match_srv.create_new_match(player1, player2)
+        match_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.ONE] * 48)
+    yield match_srv
+    asyncio.run(async_db.dispose())
+
+
+@pytest.mark.parametrize('player_name', [None, 'Rafael Nadal'])
+def test_cursor_pages_match_offset_pages(
+    match_srv: MatchService, player_name: str | None
+) -> None:
+    first = match_srv.get_finished_matches_paginated(1, player_name)
+    offset_pages = [first]
+    for page in range(2, first['total_pages'] + 1):
+        offset_pages.append(match_srv.get_finished_matches_paginated(page, player_name))
+
+    # Вперед по курсору `next_after_id` до последней страницы.
+    cursor_pages = [first]
+    while (after_id := cursor_pages[-1]['next_after_id']) is not None:
+        cursor_pages.append(
+            match_srv.get_finished_matches_paginated(
+                len(cursor_pages) + 1, player_name, after_id=after_id
+            )
+        )
+    assert [p['matches'] for p in cursor_pages] == [p['matches'] for p in offset_pages]
+    assert cursor_pages[-1]['total_pages'] == 0
+
+    # И обратно по `prev_before_id` до первой.
+    back_pages = [cursor_pages[-1]]
+    while (before_id := back_pages[-1]['prev_before_id']) is not None:
+        back_pages.append(
+            match_srv.get_finished_matches_paginated(
+                1, player_name, before_id=before_id
+            )
+        )
+    assert [p['matches'] for p in reversed(back_pages)] == [
+        p['matches'] for p in offset_pages
+    ]
+
+
+def test_async_cursor_page_matches_sync(match_srv: MatchService) -> None:
+    first = match_srv.get_finished_matches_paginated(1, None)
+    after_id = first['next_after_id']
+    assert after_id is not None
+
+    sync_page = match_srv.get_finished_matches_paginated(2, None, after_id=after_id)
+    async_page = asyncio.run(
+        match_srv.get_finished_matches_paginated_async(2, None, after_id=after_id)
+    )
+    assert async_page == sync_page
+
+
+def test_matches_page_links_use_cursors(match_srv: MatchService) -> None:
+    match_ctrl = MatchController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        match_srv=match_srv,
+    )
+    next_after_id = match_srv.get_finished_matches_paginated(1, None)['next_after_id']
+
+    status, _, body = match_ctrl.show_matches_page(
+        page='2', after_id=str(next_after_id)
+    )
+    assert status == '200 OK'
+    assert 'before_id=' in body
+    assert 'after_id=' in body
+
+    # Испорченный курсор игнорируется: показывается страница по смещению.
+    status, _, body = match_ctrl.show_matches_page(page='1', after_id='abc')
+    assert status == '200 OK'
+    assert 'before_id=' not in body
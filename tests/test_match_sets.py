@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from sqlalchemy import select
+
+from app import Database, InMemoryOngoingMatchStore, MatchService
+from app.domain import PlayerIdentifier
+from app.models import Match
+from app.repositories import MatchRepository
+from app.repositories.match_repository import _build_tie_break_statement
+from tests.conftest import LOST_SET, TIE_BREAK_SET
+
+
+@pytest.fixture
+def match_srv(db: Database) -> MatchService:
+    return MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+
+
+def finish_match(
+    match_srv: MatchService, player1: str, points: list[PlayerIdentifier]
+) -> None:
+    ongoing_match = match_srv.create_new_match(player1, 'Roger Federer')
+    match_srv.record_points(ongoing_match.uuid, points)
+
+
+def test_sets_are_stored_with_score(db: Database, match_srv: MatchService) -> None:
+    finish_match(match_srv, 'Rafael Nadal', TIE_BREAK_SET + LOST_SET + TIE_BREAK_SET)
+
+    with db.get_session() as session:
+        match_ = session.scalars(select(Match)).one()
+        sets = [
+            (
+                s.set_number,
+                s.player1_games,
+                s.player2_games,
+                s.tie_break_player1_points,
+                s.tie_break_player2_points,
+            )
+            for s in match_.sets
+        ]
+        breakdown = json.loads(match_.score_json)['sets_breakdown']
+
+    assert sets == [(1, 7, 6, 7, 0), (2, 0, 6, None, None), (3, 7, 6, 7, 0)]
+    assert [[s[1], s[2]] for s in sets] == [
+        [b['player1_games'], b['player2_games']] for b in breakdown
+    ]
+
+
+def test_matches_decided_in_third_set_tie_break(
+    db: Database, match_srv: MatchService
+) -> None:
+    finish_match(match_srv, 'Rafael Nadal', TIE_BREAK_SET + LOST_SET + TIE_BREAK_SET)
+    finish_match(match_srv, 'Novak Djokovic', TIE_BREAK_SET * 2)
+    finish_match(match_srv, 'Andy Murray', LOST_SET + TIE_BREAK_SET * 2)
+
+    with db.get_session() as session:
+        match_repo = MatchRepository(session)
+        third_set = match_repo.find_many_with_tie_break(set_number=3, limit=10)
+        first_set = match_repo.find_many_with_tie_break(set_number=1, limit=10)
+        older = match_repo.find_many_with_tie_break(
+            set_number=1, limit=10, after_id=first_set[0].id
+        )
+        assert [m.player1.name for m in third_set] == ['Andy Murray', 'Rafael Nadal']
+        assert [m.player1.name for m in first_set] == ['Novak Djokovic', 'Rafael Nadal']
+        assert [m.player1.name for m in older] == ['Rafael Nadal']
+
+
+def test_tie_break_search_reads_partial_index(db: Database) -> None:
+    stmt = _build_tie_break_statement(set_number=3, limit=10, after_id=1000)
+    sql = stmt.compile(db._engine, compile_kwargs={'literal_binds': True})
+    with db._engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+    assert any('INDEX ix_MatchSets_TieBreak' in step for step in plan)
+    assert not any(step.startswith('SCAN') for step in plan)
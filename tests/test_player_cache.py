@@ -0,0 +1,72 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from sqlalchemy import event
+
+from app import Database, InMemoryOngoingMatchStore, MatchService, PlayerCache
+from app.domain import Player
+
+
+@pytest.fixture
+def statements(db: Database) -> Iterator[list[str]]:
+    executed: list[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        executed.append(statement)
+
+    event.listen(db._engine, 'before_cursor_execute', record)
+    yield executed
+    event.remove(db._engine, 'before_cursor_execute', record)
+
+
+def test_least_recently_used_player_is_evicted() -> None:
+    cache = PlayerCache(max_entries=2)
+    cache.put(Player(id=1, name='a'))
+    cache.put(Player(id=2, name='b'))
+    assert cache.get('a') == Player(id=1, name='a')
+    cache.put(Player(id=3, name='c'))
+
+    assert cache.get('b') is None
+    assert cache.get('c') == Player(id=3, name='c')
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2}
+
+
+def test_new_match_resolves_players_in_one_statement(
+    db: Database, statements: list[str]
+) -> None:
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+
+    first = match_srv.create_new_match('Rafael Nadal', 'Roger Federer')
+    assert [s.split()[0] for s in statements] == ['INSERT']
+
+    # Один игрок уже известен: запрос только за вторым.
+    statements.clear()
+    second = match_srv.create_new_match('Rafael Nadal', 'Novak Djokovic')
+    assert len(statements) == 1
+    assert second.player1 == first.player1
+
+    # Оба в кэше: к БД не обращаемся.
+    statements.clear()
+    third = match_srv.create_new_match('Novak Djokovic', 'Roger Federer')
+    assert statements == []
+    assert (third.player1, third.player2) == (second.player2, first.player2)
+
+
+def test_concurrent_creation_of_same_player_succeeds(db: Database) -> None:
+    # У каждого сервиса свой кэш: все запросы доходят до БД одновременно.
+    services = [
+        MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+        for _ in range(8)
+    ]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        matches = list(
+            executor.map(
+                lambda srv: srv.create_new_match('Carlos Alcaraz', 'Jannik Sinner'),
+                services,
+            )
+        )
+
+    assert len({(m.player1, m.player2) for m in matches}) == 1
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from jinja2 import Environment
+
+from app import (
+    Database,
+    InMemoryOngoingMatchStore,
+    MatchService,
+    PlayerController,
+    PlayerNameIndex,
+    PlayerService,
+)
+from app.domain import PlayerIdentifier
+
+NAMES = ['Rafael Nadal', 'Roger Federer', 'Novak Djokovic', 'Rafael Nadalino']
+
+
+@pytest.fixture
+def index(db: Database) -> PlayerNameIndex:
+    return PlayerNameIndex(db=db)
+
+
+@pytest.fixture
+def match_srv(db: Database, index: PlayerNameIndex) -> MatchService:
+    match_srv = MatchService(
+        db=db, ongoing_match_store=InMemoryOngoingMatchStore(), player_name_index=index
+    )
+    for player1, player2 in [NAMES[:2], NAMES[2:]]:
+        ongoing_match = match_srv.create_new_match(player1, player2)
+        match_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.ONE] * 48)
+    return match_srv
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    [
+        ('raf', ['Rafael Nadal', 'Rafael Nadalino']),
+        ('  NADAL ', ['Rafael Nadal', 'Rafael Nadalino']),
+        ('nadali', ['Rafael Nadalino']),
+        ('fed', ['Roger Federer']),
+        ('rafael  nadal', ['Rafael Nadal', 'Rafael Nadalino']),
+        ('x', []),
+        ('', []),
+    ],
+)
+def test_search_by_name_or_word_prefix(
+    match_srv: MatchService, db: Database, query: str, expected: list[str]
+) -> None:
+    # Индекс, загруженный из БД, и индекс, пополненный сервисом, совпадают.
+    assert PlayerNameIndex(db=db).search(query, limit=10) == expected
+    assert match_srv._player_name_index is not None
+    assert match_srv._player_name_index.search(query, limit=10) == expected
+
+
+def test_players_added_after_load_are_found(
+    match_srv: MatchService, index: PlayerNameIndex
+) -> None:
+    assert index.search('carlos', limit=10) == []
+    match_srv.create_new_match('Carlos Alcaraz', 'Jannik Sinner')
+    assert index.search('carlos', limit=10) == ['Carlos Alcaraz']
+    assert index.search('r', limit=2) == ['Rafael Nadal', 'Rafael Nadalino']
+    assert len(index) == 6
+
+
+def test_resolve_filter_name(index: PlayerNameIndex, match_srv: MatchService) -> None:
+    assert index.resolve('Rafael Nadal') == 'Rafael Nadal'
+    assert index.resolve('rafael nadal') == 'Rafael Nadal'
+    assert index.resolve('djok') == 'Novak Djokovic'
+    # Под "raf" подходят двое: игрок не выбирается.
+    assert index.resolve('raf') is None
+
+    page = match_srv.get_finished_matches_paginated(1, 'djok')
+    assert [m['player1_name'] for m in page['matches']] == ['Novak Djokovic']
+    assert match_srv.get_finished_matches_paginated(1, 'raf')['matches'] == []
+
+
+def test_search_endpoint_returns_json(
+    match_srv: MatchService, db: Database, index: PlayerNameIndex
+) -> None:
+    player_ctrl = PlayerController(
+        jinja_env=Environment(),
+        player_srv=PlayerService(db=db, player_name_index=index),
+    )
+
+    status, headers, body = player_ctrl.search_players(q='ro')
+    assert status == '200 OK'
+    assert ('Content-Type', 'application/json') in headers
+    assert json.loads(body) == ['Roger Federer']
+
+
+def test_filter_finds_players_created_by_another_process(
+    match_srv: MatchService, db: Database
+) -> None:
+    # Индекс загружен до того, как другой процесс создал игроков.
+    assert match_srv.resolve_player_name('Rafael Nadal') == 'Rafael Nadal'
+    other_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    for player1, player2 in [('Carlos Alcaraz', 'Jannik Sinner'), ('Rog', 'Fed')]:
+        ongoing_match = other_srv.create_new_match(player1, player2)
+        other_srv.record_points(ongoing_match.uuid, [PlayerIdentifier.ONE] * 48)
+
+    page = match_srv.get_finished_matches_paginated(1, 'Carlos Alcaraz')
+    assert [m['player1_name'] for m in page['matches']] == ['Carlos Alcaraz']
+    assert match_srv.resolve_player_name('carlos') == 'Carlos Alcaraz'
+    # Точное имя важнее единственного подходящего по началу в индексе.
+    assert match_srv.resolve_player_name('Rog') == 'Roger Federer'
+    page = match_srv.get_finished_matches_paginated(1, 'Rog')
+    assert [m['player1_name'] for m in page['matches']] == ['Rog']
@@ -0,0 +1,180 @@
+import re
+from collections.abc import Iterator
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import select, update
+
+from app import (
+    Database,
+    FinishedMatchWriter,
+    InMemoryOngoingMatchStore,
+    MainController,
+    MatchController,
+    MatchService,
+    PlayerController,
+    PlayerNameIndex,
+    PlayerService,
+    Router,
+    cli,
+    register_routes,
+)
+from app.models import PlayerStat
+from app.settings import settings
+from tests.conftest import LOST_SET, TIE_BREAK_SET, WON_SET
+
+
+@pytest.fixture(params=['in request', 'write-behind'])
+def match_srv(db: Database, request: pytest.FixtureRequest) -> Iterator[MatchService]:
+    writer = None
+    if request.param == 'write-behind':
+        writer = FinishedMatchWriter(db=db, flush_interval=60)
+    yield MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    if writer is not None:
+        writer.close()
+
+
+@pytest.fixture
+def player_srv(db: Database) -> PlayerService:
+    return PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+
+
+def play(match_srv: MatchService) -> None:
+    # Игроки получают id 1, 2, 3 в порядке появления.
+    for player1, player2, points in [
+        ('Rafael Nadal', 'Roger Federer', TIE_BREAK_SET + LOST_SET + TIE_BREAK_SET),
+        ('Roger Federer', 'Rafael Nadal', WON_SET * 2),
+        ('Rafael Nadal', 'Novak Djokovic', LOST_SET * 2),
+    ]:
+        ongoing_match = match_srv.create_new_match(player1, player2)
+        match_srv.record_points(ongoing_match.uuid, points)
+    if match_srv._finished_match_writer is not None:
+        match_srv._finished_match_writer.flush()
+
+
+def stats_rows(db: Database) -> list[tuple[int, ...]]:
+    with db.get_session() as session:
+        rows = session.scalars(select(PlayerStat))
+        return sorted(
+            (
+                s.player_id,
+                s.opponent_id,
+                s.matches,
+                s.wins,
+                s.sets_won,
+                s.sets_lost,
+                s.tie_breaks_won,
+                s.tie_breaks_lost,
+            )
+            for s in rows
+        )
+
+
+def test_stats_follow_finished_matches(
+    match_srv: MatchService, player_srv: PlayerService
+) -> None:
+    play(match_srv)
+
+    assert player_srv.get_player_stats(1) == {
+        'name': 'Rafael Nadal',
+        'matches': 3,
+        'wins': 1,
+        'losses': 2,
+        'sets_won': 2,
+        'sets_lost': 5,
+        'tie_breaks_won': 2,
+        'tie_breaks_lost': 0,
+        'head_to_head': [
+            {
+                'opponent_id': 2,
+                'opponent_name': 'Roger Federer',
+                'matches': 2,
+                'wins': 1,
+                'losses': 1,
+            },
+            {
+                'opponent_id': 3,
+                'opponent_name': 'Novak Djokovic',
+                'matches': 1,
+                'wins': 0,
+                'losses': 1,
+            },
+        ],
+    }
+    stats = player_srv.get_player_stats(3)
+    assert stats is not None
+    assert (stats['wins'], stats['losses'], stats['sets_won']) == (1, 0, 2)
+    assert player_srv.get_player_stats(4) is None
+
+
+def test_rebuild_matches_incremental_stats(
+    match_srv: MatchService, player_srv: PlayerService, db: Database
+) -> None:
+    play(match_srv)
+    incremental = stats_rows(db)
+
+    assert player_srv.rebuild_player_stats() == len(incremental)
+    assert stats_rows(db) == incremental
+
+
+def test_rebuild_command(
+    match_srv: MatchService,
+    db: Database,
+    db_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    play(match_srv)
+    expected = stats_rows(db)
+    with db.get_session() as session:
+        session.execute(update(PlayerStat).values(wins=0))
+
+    monkeypatch.setattr(settings, 'db_url', db_url)
+    assert cli.main(['rebuild-player-stats']) == 0
+    assert stats_rows(db) == expected
+
+
+def test_player_page(match_srv: MatchService, player_srv: PlayerService) -> None:
+    play(match_srv)
+    player_ctrl = PlayerController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        player_srv=player_srv,
+    )
+
+    status, _, body = player_ctrl.show_player_page(player_id='1')
+    assert status == '200 OK'
+    assert '<a href="/players/2">Roger Federer</a>' in body
+
+    for player_id in ['4', 'Rafael Nadal']:
+        status, _, _ = player_ctrl.show_player_page(player_id=player_id)
+        assert status == '404 Not Found'
+
+
+def test_player_links_route_by_id(db: Database, player_srv: PlayerService) -> None:
+    # Имя со слешем не раскладывается на сегменты пути, а имя "search" не
+    # перекрывается маршрутом подсказок.
+    match_srv = MatchService(db=db, ongoing_match_store=InMemoryOngoingMatchStore())
+    ongoing_match = match_srv.create_new_match('search', 'AC/DC')
+    match_srv.record_points(ongoing_match.uuid, WON_SET * 2)
+    jinja_env = Environment(loader=FileSystemLoader(settings.template_dir))
+    match_ctrl = MatchController(jinja_env=jinja_env, match_srv=match_srv)
+    router = Router()
+    register_routes(
+        router=router,
+        main_ctrl=MainController(jinja_env=jinja_env),
+        match_ctrl=match_ctrl,
+        player_ctrl=PlayerController(jinja_env=jinja_env, player_srv=player_srv),
+    )
+
+    _, _, body = match_ctrl.show_matches_page()
+    links = re.findall(r'href="(/players/[^"]*)"', body)
+    assert links == ['/players/1', '/players/2']
+    for link, name in zip(links, ['search', 'AC/DC'], strict=True):
+        handler, params = router.resolve('GET', link)
+        assert handler is not None and params is not None
+        status, _, page = handler(**params)
+        assert status == '200 OK'
+        assert f'<h1>{name}</h1>' in page
@@ -0,0 +1,122 @@
+from collections.abc import Iterator
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+from sqlalchemy import select, update
+
+from app import (
+    Database,
+    FinishedMatchWriter,
+    InMemoryOngoingMatchStore,
+    MatchService,
+    PlayerController,
+    PlayerNameIndex,
+    PlayerService,
+    cli,
+)
+from app.models import PlayerRating
+from app.settings import settings
+from tests.conftest import FINAL_POINTS
+
+# Победитель указан первым.
+RESULTS = [
+    ('Rafael Nadal', 'Roger Federer'),
+    ('Rafael Nadal', 'Novak Djokovic'),
+    ('Roger Federer', 'Rafael Nadal'),
+    ('Andy Murray', 'Andy Murray'),
+    ('Novak Djokovic', 'Andy Murray'),
+]
+
+
+@pytest.fixture(params=['in request', 'write-behind'])
+def match_srv(db: Database, request: pytest.FixtureRequest) -> Iterator[MatchService]:
+    writer = None
+    if request.param == 'write-behind':
+        writer = FinishedMatchWriter(db=db, flush_interval=60)
+    yield MatchService(
+        db=db,
+        ongoing_match_store=InMemoryOngoingMatchStore(),
+        finished_match_writer=writer,
+    )
+    if writer is not None:
+        writer.close()
+
+
+@pytest.fixture
+def player_srv(db: Database) -> PlayerService:
+    return PlayerService(db=db, player_name_index=PlayerNameIndex(db=db))
+
+
+def play(match_srv: MatchService) -> None:
+    for winner, loser in RESULTS:
+        ongoing_match = match_srv.create_new_match(winner, loser)
+        match_srv.record_points(ongoing_match.uuid, FINAL_POINTS)
+    if match_srv._finished_match_writer is not None:
+        match_srv._finished_match_writer.flush()
+
+
+def rating_rows(db: Database) -> list[tuple[int, float, int]]:
+    with db.get_session() as session:
+        rows = session.scalars(select(PlayerRating))
+        return sorted((r.player_id, r.rating, r.matches) for r in rows)
+
+
+def test_ratings_follow_finished_matches(
+    match_srv: MatchService, player_srv: PlayerService
+) -> None:
+    play(match_srv)
+
+    assert [
+        (p['rank'], p['player_id'], p['name'], p['rating'], p['matches'])
+        for p in player_srv.get_leaderboard()
+    ] == [
+        (1, 1, 'Rafael Nadal', 1513, 3),
+        (2, 2, 'Roger Federer', 1502, 2),
+        (3, 3, 'Novak Djokovic', 1501, 2),
+        (4, 4, 'Andy Murray', 1483, 1),
+    ]
+
+
+def test_recompute_matches_incremental_ratings(
+    match_srv: MatchService, player_srv: PlayerService, db: Database
+) -> None:
+    play(match_srv)
+    incremental = rating_rows(db)
+
+    # Пачки меньше числа матчей: курсор проходит несколько пачек.
+    assert player_srv.recompute_ratings(chunk_size=2) == len(RESULTS)
+    assert rating_rows(db) == incremental
+
+
+def test_recompute_command(
+    match_srv: MatchService,
+    db: Database,
+    db_url: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    play(match_srv)
+    expected = rating_rows(db)
+    with db.get_session() as session:
+        session.execute(update(PlayerRating).values(rating=0))
+
+    monkeypatch.setattr(settings, 'db_url', db_url)
+    assert cli.main(['recompute-ratings', '--chunk-size', '3']) == 0
+    assert rating_rows(db) == expected
+
+
+def test_leaderboard_page(
+    match_srv: MatchService,
+    player_srv: PlayerService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    play(match_srv)
+    monkeypatch.setattr(settings, 'leaderboard_size', 2)
+    player_ctrl = PlayerController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        player_srv=player_srv,
+    )
+
+    status, _, body = player_ctrl.show_leaderboard_page()
+    assert status == '200 OK'
+    assert '<a href="/players/2">Roger Federer</a>' in body
+    assert 'Novak Djokovic' not in body
@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid as uuid_pkg
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from jinja2 import Environment, FileSystemLoader
+
+from app import (
+    Database,
+    InMemoryOngoingMatchStore,
+    MatchController,
+    MatchService,
+    RenderCache,
+)
+from app.domain import OngoingMatch, Player, PlayerIdentifier
+from app.render_cache import RenderedPage
+from app.settings import settings
+
+MATCH_UUID = uuid_pkg.UUID('12345678-1234-5678-1234-567812345678')
+
+
+def _page(html: str) -> RenderedPage:
+    return RenderedPage(html=html, etag=f'"{len(html)}"')
+
+
+def test_renders_each_version_once() -> None:
+    cache = RenderCache(max_entries=10)
+    renders: list[int] = []
+
+    def render(version: int) -> RenderedPage:
+        renders.append(version)
+        return _page(f'<p>{version}</p>' * (version + 1))
+
+    first = cache.get_or_render(MATCH_UUID, 0, lambda: render(0))
+    assert cache.get_or_render(MATCH_UUID, 0, lambda: render(0)) == first
+
+    second = cache.get_or_render(MATCH_UUID, 1, lambda: render(1))
+    assert second.html == '<p>1</p><p>1</p>'
+    assert second.etag != first.etag
+    # Страница устаревшей версии рендерится, но не вытесняет новую.
+    cache.get_or_render(MATCH_UUID, 0, lambda: render(0))
+    assert cache.get_or_render(MATCH_UUID, 1, lambda: render(1)) == second
+
+    assert renders == [0, 1, 0]
+    assert cache.stats() == {
+        'hits': 2,
+        'misses': 3,
+        'evictions': 0,
+        'invalidations': 0,
+        'size': 1,
+    }
+
+
+def test_least_recently_used_match_is_evicted() -> None:
+    cache = RenderCache(max_entries=2)
+    uuids = [uuid_pkg.uuid4() for _ in range(3)]
+
+    cache.get_or_render(uuids[0], 0, lambda: _page('a'))
+    cache.get_or_render(uuids[1], 0, lambda: _page('b'))
+    cache.get_or_render(uuids[0], 0, lambda: _page('a'))
+    cache.get_or_render(uuids[2], 0, lambda: _page('c'))
+
+    assert cache.get_or_render(uuids[0], 0, lambda: _page('new a')).html == 'a'
+    assert cache.get_or_render(uuids[1], 0, lambda: _page('new b')).html == 'new b'
+    assert cache.stats()['evictions'] == 2
+
+
+def test_concurrent_requests_wait_for_single_render() -> None:
+    cache = RenderCache(max_entries=10)
+    renders = 0
+    started = threading.Barrier(16)
+
+    def render() -> RenderedPage:
+        nonlocal renders
+        renders += 1
+        time.sleep(0.05)
+        return _page('<p>score</p>')
+
+    def request() -> str:
+        started.wait()
+        return cache.get_or_render(MATCH_UUID, 0, render).html
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        pages = list(executor.map(lambda _: request(), range(16)))
+
+    assert pages == ['<p>score</p>'] * 16
+    assert renders == 1
+
+
+def test_failed_render_is_retried_by_waiting_request() -> None:
+    cache = RenderCache(max_entries=10)
+    first_render_started = threading.Event()
+
+    def failing_render() -> RenderedPage:
+        first_render_started.set()
+        time.sleep(0.05)
+        raise RuntimeError('template error')
+
+    def failing_request() -> None:
+        with pytest.raises(RuntimeError):
+            cache.get_or_render(MATCH_UUID, 0, failing_render)
+
+    thread = threading.Thread(target=failing_request)
+    thread.start()
+    first_render_started.wait()
+
+    assert cache.get_or_render(MATCH_UUID, 0, lambda: _page('ok')).html == 'ok'
+    thread.join()
+
+
+def test_controller_renders_once_per_point_and_drops_finished_match() -> None:
+    store = InMemoryOngoingMatchStore()
+    match_srv = MatchService(
+        db=Database('sqlite://', echo=False), ongoing_match_store=store
+    )
+    cache = RenderCache(max_entries=10)
+    match_ctrl = MatchController(
+        jinja_env=Environment(loader=FileSystemLoader(settings.template_dir)),
+        match_srv=match_srv,
+        render_cache=cache,
+    )
+    ongoing_match = OngoingMatch(
+        player1=Player(id=1, name='Player One'), player2=Player(id=2, name='Player Two')
+    )
+    store.put(ongoing_match)
+
+    responses = []
+    for _ in range(50):
+        responses.append(match_ctrl.show_match_score_page(str(ongoing_match.uuid)))
+    store.update(ongoing_match.uuid, lambda m: m.add_point(PlayerIdentifier.ONE))
+    for _ in range(50):
+        responses.append(match_ctrl.show_match_score_page(str(ongoing_match.uuid)))
+
+    assert cache.stats()['misses'] == 2
+    assert cache.stats()['hits'] == 98
+    etags = {dict(headers)['ETag'] for _, headers, _ in responses}
+    assert len(etags) == 2
+
+    store.update(
+        ongoing_match.uuid, lambda m: m.add_points([PlayerIdentifier.ONE] * 47)
+    )
+    match_ctrl.show_match_score_page(str(ongoing_match.uuid))
+    assert cache.stats()['size'] == 0
@@ -0,0 +1,103 @@
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from app.router import Router
+
+
+def _handler(name: str) -> Callable[..., Any]:
+    def handler(**kwargs: Any) -> str:
+        return name
+
+    handler.__name__ = name
+    return handler
+
+
+INDEX = _handler('index')
+MATCHES = _handler('matches')
+PLAYER = _handler('player')
+PLAYER_ME = _handler('player_me')
+PLAYER_MATCHES = _handler('player_matches')
+FILE = _handler('file')
+CREATE = _handler('create')
+
+
+@pytest.fixture
+def router() -> Router:
+    router = Router()
+    router.add_route('GET', '/', INDEX)
+    router.add_route('GET', '/matches', MATCHES)
+    router.add_route('GET', '/players/{name}', PLAYER)
+    router.add_route('GET', '/players/me', PLAYER_ME)
+    router.add_route('GET', '/players/{name}/matches/{page}', PLAYER_MATCHES)
+    router.add_route('GET', '/files/report-{year}.{ext}', FILE)
+    router.add_route('POST', '/matches', CREATE)
+    return router
+
+
+@pytest.mark.parametrize(
+    ('method', 'path', 'expected_handler', 'expected_params'),
+    [
+        ('GET', '/', INDEX, {}),
+        ('GET', '/matches', MATCHES, {}),
+        ('POST', '/matches', CREATE, {}),
+        ('GET', '/players/nadal', PLAYER, {'name': 'nadal'}),
+        ('GET', '/players/me', PLAYER_ME, {}),
+        (
+            'GET',
+            '/players/nadal/matches/2',
+            PLAYER_MATCHES,
+            {'name': 'nadal', 'page': '2'},
+        ),
+        ('GET', '/files/report-2024.csv', FILE, {'year': '2024', 'ext': 'csv'}),
+    ],
+)
+def test_resolves_routes(
+    router: Router,
+    method: str,
+    path: str,
+    expected_handler: Callable[..., Any],
+    expected_params: dict[str, str],
+) -> None:
+    handler, params = router.resolve(method, path)
+
+    assert handler is expected_handler
+    assert params == expected_params
+
+
+@pytest.mark.parametrize(
+    ('method', 'path'),
+    [
+        ('DELETE', '/matches'),
+        ('GET', '/unknown'),
+        ('GET', '/matches/'),
+        ('GET', '/players/'),
+        ('GET', '/players/nadal/matches'),
+        ('GET', '/players/nadal/matches/2/extra'),
+        ('GET', '/files/report.csv'),
+    ],
+)
+def test_unknown_routes_are_not_resolved(
+    router: Router, method: str, path: str
+) -> None:
+    assert router.resolve(method, path) == (None, None)
+
+
+def test_backtracks_to_parameter_route() -> None:
+    router = Router()
+    router.add_route('GET', '/players/me/settings', PLAYER_ME)
+    router.add_route('GET', '/players/{name}/matches', PLAYER_MATCHES)
+
+    handler, params = router.resolve('GET', '/players/me/matches')
+
+    assert handler is PLAYER_MATCHES
+    assert params == {'name': 'me'}
+
+
+def test_first_registered_handler_wins() -> None:
+    router = Router()
+    router.add_route('GET', '/players/{name}', PLAYER)
+    router.add_route('GET', '/players/{name}', PLAYER_ME)
+
+    assert router.resolve('GET', '/players/nadal') == (PLAYER, {'name': 'nadal'})